@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Content-addressed cache for rendered chart images (base64 PNG strings).
+
+Weekly and daily reports keep re-drawing identical charts: the distributions
+behind them rarely change between re-runs. Decorating a chart function with
+`cached_chart(style)` keys its output on a SHA-256 of
+
+  * the function's name and its script's source (editing the chart invalidates it),
+  * its arguments — the chart's input series — canonicalized to JSON,
+  * the style config (the rcParams the script applies) and matplotlib version,
+
+and serves a hit straight from disk, so unchanged charts skip matplotlib
+entirely. Entries are one file per key, written atomically, so chart worker
+processes can share the directory; `prune()` evicts least-recently-used files
+once the directory grows past its byte budget. A run-local dict also catches
+repeat calls within the same process.
+
+Used by render_issue_charts.py and both marketplace render_email_charts.py
+scripts (which fall back to uncached rendering when this module is absent).
+
+Environment variables:
+  ISSUELENS_CHART_CACHE      Cache directory, or "off" to disable.
+                             Default: ~/.cache/issuelens/charts
+  ISSUELENS_CHART_CACHE_MB   Size budget in MiB before LRU eviction (default 64).
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "charts")
+DEFAULT_MAX_MB = 64
+# Bump when the key derivation changes.
+_FORMAT = 1
+# Evict down to this fraction of the budget so we don't evict on every run.
+_EVICT_TO = 0.9
+
+
+@functools.lru_cache(maxsize=None)
+def _matplotlib_version() -> str:
+    # From package metadata, not the module: matplotlib is imported lazily and
+    # a cache hit must not need it (nor produce a different key without it).
+    mpl = sys.modules.get("matplotlib")
+    if mpl is not None:
+        return mpl.__version__
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("matplotlib")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+def _canonical(obj):
+    """Reduce chart inputs to JSON-serializable values with a stable order."""
+    if isinstance(obj, dict):
+        return [[str(k), _canonical(v)] for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))]
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_canonical(v) for v in obj), key=repr)
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    if hasattr(obj, "tolist"):  # NumPy arrays and scalars
+        return _canonical(obj.tolist())
+    if hasattr(obj, "__dataclass_fields__"):
+        return _canonical(vars(obj))
+    return repr(obj)
+
+
+class ChartCache:
+    """Directory of `<sha256>.b64` files with LRU eviction by mtime."""
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ChartCache | None":
+        directory = os.environ.get("ISSUELENS_CHART_CACHE", DEFAULT_DIR).strip()
+        if not directory or directory.lower() in ("off", "0", "false", "none"):
+            return None
+        try:
+            max_mb = float(os.environ.get("ISSUELENS_CHART_CACHE_MB", DEFAULT_MAX_MB))
+        except ValueError:
+            max_mb = DEFAULT_MAX_MB
+        try:
+            return cls(directory, int(max_mb * 1024 * 1024))
+        except OSError as exc:
+            # A broken cache must never break the report — just render.
+            print(f"Chart cache disabled ({directory}): {exc}", file=sys.stderr)
+            return None
+
+    @staticmethod
+    def key(name: str, source: str, args, kwargs, style) -> str:
+        blob = json.dumps(
+            [_FORMAT, name, source, _canonical(args), _canonical(kwargs), _canonical(style),
+             _matplotlib_version()],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.b64")
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, encoding="ascii") as fh:
+                value = fh.read()
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self._memory[key] = value
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="ascii") as fh:
+                fh.write(value)
+            os.replace(tmp, path)
+        except OSError as exc:
+            print(f"  Chart cache write failed: {exc}", file=sys.stderr)
+
+    def prune(self) -> int:
+        """Delete least-recently-used entries until under budget; returns how many."""
+        try:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".b64"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * _EVICT_TO
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return (
+            f"Chart cache: {self.hits} hit(s) / {self.misses} miss(es) ({rate:.0f}% hit rate), "
+            f"{self.evictions} evicted"
+        )
+
+
+_default: ChartCache | None = None
+_default_loaded = False
+
+
+def default_cache() -> ChartCache | None:
+    """Per-process cache configured from the environment (None when disabled)."""
+    global _default, _default_loaded
+    if not _default_loaded:
+        _default = ChartCache.from_env()
+        _default_loaded = True
+    return _default
+
+
+def cached_chart(style: dict | None = None):
+    """Decorator: serve a chart function's base64 output from the cache.
+
+    `style` is the rcParams dict the script applies; it is part of the key.
+    A None result (nothing to draw) is never cached. The wrapper also gets a
+    `peek(*args, **kwargs)` that returns a cached value without rendering, and
+    a `render(*args, **kwargs)` that renders and caches without the lookup —
+    for callers that already peeked, so a miss is only counted once.
+    """
+
+    def decorate(fn):
+        # The whole defining file is hashed, not just `fn`: charts share helpers
+        # (fig_to_base64, colors, layout) that must invalidate them too.
+        try:
+            with open(inspect.getsourcefile(fn), "rb") as fh:
+                digest = hashlib.sha256(fh.read()).hexdigest()
+        except (OSError, TypeError):
+            digest = hashlib.sha256(fn.__code__.co_code).hexdigest()
+        # Not the module name: a script runs as __main__ but its pool workers
+        # import it by file name.
+        name = fn.__qualname__
+
+        def lookup(args, kwargs):
+            cache = default_cache()
+            if cache is None:
+                return None, None
+            key = ChartCache.key(name, digest, args, kwargs, style)
+            return cache, key
+
+        def store(cache, key, args, kwargs):
+            value = fn(*args, **kwargs)
+            if value is not None and cache is not None:
+                cache.put(key, value)
+            return value
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache, key = lookup(args, kwargs)
+            if cache is not None:
+                value = cache.get(key)
+                if value is not None:
+                    return value
+            return store(cache, key, args, kwargs)
+
+        def peek(*args, **kwargs):
+            cache, key = lookup(args, kwargs)
+            return cache.get(key) if cache is not None else None
+
+        def render(*args, **kwargs):
+            cache, key = lookup(args, kwargs)
+            return store(cache, key, args, kwargs)
+
+        wrapper.peek = peek
+        wrapper.render = render
+        return wrapper
+
+    return decorate
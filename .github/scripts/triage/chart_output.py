@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Encode matplotlib figures for email, optionally in a compact form.
+
+Two output modes, shared by render_issue_charts.py and both marketplace
+render_email_charts.py scripts:
+
+  * "png" — the original encoding: a full-colour PNG at the chart's DPI.
+  * "compact" — the DPI is chosen per chart so the image is no wider than
+    the email can show (TARGET_WIDTH_PX at `scale` 1.0), and the PNG is
+    re-encoded with a reduced colour palette (Pillow, which matplotlib already
+    depends on). Flat-colour charts lose nothing visible and shrink several
+    times over; the smaller of the two encodings is kept.
+
+`settings` is module state so chart functions keep their signatures; it is
+also what renderers pass to process-pool workers and fold into chart cache
+keys, so a cached image is only reused for the same encoding.
+
+A renderer that must meet a byte budget walks BUDGET_LADDER — progressively
+smaller images and palettes — until the report fits.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+
+MODES = ("png", "compact")
+# The email container is 800 px wide; 1.5x keeps charts sharp on HiDPI screens.
+TARGET_WIDTH_PX = 1200
+MIN_DPI = 60
+DEFAULT_COLORS = 128
+# (scale, palette colours) steps tried in order when a report is over budget.
+BUDGET_LADDER = [(1.0, 128), (0.8, 64), (0.65, 32), (0.5, 16)]
+
+settings = {"mode": "png", "scale": 1.0, "colors": DEFAULT_COLORS}
+
+
+def configure(mode: str | None = None, scale: float | None = None, colors: int | None = None) -> dict:
+    """Update the encoding settings; returns a copy for handing to workers."""
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"unknown chart mode: {mode}")
+        settings["mode"] = mode
+    if scale is not None:
+        settings["scale"] = scale
+    if colors is not None:
+        settings["colors"] = colors
+    return dict(settings)
+
+
+def adaptive_dpi(fig, dpi: float) -> float:
+    """Lower `dpi` so the figure renders no wider than the target width."""
+    width_in = fig.get_figwidth() or 1
+    fit = TARGET_WIDTH_PX * settings["scale"] / width_in
+    return max(MIN_DPI, min(dpi, fit))
+
+
+def quantize_png(data: bytes, colors: int) -> bytes:
+    """Re-encode a PNG with an adaptive palette; returns the smaller encoding."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        paletted = img.convert("RGB").quantize(colors=colors)
+        out = io.BytesIO()
+        paletted.save(out, format="PNG", optimize=True)
+    small = out.getvalue()
+    return small if len(small) < len(data) else data
+
+
+def encode_figure(fig, dpi: float = 150) -> str:
+    """Render `fig` to a base64 PNG string using the current settings."""
+    compact = settings["mode"] == "compact"
+    if compact:
+        dpi = adaptive_dpi(fig, dpi)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", facecolor="white")
+    data = buf.getvalue()
+    if compact:
+        data = quantize_png(data, settings["colors"])
+    return base64.b64encode(data).decode("ascii")
@@ -2,62 +2,82 @@
 """Fetch open issues for a repository and normalize them to triage-results.json.
 
 Deterministic — uses only the GitHub REST Search API via stdlib (no AI, no extra deps).
+All HTTP goes through the shared pooled client in github_client.py. Searches
+that exceed the Search API's 1000-result cap are split into date-range shards
+automatically, so no mode silently truncates.
 
-Three query modes keep each workflow's input data as small as possible:
+`--backend graphql` runs the same queries through the GraphQL search API and
+pulls each issue's parent link, labels, assignees and comment/reaction counts
+in the same call, adding a precomputed `has_parent` to every issue. The SLA
+script honours that field directly, so no per-issue parent lookups are needed.
+
+Four query modes keep each workflow's input data as small as possible:
 
   --mode created    Open issues created on/after --since (weekly full report).
   --mode updated    Open issues updated on/after --since (daily labeling — only
                     the issues that changed in the last 24h, much less data).
   --mode assignees  Open issues assigned to any github-id listed in the IDS env
-                    var (per-person SLA notifications).
+                    var (per-person SLA notifications). Logins are OR-ed into
+                    as few searches as the API allows, run concurrently.
+  --mode sync       Incremental: only issues updated since the last sync are
+                    fetched into the local snapshot store (issue_store.py), and
+                    the output is materialized from the store. --since, if
+                    given, limits the output to issues created on/after it.
+                    Stored issues carry no `has_parent` (see issue_store.py).
+                    Periodically (and with --full-sync) every open issue is
+                    re-read instead, dropping issues that were deleted,
+                    transferred or converted to discussions.
 
 Usage:
     python fetch_issues.py --repo owner/repo --mode created   --since 2026-01-01 --output triage-results.json
     python fetch_issues.py --repo owner/repo --mode updated   --since 2026-06-01T00:00:00Z --output triage-results.json
     python fetch_issues.py --repo owner/repo --mode assignees --output triage-results.json
+    python fetch_issues.py --repo owner/repo --mode sync      --since 2026-01-01 --output triage-results.json
+    python fetch_issues.py --repo owner/repo --mode assignees --backend graphql --output triage-results.json
 """
 
 import argparse
 import json
 import os
+import re
 import sys
 import time
 import urllib.error
 import urllib.parse
-import urllib.request
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+from github_client import API, shared_client
+from issue_store import IssueStore, reconcile_interval
+from triage_results import write_issues
+
+# Re-read a little before the high-water mark: the Search index lags writes, so
+# an issue updated just before the last sync may only have become searchable
+# after it. Upserts are idempotent, so the overlap only costs a few rows.
+SYNC_OVERLAP = timedelta(minutes=10)
 
-API = "https://api.github.com"
+# The Search API never returns more than 1000 results for one query, however
+# many pages are requested. Queries above the cap are split by date range.
+SEARCH_CAP = 1000
+PER_PAGE = 100
+_RANGE_RE = re.compile(r"\b(created|updated):>=(\S+)")
+# Lower bound for queries without a date qualifier (GitHub launched in 2008).
+_SEARCH_EPOCH = datetime(2008, 1, 1, tzinfo=timezone.utc)
+# A search may use at most five AND/OR/NOT operators and 256 characters, which
+# bounds how many `assignee:` terms can share one query.
+MAX_SEARCH_OPERATORS = 5
+MAX_QUERY_LENGTH = 256
 
 
 def _request(url: str, token: str | None) -> dict:
-    req = urllib.request.Request(url)
-    req.add_header("Accept", "application/vnd.github+json")
-    req.add_header("X-GitHub-Api-Version", "2022-11-28")
-    if token:
-        req.add_header("Authorization", f"Bearer {token}")
-    for attempt in range(5):
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                return json.loads(resp.read().decode())
-        except urllib.error.HTTPError as exc:
-            # Respect secondary rate limits with a simple backoff.
-            if exc.code in (403, 429) and attempt < 4:
-                time.sleep(2 ** attempt * 5)
-                continue
-            # Attach the response body so callers can see *why* (e.g. a 422
-            # "users cannot be searched" for a non-existent assignee login).
-            try:
-                body = exc.read().decode("utf-8", "replace")
-            except Exception:  # noqa: BLE001
-                body = ""
-            if body:
-                exc.msg = f"{exc.msg}: {body}"
-            raise
-    raise RuntimeError("exceeded retry attempts")
+    # Pooled keep-alive connection + shared retry/rate-limit policy. HTTP
+    # errors surface as urllib.error.HTTPError with the response body attached
+    # (e.g. a 422 "users cannot be searched" for a non-existent assignee login).
+    return shared_client(token).get_json(url)
 
 
 def _normalize(item: dict, repo: str) -> dict:
-    return {
+    issue = {
         "repo": repo,
         "issue_number": item["number"],
         "title": item.get("title", ""),
@@ -67,41 +87,301 @@ def _normalize(item: dict, repo: str) -> dict:
         "createdAt": item.get("created_at", ""),
         "updatedAt": item.get("updated_at", ""),
     }
+    # Only the GraphQL backend knows these without extra calls per issue.
+    for key in ("has_parent", "comments", "reactions"):
+        if key in item:
+            issue[key] = item[key]
+    return issue
 
 
-def search_issues(repo: str, query: str, token: str | None) -> list[dict]:
-    """Run a GitHub issue search and return normalized issue dicts."""
-    collected: list[dict] = []
-    page = 1
-    while True:
-        params = urllib.parse.urlencode({"q": query, "per_page": 100, "page": page})
-        data = _request(f"{API}/search/issues?{params}", token)
-        items = data.get("items", [])
-        if not items:
-            break
-        for item in items:
-            # Search API may include PRs; skip anything that is a PR.
-            if "pull_request" in item:
+def _parse_ts(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _fmt_ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _plan_shards(
+    query: str, first_page: Callable[[str], tuple[int, Any]], token: str | None
+) -> list[tuple[str, int, Any]]:
+    """Split `query` by date range until every shard fits under SEARCH_CAP.
+
+    The `created:>=` / `updated:>=` range (or the whole `created` history when
+    the query has none) is halved recursively. `first_page(q)` returns
+    (total_count, page data); each round of first pages is fetched in parallel
+    on the shared client's worker pool. Returns (query, total, first page) per
+    shard — a single entry, the query exactly as given, when it already fits.
+    """
+    match = _RANGE_RE.search(query)
+    if match:
+        field, start = match.group(1), _parse_ts(match.group(2))
+        base = " ".join((query[: match.start()] + query[match.end() :]).split())
+    else:
+        field, start, base = "created", _SEARCH_EPOCH, query
+    client = shared_client(token)
+
+    pending = [(query, (start, datetime.now(timezone.utc)))]
+    shards: list[tuple[str, int, Any]] = []
+    while pending:
+        results = client.map(lambda job: first_page(job[0]), pending)
+        split: list[tuple[str, tuple[datetime, datetime]]] = []
+        for (q, (lo, hi)), (total, data) in zip(pending, results):
+            half = int((hi - lo).total_seconds()) // 2
+            if total > SEARCH_CAP and half >= 1:
+                mid = lo + timedelta(seconds=half)
+                for window in ((lo, mid), (mid + timedelta(seconds=1), hi)):
+                    split.append((f"{base} {field}:{_fmt_ts(window[0])}..{_fmt_ts(window[1])}", window))
                 continue
-            collected.append(_normalize(item, repo))
-        if len(items) < 100:
-            break
-        page += 1
-        if page > 10:  # Search API hard-caps at 1000 results.
-            break
-    return collected
+            if total > SEARCH_CAP:
+                print(
+                    f"  Warning: {total} results within one second for '{q}'; "
+                    f"only the first {SEARCH_CAP} are reachable.",
+                    file=sys.stderr,
+                )
+            shards.append((q, total, data))
+        pending = split
+    if len(shards) > 1:
+        print(f"  Search exceeded {SEARCH_CAP} results; split into {len(shards)} {field} range shard(s)")
+    return shards
+
+
+def _dedupe(items: Iterable[dict]) -> list[dict]:
+    seen: dict[int, dict] = {}
+    for item in items:
+        seen[item["number"]] = item
+    return list(seen.values())
+
+
+# -- REST backend ------------------------------------------------------------
+def _search_page(query: str, page: int, token: str | None) -> dict:
+    params = {"q": query, "per_page": PER_PAGE, "page": page}
+    if " OR " in query:
+        params["advanced_search"] = "true"  # boolean operators need advanced search
+    return _request(f"{API}/search/issues?{urllib.parse.urlencode(params)}", token)
+
+
+def _search_items_rest(query: str, token: str | None) -> list[dict]:
+    """Search via REST; every page after the first is fetched in parallel."""
+
+    def first_page(q: str) -> tuple[int, dict]:
+        data = _search_page(q, 1, token)
+        return data.get("total_count", 0), data
+
+    shards = _plan_shards(query, first_page, token)
+    rest = [
+        (q, page)
+        for q, total, _ in shards
+        for page in range(2, -(-min(total, SEARCH_CAP) // PER_PAGE) + 1)
+    ]
+    rest_pages = shared_client(token).map(lambda job: _search_page(job[0], job[1], token), rest)
+    pages = [data for _, _, data in shards] + rest_pages
+    # Search API may include PRs; skip anything that is a PR.
+    return _dedupe(
+        item for data in pages for item in data.get("items", []) if "pull_request" not in item
+    )
+
+
+# -- GraphQL backend ---------------------------------------------------------
+_GRAPHQL_SEARCH = """
+query($q: String!, $type: SearchType!, $cursor: String) {
+  search(query: $q, type: $type, first: 100, after: $cursor) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Issue {
+        number title url state createdAt updatedAt
+        assignees(first: 20) { nodes { login } }
+        labels(first: 50) { nodes { name } }
+        parent { number }
+        comments { totalCount }
+        reactions { totalCount }
+      }
+    }
+  }
+}
+"""
+
+
+class GraphQLError(RuntimeError):
+    """GraphQL answered HTTP 200 but reported errors for the query."""
+
+
+def _graphql_page(query: str, cursor: str | None, token: str | None) -> dict:
+    data = shared_client(token).post_json(
+        f"{API}/graphql",
+        {
+            "query": _GRAPHQL_SEARCH,
+            # Boolean operators need the advanced issue search.
+            "variables": {"q": query, "type": "ISSUE_ADVANCED" if " OR " in query else "ISSUE", "cursor": cursor},
+        },
+    )
+    if data.get("errors"):
+        messages = "; ".join(e.get("message", "") for e in data["errors"])
+        raise GraphQLError(f"GraphQL search failed: {messages}")
+    return data["data"]["search"]
+
+
+def _graphql_item(node: dict) -> dict:
+    """Reshape a GraphQL Issue node like a REST search item (plus the extras)."""
+    return {
+        "number": node["number"],
+        "title": node.get("title", ""),
+        "html_url": node.get("url", ""),
+        "state": node.get("state", "OPEN").lower(),
+        "created_at": node.get("createdAt", ""),
+        "updated_at": node.get("updatedAt", ""),
+        "assignees": node.get("assignees", {}).get("nodes", []),
+        "labels": node.get("labels", {}).get("nodes", []),
+        "has_parent": node.get("parent") is not None,
+        "comments": node.get("comments", {}).get("totalCount", 0),
+        "reactions": node.get("reactions", {}).get("totalCount", 0),
+    }
+
 
+def _search_items_graphql(query: str, token: str | None) -> list[dict]:
+    """Search via GraphQL: 100 issues per call with parent/labels/assignees inline.
 
-def fetch_created(repo: str, since: str, token: str | None) -> list[dict]:
-    return search_issues(repo, f"repo:{repo} is:issue is:open created:>={since}", token)
+    Pages are cursor-linked, so each shard is walked sequentially while the
+    shards themselves run in parallel.
+    """
 
+    def first_page(q: str) -> tuple[int, dict]:
+        page = _graphql_page(q, None, token)
+        return page.get("issueCount", 0), page
 
-def fetch_updated(repo: str, since: str, token: str | None) -> list[dict]:
-    return search_issues(repo, f"repo:{repo} is:issue is:open updated:>={since}", token)
+    def walk(shard: tuple[str, int, dict]) -> list[dict]:
+        q, _, page = shard
+        nodes = list(page.get("nodes", []))
+        while page["pageInfo"]["hasNextPage"]:
+            page = _graphql_page(q, page["pageInfo"]["endCursor"], token)
+            nodes.extend(page.get("nodes", []))
+        return nodes
 
+    shards = _plan_shards(query, first_page, token)
+    walked = shared_client(token).map(walk, shards)
+    # Non-Issue nodes (PRs) come back as {} because the fragment doesn't match.
+    return _dedupe(_graphql_item(n) for nodes in walked for n in nodes if n.get("number"))
 
-def fetch_assignees(repo: str, token: str | None) -> list[dict]:
-    """Fetch open issues assigned to any github-id in the IDS env var."""
+
+BACKENDS = {"rest": _search_items_rest, "graphql": _search_items_graphql}
+
+
+def _search_items(query: str, token: str | None, backend: str = "rest") -> list[dict]:
+    """Run a GitHub issue search and return the raw (non-PR) items."""
+    return BACKENDS[backend](query, token)
+
+
+def search_issues(repo: str, query: str, token: str | None, backend: str = "rest") -> list[dict]:
+    """Run a GitHub issue search and return normalized issue dicts."""
+    return [_normalize(item, repo) for item in _search_items(query, token, backend)]
+
+
+def fetch_created(repo: str, since: str, token: str | None, backend: str = "rest") -> list[dict]:
+    return search_issues(repo, f"repo:{repo} is:issue is:open created:>={since}", token, backend)
+
+
+def fetch_updated(repo: str, since: str, token: str | None, backend: str = "rest") -> list[dict]:
+    return search_issues(repo, f"repo:{repo} is:issue is:open updated:>={since}", token, backend)
+
+
+def fetch_sync(
+    repo: str,
+    since: str | None,
+    token: str | None,
+    store_path: str | None,
+    backend: str = "rest",
+    full: bool = False,
+) -> list[dict]:
+    """Apply the delta since the last sync to the snapshot store, then read it back.
+
+    Only issues updated since the high-water mark are fetched (open or closed,
+    so closed issues leave the store). The first sync, a sync whose last full
+    reconcile is older than the reconcile interval, and `full=True` instead
+    re-read every open issue and replace the repo's rows, which also drops
+    issues the delta never reports (deleted, transferred, converted).
+    """
+    store = IssueStore(store_path)
+    try:
+        high_water = store.high_water(repo)
+        if full or not high_water or store.reconcile_due(repo, reconcile_interval()):
+            reason = "requested" if full else "no previous sync" if not high_water else "reconcile interval elapsed"
+            print(f"  Full reconcile ({reason}): re-reading all open issues")
+            issues = search_issues(repo, f"repo:{repo} is:issue is:open", token, backend)
+            stored, dropped = store.replace(repo, issues)
+            print(f"  Store: {stored} open, {dropped} no longer open and removed")
+        else:
+            start = datetime.fromisoformat(high_water.replace("Z", "+00:00")) - SYNC_OVERLAP
+            query = f"repo:{repo} is:issue updated:>={start:%Y-%m-%dT%H:%M:%SZ}"
+            print(f"  Delta since {high_water} (high-water mark)")
+            changes = [(_normalize(item, repo), item.get("state", "open")) for item in _search_items(query, token, backend)]
+            upserted, removed = store.apply(repo, changes)
+            print(f"  Store: {upserted} upserted, {removed} closed and removed, {store.count(repo)} open in total")
+        return store.open_issues(repo, since)
+    finally:
+        store.close()
+
+
+def _assignee_query(repo: str, logins: list[str]) -> str:
+    terms = " OR ".join(f"assignee:{login}" for login in logins)
+    return f"repo:{repo} is:issue is:open " + (f"({terms})" if len(logins) > 1 else terms)
+
+
+def _assignee_batches(repo: str, logins: list[str]) -> list[list[str]]:
+    """Pack logins into as few `assignee:a OR assignee:b ...` searches as the API allows."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    for login in logins:
+        candidate = current + [login]
+        too_many_operators = len(candidate) - 1 > MAX_SEARCH_OPERATORS
+        if current and (too_many_operators or len(_assignee_query(repo, candidate)) > MAX_QUERY_LENGTH):
+            batches.append(current)
+            candidate = [login]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _not_searchable(exc: Exception) -> bool:
+    # GitHub returns 422 when a login can't be searched (e.g. the user no longer
+    # exists); GraphQL reports the same condition as a 200 with an error message.
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code == 422
+    return isinstance(exc, GraphQLError) and "cannot be searched" in str(exc)
+
+
+def _fetch_assignee_batch(
+    repo: str, logins: list[str], token: str | None, backend: str
+) -> list[tuple[str, list[dict] | None]]:
+    """Search one batch; return (login, issues or None if skipped) per login."""
+    try:
+        issues = search_issues(repo, _assignee_query(repo, logins), token, backend)
+    except (urllib.error.HTTPError, GraphQLError) as exc:
+        # A non-searchable login is a per-entry data problem, so skip it and keep
+        # going. Auth/rate/other errors are systemic — let them abort.
+        if not _not_searchable(exc):
+            raise
+        if len(logins) == 1:
+            return [(logins[0], None)]
+        # One bad login fails the whole combined query; isolate it.
+        return [row for login in logins for row in _fetch_assignee_batch(repo, [login], token, backend)]
+    rows = []
+    for login in logins:
+        mine = [i for i in issues if login.lower() in {a.lower() for a in i["assignees"]}]
+        rows.append((login, mine))
+    return rows
+
+
+def fetch_assignees(repo: str, token: str | None, backend: str = "rest") -> list[dict]:
+    """Fetch open issues assigned to any github-id in the IDS env var.
+
+    Logins are combined into OR-ed `assignee:` searches (bounded by the Search
+    API's operator and length limits) and the batches run concurrently on the
+    shared client's worker pool. Latency is reported once per search batch —
+    the logins in a batch share one search, so there is no per-login figure.
+    """
     raw = os.environ.get("IDS", "").strip()
     if not raw:
         print("IDS env var is empty; no assignees to query.", file=sys.stderr)
@@ -112,23 +392,33 @@ def fetch_assignees(repo: str, token: str | None) -> list[dict]:
         print("IDS env var is not valid JSON; cannot query assignees.", file=sys.stderr)
         return []
 
-    logins = [e["github-id"] for e in entries if e.get("github-id")]
+    logins = list(dict.fromkeys(e["github-id"] for e in entries if e.get("github-id")))
+    batches = _assignee_batches(repo, logins)
+
+    def timed(batch: list[str]) -> tuple[list[tuple[str, list[dict] | None]], float]:
+        batch_start = time.perf_counter()
+        rows = _fetch_assignee_batch(repo, batch, token, backend)
+        return rows, time.perf_counter() - batch_start
+
+    start = time.perf_counter()
+    results = shared_client(token).map(timed, batches)
     seen: dict[int, dict] = {}
-    for login in logins:
-        try:
-            issues = search_issues(repo, f"repo:{repo} is:issue is:open assignee:{login}", token)
-        except urllib.error.HTTPError as exc:
-            # GitHub returns 422 when a login can't be searched (e.g. the user
-            # no longer exists). That's a per-entry data problem, so skip it and
-            # keep going. Auth/rate/other errors are systemic — let them abort.
-            if exc.code != 422:
-                raise
-            print(f"  @{login}: skipped (HTTP 422 — login not searchable)", file=sys.stderr)
-            continue
-        for issue in issues:
-            # Dedupe by issue number (an issue may have multiple assignees).
-            seen[issue["issue_number"]] = issue
-        print(f"  @{login}: {len(issues)} open assigned issue(s)")
+    for number, (rows, elapsed) in enumerate(results, 1):
+        found: set[int] = set()
+        for login, issues in rows:
+            if issues is None:
+                print(f"  @{login}: skipped (login not searchable)", file=sys.stderr)
+                continue
+            for issue in issues:
+                # Dedupe by issue number (an issue may have multiple assignees).
+                seen[issue["issue_number"]] = issue
+            found.update(issue["issue_number"] for issue in issues)
+            print(f"  @{login}: {len(issues)} open assigned issue(s)")
+        print(f"  Batch {number}/{len(batches)}: {len(rows)} login(s), {len(found)} issue(s) in {elapsed:.2f}s")
+    print(
+        f"  {len(logins)} login(s) in {len(batches)} search batch(es), "
+        f"{time.perf_counter() - start:.2f}s total"
+    )
     return list(seen.values())
 
 
@@ -137,33 +427,52 @@ def main() -> int:
     parser.add_argument("--repo", required=True, help="owner/repo")
     parser.add_argument(
         "--mode",
-        choices=["created", "updated", "assignees"],
+        choices=["created", "updated", "assignees", "sync"],
         default="created",
     )
-    parser.add_argument("--since", help="YYYY-MM-DD or ISO timestamp (created/updated modes)")
-    parser.add_argument("--output", required=True, help="output JSON path")
+    parser.add_argument("--since", help="YYYY-MM-DD or ISO timestamp (created/updated modes; optional created floor for sync)")
+    parser.add_argument("--output", required=True, help="output path (.json array, or .jsonl for JSON Lines)")
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default="rest",
+        help="graphql fetches parent links, labels, assignees and comment/reaction "
+        "counts in the same call (100 issues per query) and adds has_parent",
+    )
+    parser.add_argument("--store", help="snapshot store path for --mode sync (default: $ISSUELENS_ISSUE_STORE or ~/.cache/issuelens/issues.sqlite)")
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="--mode sync: re-read every open issue and replace the store's rows for the repo "
+        "(also done automatically every $ISSUELENS_ISSUE_STORE_RECONCILE days, default 30)",
+    )
     args = parser.parse_args()
 
     token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
 
     if args.mode in ("created", "updated") and not args.since:
         parser.error(f"--since is required for --mode {args.mode}")
+    if args.backend == "graphql" and not token:
+        parser.error("--backend graphql requires GH_TOKEN or GITHUB_TOKEN")
 
     if args.mode == "created":
-        issues = fetch_created(args.repo, args.since, token)
+        issues = fetch_created(args.repo, args.since, token, args.backend)
         scope = f"created since {args.since}"
     elif args.mode == "updated":
-        issues = fetch_updated(args.repo, args.since, token)
+        issues = fetch_updated(args.repo, args.since, token, args.backend)
         scope = f"updated since {args.since}"
+    elif args.mode == "sync":
+        issues = fetch_sync(args.repo, args.since, token, args.store, args.backend, args.full_sync)
+        scope = f"synced, created since {args.since}" if args.since else "synced"
     else:
-        issues = fetch_assignees(args.repo, token)
+        issues = fetch_assignees(args.repo, token, args.backend)
         scope = "assigned to IDS members"
 
-    with open(args.output, "w", encoding="utf-8") as fh:
-        json.dump(issues, fh, indent=2)
+    write_issues(args.output, issues)
 
     print(f"Fetched {len(issues)} open issues from {args.repo} ({scope})")
     print(f"Saved to {args.output}")
+    shared_client(token).print_stats()
     return 0
 
 
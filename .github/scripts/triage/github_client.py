@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""Shared GitHub REST client for the triage and skill scripts.
+
+Stdlib-only (http.client) so every script keeps running on a bare runner with
+no `pip install`. One client gives all callers the same behaviour:
+
+  * Keep-alive connection pooling — one persistent HTTPS connection per host
+    per worker thread, so a run pays the TCP/TLS handshake once per thread
+    instead of once per call.
+  * A bounded worker pool (`GitHubClient.map`) for fanning out independent
+    requests, e.g. one call per issue or per workflow run.
+  * A single rate-limit policy: honour `Retry-After`, wait for
+    `X-RateLimit-Reset` when `X-RateLimit-Remaining` hits zero (pausing every
+    worker, not just the one that noticed), back off on 5xx, and slow down
+    proactively when the remaining budget runs low.
+  * Per-call timing counters grouped by route, printed with `print_stats()`.
+  * Conditional GETs through the persistent ETag cache in http_cache.py: a
+    304 replays the stored body and does not count against the rate limit.
+
+Errors are raised as `urllib.error.HTTPError` (with the response body appended
+to the message) so existing `except urllib.error.HTTPError` handlers keep
+working unchanged.
+
+Usage:
+    from github_client import shared_client
+
+    client = shared_client(token)
+    issue = client.get_json("/repos/o/r/issues/1")
+    results = client.map(lambda n: client.get_json(f"/repos/o/r/issues/{n}"), numbers)
+    client.print_stats()
+
+Scripts outside this directory add it to `sys.path` before importing.
+"""
+
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from http_cache import HttpCache
+
+API = "https://api.github.com"
+API_VERSION = "2022-11-28"
+USER_AGENT = "IssueLens-triage"
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 5
+# Start pausing proactively once fewer than this many calls remain in the window.
+LOW_REMAINING = 10
+# Never sleep longer than this for a single rate-limit wait.
+MAX_RATE_WAIT = 15 * 60
+
+_RETRYABLE_STATUS = {500, 502, 503, 504}
+# Transport errors that mean "the pooled connection went stale" — reconnect.
+_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.ResponseNotReady,
+    http.client.IncompleteRead,
+    ConnectionResetError,
+    BrokenPipeError,
+    TimeoutError,
+)
+_NUMBER_RE = re.compile(r"/\d+(?=/|$)")
+_LABEL_NAME_RE = re.compile(r"(?<=/labels)/[^/]+$")
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    url: str
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+@dataclass
+class RouteStats:
+    calls: int = 0
+    seconds: float = 0.0
+    retries: int = 0
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+
+def _route(method: str, url: str) -> str:
+    """Collapse numbers and label names so stats group per endpoint, not per issue."""
+    path = _NUMBER_RE.sub("/{n}", urllib.parse.urlsplit(url).path)
+    return f"{method} {_LABEL_NAME_RE.sub('/{name}', path)}"
+
+
+def _http_error(url: str, status: int, reason: str, headers: dict[str, str], body: bytes) -> urllib.error.HTTPError:
+    text = body.decode("utf-8", "replace")
+    msg = f"{reason}: {text}" if text else reason
+    hdrs = http.client.HTTPMessage()
+    for key, value in headers.items():
+        hdrs[key] = value
+    return urllib.error.HTTPError(url, status, msg, hdrs, io.BytesIO(body))
+
+
+class GitHubClient:
+    """Thread-safe GitHub REST client with pooled keep-alive connections."""
+
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        max_workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_RETRIES,
+        base_url: str = API,
+        cache: HttpCache | None = None,
+    ) -> None:
+        self.token = token
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pause_until = 0.0
+        self._stats: dict[str, RouteStats] = {}
+        self._rate_remaining: int | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    # -- connections -------------------------------------------------------
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+        return conn
+
+    def _drop_connection(self, scheme: str, netloc: str) -> None:
+        conns = getattr(self._local, "conns", {})
+        conn = conns.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool and close the calling thread's connections."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        for conn in getattr(self._local, "conns", {}).values():
+            conn.close()
+        self._local.conns = {}
+
+    # -- rate limiting -----------------------------------------------------
+    def _wait_if_paused(self) -> None:
+        with self._lock:
+            delay = self._pause_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause(self, seconds: float, reason: str) -> None:
+        seconds = max(1.0, min(seconds, MAX_RATE_WAIT))
+        with self._lock:
+            until = time.time() + seconds
+            if until <= self._pause_until:
+                return
+            self._pause_until = until
+        print(f"{reason} — pausing all GitHub calls for {seconds:.0f}s...", file=sys.stderr)
+
+    def _reset_delay(self, headers: dict[str, str]) -> float:
+        reset = headers.get("x-ratelimit-reset", "")
+        return float(reset) - time.time() + 1 if reset.isdigit() else 60.0
+
+    def _rate_limit_delay(self, status: int, headers: dict[str, str], body: bytes, attempt: int) -> float | None:
+        """Return how long to wait before retrying, or None if not a rate limit."""
+        retry_after = headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        if headers.get("x-ratelimit-remaining") == "0":
+            return self._reset_delay(headers)
+        # Secondary rate limits sometimes arrive as a bare 403/429.
+        if status == 429 or b"rate limit" in body.lower():
+            return 2 ** attempt * 5
+        return None
+
+    def _observe(self, headers: dict[str, str]) -> None:
+        remaining = headers.get("x-ratelimit-remaining", "")
+        if not remaining.isdigit():
+            return
+        self._rate_remaining = int(remaining)
+        if int(remaining) < LOW_REMAINING:
+            self._pause(self._reset_delay(headers), f"Rate limit nearly exhausted ({remaining} left)")
+
+    # -- stats -------------------------------------------------------------
+    def _record(self, route: str, seconds: float, status: int, retries: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(route, RouteStats())
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.retries += retries
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if status == 0 or status >= 400:
+                stats.errors += 1
+
+    def stats(self) -> dict[str, RouteStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def print_stats(self, file=sys.stderr) -> None:
+        stats = self.stats()
+        if not stats:
+            return
+        calls = sum(s.calls for s in stats.values())
+        seconds = sum(s.seconds for s in stats.values())
+        print(f"GitHub API: {calls} call(s), {seconds:.1f}s total", file=file)
+        for route, s in sorted(stats.items(), key=lambda kv: kv[1].seconds, reverse=True):
+            codes = ", ".join(f"{code}x{n}" for code, n in sorted(s.statuses.items()))
+            print(
+                f"  {route}: {s.calls} call(s), {s.seconds:.2f}s "
+                f"(avg {s.seconds / s.calls * 1000:.0f}ms), {s.retries} retr(ies) [{codes}]",
+                file=file,
+            )
+        if self._rate_remaining is not None:
+            print(f"  rate limit remaining: {self._rate_remaining}", file=file)
+        if self.cache is not None:
+            print(self.cache.summary(), file=file)
+
+    # -- requests ----------------------------------------------------------
+    def url(self, path_or_url: str, params: dict | None = None) -> str:
+        url = path_or_url if "://" in path_or_url else f"{self.base_url}/{path_or_url.lstrip('/')}"
+        if params:
+            url += ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+        return url
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": API_VERSION,
+            "User-Agent": USER_AGENT,
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def request(
+        self,
+        method: str,
+        path_or_url: str,
+        *,
+        params: dict | None = None,
+        json_body: Any = None,
+        headers: dict[str, str] | None = None,
+        allow: Iterable[int] = (),
+    ) -> Response:
+        """Send a request and return the Response.
+
+        Statuses >= 400 raise `urllib.error.HTTPError` unless listed in
+        `allow` (e.g. `allow=(404,)` for "not found is a valid answer").
+        Redirects are returned as-is, never followed. Plain GETs are
+        revalidated against the ETag cache when one is attached.
+        """
+        url = self.url(path_or_url, params)
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        send_headers = self.headers()
+        send_headers.update(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            send_headers["Content-Type"] = "application/json"
+        allowed = set(allow)
+        route = _route(method, url)
+
+        cache_key = cached = None
+        if self.cache is not None and method == "GET" and not headers:
+            cache_key = self.cache.key(url, self.token)
+            cached, conditional = self.cache.validators(cache_key)
+            send_headers.update(conditional)
+
+        start = time.perf_counter()
+        retries = 0
+        status = 0
+        try:
+            for attempt in range(self.max_retries):
+                self._wait_if_paused()
+                conn = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request(method, target, body=body, headers=send_headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except _CONNECTION_ERRORS:
+                    # Stale keep-alive socket or dropped connection: reconnect and retry.
+                    self._drop_connection(parts.scheme, parts.netloc)
+                    if attempt == self.max_retries - 1:
+                        raise
+                    retries += 1
+                    continue
+                status = resp.status
+                resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+                if resp.will_close:
+                    self._drop_connection(parts.scheme, parts.netloc)
+                self._observe(resp_headers)
+
+                if status == 304 and cached is not None:
+                    self.cache.hit(cache_key, cached)
+                    return Response(200, cached.headers, cached.body, url)
+                if cache_key is not None and status == 200:
+                    self.cache.miss()
+                    self.cache.put(cache_key, url, resp_headers, data)
+                if status < 400 or status in allowed:
+                    return Response(status, resp_headers, data, url)
+
+                last_attempt = attempt == self.max_retries - 1
+                if status in (403, 429) and not last_attempt:
+                    delay = self._rate_limit_delay(status, resp_headers, data, attempt)
+                    if delay is not None:
+                        self._pause(delay, f"Rate limited (HTTP {status})")
+                        retries += 1
+                        continue
+                if status in _RETRYABLE_STATUS and not last_attempt:
+                    time.sleep(2 ** attempt)
+                    retries += 1
+                    continue
+                raise _http_error(url, status, resp.reason, resp_headers, data)
+            raise RuntimeError(f"exceeded retry attempts for {method} {url}")
+        finally:
+            self._record(route, time.perf_counter() - start, status, retries)
+
+    def get_json(self, path_or_url: str, params: dict | None = None) -> Any:
+        return self.request("GET", path_or_url, params=params).json()
+
+    def post_json(self, path_or_url: str, payload: Any) -> Any:
+        return self.request("POST", path_or_url, json_body=payload).json()
+
+    # -- fan-out -----------------------------------------------------------
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        *,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Run `fn` over `items` on the bounded worker pool, preserving order.
+
+        With `return_exceptions=True` a failing item yields its exception in
+        place of a result instead of aborting the whole batch.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def call(item: Any) -> Any:
+            try:
+                return fn(item)
+            except Exception as exc:  # noqa: BLE001 - surfaced to the caller
+                if return_exceptions:
+                    return exc
+                raise
+
+        # Nested fan-out from inside a worker runs inline: waiting on the same
+        # bounded pool from one of its own threads could deadlock it.
+        if len(items) == 1 or self.max_workers == 1 or getattr(self._local, "worker", False):
+            return [call(item) for item in items]
+
+        def work(item: Any) -> Any:
+            self._local.worker = True
+            return call(item)
+
+        # The pool outlives a single map() call so its threads — and their
+        # keep-alive connections — are reused across batches.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="github"
+                )
+            pool = self._pool
+        return list(pool.map(work, items))
+
+
+_clients: dict[str | None, GitHubClient] = {}
+_clients_lock = threading.Lock()
+
+
+def shared_client(token: str | None, **kwargs: Any) -> GitHubClient:
+    """Return the process-wide client for `token`, creating it on first use.
+
+    The client gets the persistent HTTP cache configured by the environment
+    (see http_cache.py) unless `cache=` is passed explicitly.
+    """
+    with _clients_lock:
+        client = _clients.get(token)
+        if client is None:
+            kwargs.setdefault("cache", HttpCache.from_env())
+            client = _clients[token] = GitHubClient(token, **kwargs)
+        return client
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Precompiled HTML fragments and a size-aware writer for the triage emails.
+
+notify.py and render_issue_charts.py both build inline-styled HTML (email
+clients ignore <style> blocks), so every table cell carries the same style
+attribute. The fragments below are formatted once at import time into bound
+`str.format` methods; `HtmlWriter` then writes a whole email in one pass into
+an `io.StringIO`, escaping each value exactly once.
+
+The writer also keeps a running count of the bytes the HTML will occupy inside
+the JSON request sent to the Logic App (quotes and non-ASCII characters grow
+when JSON-encoded). Tables stop adding rows — and say how many were left out —
+before the body would exceed `max_bytes`, so a very large week degrades to a
+shorter table instead of a rejected request.
+
+Environment variables:
+  NOTIFY_MAX_PAYLOAD_BYTES   Byte budget for an email body (default 20 MiB).
+"""
+
+from __future__ import annotations
+
+import html
+import io
+import json
+import os
+import time
+from typing import Iterable, Sequence
+
+# Logic App HTTP triggers accept up to 100 MB, but the mail connector behind
+# them rejects far smaller messages; budget against the smaller of the two.
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+# Room kept free for the envelope notify.py wraps around a report fragment
+# (header, footer, title and the other JSON fields).
+ENVELOPE_RESERVE = 4 * 1024
+
+CELL_STYLE = "border:1px solid #e1e4e8;padding:8px;"
+TABLE_OPEN = '<table style="border-collapse:collapse;width:100%;">'
+TABLE_CLOSE = "</table>"
+_HEADER_ROW = '<tr style="background:#f6f8fa;">{}</tr>'.format
+_TH = f'<th style="{CELL_STYLE}text-align:left;">{{}}</th>'.format
+_TD = f'<td style="{CELL_STYLE}">{{}}</td>'.format
+_TRUNCATED_ROW = (
+    f'<tr><td colspan="{{}}" style="{CELL_STYLE}color:#586069;font-style:italic;">'
+    "… {} more row(s) omitted to keep the email under its size limit.</td></tr>"
+).format
+_H2 = '<h2 style="color:#24292e;{}">{}</h2>'.format
+_BAR_TABLE_OPEN = '<table style="border-collapse:collapse;width:100%;margin:8px 0;">'
+_BAR_ROW = (
+    '<tr><td style="padding:3px 8px 3px 0;white-space:nowrap;font-size:12px;">{}</td>'
+    '<td style="padding:3px 0;width:100%;"><div style="background:{};width:{:.1f}%;'
+    'height:14px;border-radius:2px;"></div></td>'
+    '<td style="padding:3px 0 3px 8px;font-size:12px;font-weight:bold;text-align:right;">{}</td></tr>'
+).format
+_LINK = '<a href="{}" style="color:#0366d6;">{}</a>'.format
+
+
+class Markup(str):
+    """Already-safe HTML; table cells of this type are written unescaped."""
+
+
+def esc(text) -> str:
+    return html.escape(str(text))
+
+
+def link(url: str, text) -> Markup:
+    return Markup(_LINK(esc(url), esc(text)))
+
+
+def bar_chart(items: Sequence[tuple], color: str = "#42a5f5") -> Markup | None:
+    """A horizontal bar chart as a plain HTML table (CSS widths, no image).
+
+    `items` are (label, value) or (label, value, colour) tuples, drawn in order.
+    A few hundred bytes instead of a PNG, for simple counts and top-N lists.
+    """
+    if not items:
+        return None
+    peak = max(item[1] for item in items) or 1
+    rows = "".join(
+        _BAR_ROW(esc(item[0]), item[2] if len(item) > 2 else color, item[1] / peak * 100, item[1])
+        for item in items
+    )
+    return Markup(_BAR_TABLE_OPEN + rows + TABLE_CLOSE)
+
+
+def max_payload_bytes() -> int:
+    try:
+        return int(os.environ.get("NOTIFY_MAX_PAYLOAD_BYTES", DEFAULT_MAX_BYTES))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def payload_size(fragment: str) -> int:
+    """Bytes `fragment` occupies as a JSON string value (json.dumps defaults)."""
+    if fragment.isascii() and fragment.isprintable() and '"' not in fragment and "\\" not in fragment:
+        return len(fragment)  # fast path for base64 images and plain text
+    return len(json.dumps(fragment)) - 2
+
+
+class HtmlWriter:
+    """Single-pass HTML builder with payload-size accounting and table truncation.
+
+    `max_bytes` defaults to NOTIFY_MAX_PAYLOAD_BYTES; `reserve` is kept free
+    for content written after this writer's output (e.g. the email envelope).
+    """
+
+    def __init__(self, max_bytes: int | None = None, reserve: int = 0) -> None:
+        self.max_bytes = max_payload_bytes() if max_bytes is None else max_bytes
+        self.reserve = reserve
+        self.size = 0
+        self.truncated_rows = 0
+        self.omitted: list[str] = []  # content dropped to stay under budget
+        self._buf = io.StringIO()
+        self._start = time.perf_counter()
+
+    def write(self, fragment: str) -> None:
+        self._buf.write(fragment)
+        self.size += payload_size(fragment)
+
+    def fits(self, extra: int) -> bool:
+        return self.size + extra + self.reserve <= self.max_bytes
+
+    def omit(self, what: str) -> None:
+        self.omitted.append(what)
+
+    def heading(self, text: str, first: bool = False) -> None:
+        self.write(_H2("" if first else "margin-top:24px;", esc(text)))
+
+    def table(self, headers: Sequence[str], rows: Iterable[Sequence]) -> int:
+        """Write a table; returns how many rows fit. Non-Markup cells are escaped."""
+        self.write(TABLE_OPEN + _HEADER_ROW("".join(_TH(esc(h)) for h in headers)))
+        closing = payload_size(TABLE_CLOSE) + payload_size(_TRUNCATED_ROW(len(headers), 10**6))
+        written = 0
+        rows = iter(rows)
+        for row in rows:
+            row_html = "<tr>" + "".join(
+                _TD(cell if isinstance(cell, Markup) else esc(cell)) for cell in row
+            ) + "</tr>"
+            if not self.fits(payload_size(row_html) + closing):
+                omitted = 1 + sum(1 for _ in rows)
+                self.truncated_rows += omitted
+                self.omitted.append(f"{omitted} table row(s)")
+                self.write(_TRUNCATED_ROW(len(headers), omitted))
+                break
+            self.write(row_html)
+            written += 1
+        self.write(TABLE_CLOSE)
+        return written
+
+    def getvalue(self) -> str:
+        return self._buf.getvalue()
+
+    @property
+    def render_seconds(self) -> float:
+        return time.perf_counter() - self._start
+
+    def summary(self) -> str:
+        note = f", omitted: {'; '.join(self.omitted)}" if self.omitted else ""
+        return (
+            f"{self.size / 1024:.0f} KiB of {self.max_bytes / 1024:.0f} KiB budget, "
+            f"rendered in {self.render_seconds * 1000:.0f} ms{note}"
+        )
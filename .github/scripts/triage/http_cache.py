@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Persistent ETag / Last-Modified cache for GitHub REST GET calls.
+
+GitHub answers a conditional request (`If-None-Match` / `If-Modified-Since`)
+with `304 Not Modified` when nothing changed, and a 304 does not count against
+the REST rate limit. `github_client.GitHubClient` consults this cache on every
+GET: it sends the stored validators, and on a 304 replays the stored body, so
+re-running a fetch over a mostly-unchanged repo costs almost nothing.
+
+Storage is a single stdlib SQLite file. Entries are keyed by URL plus a hash of
+the token (so two identities never share private responses) and evicted
+least-recently-used once the file grows past its byte budget.
+
+Environment variables:
+  ISSUELENS_HTTP_CACHE        Path of the cache file, or "off" to disable.
+                              Default: ~/.cache/issuelens/github-http.sqlite
+  ISSUELENS_HTTP_CACHE_MB     Size budget in MiB before LRU eviction (default 256).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "github-http.sqlite")
+DEFAULT_MAX_MB = 256
+# Evict down to this fraction of the budget so we don't evict on every write.
+_EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used);
+"""
+
+
+@dataclass
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0  # 304 replayed from the cache
+    misses: int = 0  # full response downloaded
+    stores: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+
+
+class HttpCache:
+    """Size-bounded LRU store of validators + bodies, safe to share across threads."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> "HttpCache | None":
+        path = os.environ.get("ISSUELENS_HTTP_CACHE", DEFAULT_PATH).strip()
+        if not path or path.lower() in ("off", "0", "false", "none"):
+            return None
+        try:
+            max_mb = float(os.environ.get("ISSUELENS_HTTP_CACHE_MB", DEFAULT_MAX_MB))
+        except ValueError:
+            max_mb = DEFAULT_MAX_MB
+        try:
+            return cls(path, int(max_mb * 1024 * 1024))
+        except (OSError, sqlite3.Error) as exc:
+            # A broken cache must never break the run — just go uncached.
+            print(f"HTTP cache disabled ({path}): {exc}", file=sys.stderr)
+            return None
+
+    @staticmethod
+    def key(url: str, token: str | None) -> str:
+        identity = hashlib.sha256((token or "").encode()).hexdigest()[:16]
+        return hashlib.sha256(f"{identity} {url}".encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, headers, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[0], row[1], json.loads(row[2]), row[3])
+
+    def validators(self, key: str) -> tuple[CachedResponse | None, dict[str, str]]:
+        """Return the cached entry (if any) and the conditional headers to send."""
+        entry = self.get(key)
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return entry, headers
+
+    def hit(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(entry.body)
+
+    def miss(self) -> None:
+        with self._lock:
+            self.stats.misses += 1
+
+    def put(self, key: str, url: str, headers: dict[str, str], body: bytes) -> None:
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return  # nothing to revalidate with
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, json.dumps(headers), body, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            self.stats.stores += 1
+            if self._size > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under budget. Caller holds the lock."""
+        target = self.max_bytes * _EVICT_TO
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._size -= size
+            self.stats.evictions += 1
+
+    def summary(self) -> str:
+        s = self.stats
+        total = s.hits + s.misses
+        rate = s.hits / total * 100 if total else 0.0
+        return (
+            f"HTTP cache: {s.hits} hit(s) / {s.misses} miss(es) ({rate:.0f}% hit rate), "
+            f"{s.bytes_saved / 1024:.0f} KiB not re-downloaded, {s.stores} stored, "
+            f"{s.evictions} evicted, {self._size / (1024 * 1024):.1f} MiB on disk"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Single-pass aggregation of triage issues into the tallies the charts draw.
+
+render_issue_charts.py used to walk the issue list once per chart (and three
+more times for the status counts). `aggregate` makes one sweep and fills every
+cube the report needs — status, status × age bucket, status × assignee,
+status × label, violations × label — plus the violation list for the table.
+The result is small, so it is also what gets shipped to the chart workers.
+
+The sweep accepts any iterable, so it can consume `triage_results.iter_issues`
+directly and never hold the roster in memory. When NumPy is installed the
+age bucketing is vectorized (`np.searchsorted` + `np.add.at`) over the day
+counts collected during the sweep; otherwise a `bisect` per issue is used.
+Both produce identical results. NumPy is only imported once there are days
+to bucket, so importing this module stays cheap.
+"""
+
+from __future__ import annotations
+
+import bisect
+import importlib.util
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable
+
+# Optional: pure-Python bucketing below when NumPy is not installed.
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+STATUSES = ("GOOD", "WARNING", "VIOLATION")
+AGE_BUCKETS = [(0, 1, "0-1d"), (2, 3, "2-3d"), (4, 7, "4-7d"),
+               (8, 14, "8-14d"), (15, 30, "15-30d"), (31, 10**9, "30d+")]
+# Inclusive upper bounds of every bucket but the last, for bisect/searchsorted.
+_UPPER = [hi for _, hi, _ in AGE_BUCKETS[:-1]]
+
+
+def _bucket_index(days: int) -> int:
+    if days < 0:
+        return len(AGE_BUCKETS) - 1
+    return bisect.bisect_left(_UPPER, days)
+
+
+@dataclass
+class IssueAggregates:
+    total: int = 0
+    # Exact `sla_status` matches, as shown in the overview table.
+    counts: dict = field(default_factory=lambda: {"total": 0, "GOOD": 0, "WARNING": 0, "VIOLATION": 0})
+    age_totals: list[int] = field(default_factory=lambda: [0] * len(AGE_BUCKETS))
+    # status -> per-bucket counts (charts treat a missing status as GOOD).
+    status_by_age: dict[str, list[int]] = field(
+        default_factory=lambda: {s: [0] * len(AGE_BUCKETS) for s in STATUSES}
+    )
+    assignee_totals: Counter = field(default_factory=Counter)  # includes "(unassigned)"
+    status_by_assignee: dict[str, Counter] = field(default_factory=dict)
+    label_totals: Counter = field(default_factory=Counter)
+    status_by_label: dict[str, Counter] = field(default_factory=dict)
+    violations_by_label: Counter = field(default_factory=Counter)  # includes "(no label)"
+    violations: list[dict] = field(default_factory=list)
+
+
+def aggregate(issues: Iterable[dict], use_numpy: bool | None = None) -> IssueAggregates:
+    """Build every chart/table tally in one pass over `issues`."""
+    vectorize = HAVE_NUMPY if use_numpy is None else (use_numpy and HAVE_NUMPY)
+    agg = IssueAggregates()
+    counts = agg.counts
+    status_codes = {s: i for i, s in enumerate(STATUSES)}
+    days_seen: list[int] = []
+    status_seen: list[int] = []  # index into STATUSES, or -1 for other statuses
+
+    for issue in issues:
+        agg.total += 1
+        raw_status = issue.get("sla_status")
+        if raw_status in STATUSES:
+            counts[raw_status] += 1
+        status = issue.get("sla_status", "GOOD")
+        days = issue.get("days_open", 0)
+        if vectorize:
+            days_seen.append(days)
+            status_seen.append(status_codes.get(status, -1))
+        else:
+            bucket = _bucket_index(days)
+            agg.age_totals[bucket] += 1
+            if status in agg.status_by_age:
+                agg.status_by_age[status][bucket] += 1
+
+        assignees = issue.get("assignees") or ["(unassigned)"]
+        for login in assignees:
+            agg.assignee_totals[login] += 1
+            agg.status_by_assignee.setdefault(login, Counter())[status] += 1
+
+        labels = issue.get("labels", [])
+        for lbl in labels:
+            agg.label_totals[lbl] += 1
+            agg.status_by_label.setdefault(lbl, Counter())[status] += 1
+
+        if raw_status == "VIOLATION":
+            agg.violations.append(issue)
+            for lbl in labels or ["(no label)"]:
+                agg.violations_by_label[lbl] += 1
+
+    counts["total"] = agg.total
+    if vectorize and days_seen:
+        import numpy as np
+
+        days_arr = np.asarray(days_seen)
+        buckets = np.searchsorted(np.asarray(_UPPER), days_arr, side="left")
+        buckets[days_arr < 0] = len(AGE_BUCKETS) - 1
+        agg.age_totals = np.bincount(buckets, minlength=len(AGE_BUCKETS)).tolist()
+        codes = np.asarray(status_seen)
+        cube = np.zeros((len(STATUSES), len(AGE_BUCKETS)), dtype=np.int64)
+        known = codes >= 0
+        np.add.at(cube, (codes[known], buckets[known]), 1)
+        agg.status_by_age = {s: cube[i].tolist() for i, s in enumerate(STATUSES)}
+    return agg
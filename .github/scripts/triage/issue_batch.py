@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Diff-based batch application of labels / assignees for the label-issue and assign-issue skills.
+
+`label_issue.py` and `assign_issue.py` used to take one issue per process,
+so labelling a day's issues paid Python start-up and a TLS handshake per
+issue. Both now also accept a JSON Lines batch file, one change per line:
+
+    {"issue_number": 123, "labels": ["bug", "area:ui"], "remove": ["needs-triage"]}
+    {"issue_number": 124, "assignees": ["alice", "@bob"]}
+
+Values may also be a comma-separated string. Repeated issue numbers are merged.
+The changes are applied concurrently over the shared pooled client
+(github_client.py), which already retries 5xx responses and waits out primary
+and secondary rate limits.
+
+Writes are diff-based: each issue's current values are compared with the
+request and only the delta is written — nothing at all when the issue is
+already up to date, so no-op writes stop spending the secondary (write) rate
+limit. The current state comes from an already-fetched triage-results file
+(`current`, no API calls) or else one GET per issue. Additions go out as one
+call per issue; removals as the API allows (one DELETE per label, one
+assignee DELETE for all removed logins) — never as a replace-all PUT, which
+would drop values another workflow added in the meantime. A removal is only
+skipped when the value is confirmed absent, so issues with removals are
+always re-read live rather than trusted to a possibly stale triage-results file.
+
+With `dry_run` nothing is written and each issue's diff is printed, with
+values already present marked as skipped.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import urllib.error
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from triage_results import iter_issues
+
+# Where each kind of value lives on an issue object from the REST API.
+_FIELD_KEY = {"labels": "name", "assignees": "login"}
+
+
+def parse_values(value: Any, field: str) -> list[str]:
+    """Normalize a list or comma-separated string; de-duplicates in order."""
+    items = value.split(",") if isinstance(value, str) else list(value or [])
+    seen: dict[str, str] = {}
+    for item in items:
+        item = str(item).strip()
+        if field == "assignees":
+            item = item.lstrip("@")
+        if item and item.casefold() not in seen:
+            seen[item.casefold()] = item
+    return list(seen.values())
+
+
+@dataclass
+class Change:
+    """Requested values to add and remove on one issue."""
+
+    number: int
+    add: list[str] = field(default_factory=list)
+    remove: list[str] = field(default_factory=list)
+
+    @property
+    def naive_writes(self) -> int:
+        """Writes the non-diffing scripts made: one add call, one DELETE per removed value."""
+        return (1 if self.add else 0) + len(self.remove)
+
+
+@dataclass
+class Delta:
+    """What actually has to change on one issue, given its current values."""
+
+    number: int
+    present: list[str]
+    add: list[str]
+    remove: list[str]
+    skipped: list[str]  # requested additions already on the issue
+
+    @property
+    def final(self) -> list[str]:
+        dropped = {value.casefold() for value in self.remove}
+        return [value for value in self.present if value.casefold() not in dropped] + self.add
+
+    def describe(self) -> str:
+        parts = [f"+{value}" for value in self.add] + [f"-{value}" for value in self.remove]
+        return " ".join(parts) or "(no change)"
+
+
+def read_batch(path: str, field: str) -> dict[int, Change]:
+    """Read `{issue_number, <field>, remove}` lines from `path` ("-" for stdin)."""
+    changes: dict[int, Change] = {}
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+                number = int(entry["issue_number"])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"{path}:{lineno}: expected {{\"issue_number\", \"{field}\"}}: {exc}") from exc
+            change = changes.setdefault(number, Change(number))
+            change.add = parse_values(change.add + parse_values(entry.get(field), field), field)
+            change.remove = parse_values(change.remove + parse_values(entry.get("remove"), field), field)
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+    return {number: change for number, change in changes.items() if change.add or change.remove}
+
+
+def load_current(path: str, owner: str, repo: str, field: str) -> dict[int, list[str]]:
+    """Current values per issue from a triage-results file (no API calls)."""
+    full_name = f"{owner}/{repo}".lower()
+    current = {}
+    for issue in iter_issues(path):
+        if str(issue.get("repo", full_name)).lower() != full_name:
+            continue
+        values = issue.get(field) or []
+        current[int(issue["issue_number"])] = [
+            value[_FIELD_KEY[field]] if isinstance(value, dict) else str(value) for value in values
+        ]
+    return current
+
+
+def current_values(client, owner: str, repo: str, numbers: list[int], field: str) -> dict[int, list[str] | Exception]:
+    """Fetch each issue's current labels/assignees concurrently."""
+    key = _FIELD_KEY[field]
+
+    def fetch(number: int) -> list[str]:
+        issue = client.get_json(f"/repos/{owner}/{repo}/issues/{number}")
+        return [item[key] for item in issue.get(field) or []]
+
+    return dict(zip(numbers, client.map(fetch, numbers, return_exceptions=True)))
+
+
+def split_present(wanted: list[str], present: list[str]) -> tuple[list[str], list[str]]:
+    """(values to add, values already on the issue); GitHub compares case-insensitively."""
+    have = {value.casefold() for value in present}
+    missing = [value for value in wanted if value.casefold() not in have]
+    already = [value for value in wanted if value.casefold() in have]
+    return missing, already
+
+
+def diff(change: Change, present: list[str]) -> Delta:
+    missing, already = split_present(change.add, present)
+    removing = {value.casefold() for value in change.remove} - {value.casefold() for value in change.add}
+    remove = [value for value in present if value.casefold() in removing]
+    return Delta(change.number, present, missing, remove, already)
+
+
+def plan(
+    client, owner: str, repo: str, changes: dict[int, Change], field: str, current: dict[int, list[str]] | None = None
+) -> dict[int, Delta | Exception]:
+    """Diff every change against current state; reads live state only where needed."""
+    current = current or {}
+    live = [n for n, change in changes.items() if n not in current or change.remove]
+    fetched = current_values(client, owner, repo, live, field) if live else {}
+    deltas: dict[int, Delta | Exception] = {}
+    for number, change in changes.items():
+        present = fetched.get(number, current.get(number))
+        deltas[number] = present if isinstance(present, Exception) else diff(change, present)
+    return deltas
+
+
+@dataclass
+class Outcome:
+    number: int
+    delta: Delta | None
+    writes: int = 0
+    error: Exception | None = None
+
+
+def describe_error(exc: Exception) -> str:
+    if isinstance(exc, urllib.error.HTTPError):
+        return f"HTTP {exc.code} {str(exc.msg)[:200]}"
+    return str(exc)
+
+
+def apply_deltas(
+    client, deltas: dict[int, Delta | Exception], apply: Callable[..., int], dry_run: bool = False
+) -> list[Outcome]:
+    """Write every non-empty delta concurrently.
+
+    `apply(delta, write=...)` returns the number of API writes the delta takes
+    and only performs them when `write` is true, so a dry run counts them too.
+    """
+
+    def run(number: int) -> Outcome:
+        delta = deltas[number]
+        if isinstance(delta, Exception):
+            return Outcome(number, None, error=delta)
+        if not (delta.add or delta.remove):
+            return Outcome(number, delta)
+        try:
+            return Outcome(number, delta, writes=apply(delta, write=not dry_run))
+        except Exception as exc:  # noqa: BLE001 - reported per issue
+            return Outcome(number, delta, error=exc)
+
+    return client.map(run, list(deltas))
+
+
+def write_summary(changes: dict[int, Change], outcomes: list[Outcome], dry_run: bool = False) -> str:
+    """One line comparing the writes made with what the non-diffing scripts would have made."""
+    naive = sum(change.naive_writes for change in changes.values())
+    made = sum(o.writes for o in outcomes)
+    noop = sum(1 for o in outcomes if o.delta is not None and not (o.delta.add or o.delta.remove))
+    verb = "would be made" if dry_run else "made"
+    return (
+        f"API writes: {made} {verb}, {max(0, naive - made)} avoided "
+        f"({noop} issue(s) already up to date)"
+    )
+
+
+def run_batch(
+    client,
+    owner: str,
+    repo: str,
+    changes: dict[int, Change],
+    field: str,
+    apply: Callable[..., int],
+    dry_run: bool = False,
+    current: dict[int, list[str]] | None = None,
+) -> int:
+    """Diff, then apply (or preview) every change; prints one line per issue. Returns an exit code."""
+    if not changes:
+        print(f"No {field} to apply.")
+        return 0
+    start = time.perf_counter()
+    outcomes = apply_deltas(client, plan(client, owner, repo, changes, field, current), apply, dry_run)
+    for o in outcomes:
+        if o.error is not None:
+            print(f"❌ #{o.number}: {describe_error(o.error)}", file=sys.stderr)
+            continue
+        skipped = f"  [already present, skipped: {', '.join(o.delta.skipped)}]" if o.delta.skipped else ""
+        print(f"{'' if dry_run else '✅ '}#{o.number}: {o.delta.describe()}{skipped}")
+    failed = sum(1 for o in outcomes if o.error is not None)
+    if dry_run:
+        print(f"Dry run: {len(outcomes)} issue(s) checked, nothing written.")
+    else:
+        print(
+            f"Applied {field} to {len(outcomes) - failed}/{len(outcomes)} issue(s) "
+            f"in {time.perf_counter() - start:.1f}s" + (f", {failed} failed" if failed else "")
+        )
+    print(write_summary(changes, outcomes, dry_run))
+    return 1 if failed else 0
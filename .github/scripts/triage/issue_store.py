@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Local snapshot store of normalized issues for incremental fetches.
+
+`fetch_issues.py --mode sync` keeps one SQLite file of the normalized issue
+dicts (the same shape written to triage-results.json), keyed by
+`repo` / `issue_number`, plus a per-repo high-water mark on `updatedAt`. Each
+sync only asks the Search API for issues updated since that mark, upserts the
+open ones, drops the ones that were closed, and then materializes the output
+from the store instead of re-paging every issue from scratch.
+
+The delta can't see issues that leave the repository rather than close —
+deleted, transferred, or converted to a discussion — so those would stay
+"open" in the store forever. A full reconcile (`replace`) re-reads every open
+issue and replaces the repo's rows wholesale; `fetch_issues.py` runs one on
+the first sync, whenever the last one is older than the reconcile interval,
+and on request (`--full-sync`).
+
+Fields that can change without moving an issue's `updatedAt` are not stored:
+a stored copy would only be refreshed by an unrelated edit. `has_parent` is
+one — linking a sub-issue doesn't touch the child — so issues read back from
+the store leave it out and the SLA check resolves parent links itself
+(through its cached REST lookups) rather than trusting a stale `False`.
+
+Environment variables:
+  ISSUELENS_ISSUE_STORE            Path of the store file.
+                                   Default: ~/.cache/issuelens/issues.sqlite
+  ISSUELENS_ISSUE_STORE_RECONCILE  Days between full reconciles (default 30),
+                                   or "off" to reconcile only on request.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "issues.sqlite")
+# Not refreshed by the `updated:>=` delta, so never persisted (see above).
+UNSTORED_FIELDS = ("has_parent",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    repo TEXT NOT NULL,
+    issue_number INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repo, issue_number)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo TEXT PRIMARY KEY,
+    high_water TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reconcile_state (
+    repo TEXT PRIMARY KEY,
+    reconciled_at TEXT NOT NULL
+);
+"""
+DEFAULT_RECONCILE_DAYS = 30.0
+
+
+def default_path() -> str:
+    return os.environ.get("ISSUELENS_ISSUE_STORE", "").strip() or DEFAULT_PATH
+
+
+def reconcile_interval() -> timedelta | None:
+    """How often a full reconcile is due, or None when only run on request."""
+    value = os.environ.get("ISSUELENS_ISSUE_STORE_RECONCILE", "").strip()
+    if value.lower() in ("off", "0", "false", "none"):
+        return None
+    try:
+        days = float(value) if value else DEFAULT_RECONCILE_DAYS
+    except ValueError:
+        days = DEFAULT_RECONCILE_DAYS
+    return timedelta(days=days)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class IssueStore:
+    """Open issues per repo, with the `updatedAt` high-water mark of the last sync."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+
+    def high_water(self, repo: str) -> str | None:
+        row = self._db.execute(
+            "SELECT high_water FROM sync_state WHERE repo = ?", (repo,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def reconcile_due(self, repo: str, interval: timedelta | None) -> bool:
+        """True when the repo was never reconciled or the last one is older than `interval`."""
+        row = self._db.execute(
+            "SELECT reconciled_at FROM reconcile_state WHERE repo = ?", (repo,)
+        ).fetchone()
+        if row is None:
+            return True
+        if interval is None:
+            return False
+        last = datetime.fromisoformat(row[0].replace("Z", "+00:00"))
+        return datetime.now(timezone.utc) - last >= interval
+
+    def _insert(self, repo: str, issue: dict) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)",
+            (
+                repo,
+                issue["issue_number"],
+                issue.get("createdAt", ""),
+                issue.get("updatedAt", ""),
+                json.dumps({k: v for k, v in issue.items() if k not in UNSTORED_FIELDS}),
+            ),
+        )
+
+    def replace(self, repo: str, issues: list[dict]) -> tuple[int, int]:
+        """Replace the repo's rows with a complete list of its open issues.
+
+        Also resets the high-water mark to the newest `updatedAt` seen.
+        Returns (stored, dropped), where dropped counts rows that are no
+        longer open in any form — closed, deleted, transferred or converted.
+        """
+        before = {row[0] for row in self._db.execute("SELECT issue_number FROM issues WHERE repo = ?", (repo,))}
+        high_water = max((issue.get("updatedAt", "") for issue in issues), default="")
+        now = _now()
+        with self._db:
+            self._db.execute("DELETE FROM issues WHERE repo = ?", (repo,))
+            for issue in issues:
+                self._insert(repo, issue)
+            if high_water:
+                self._db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (repo, high_water, now))
+            self._db.execute("INSERT OR REPLACE INTO reconcile_state VALUES (?, ?)", (repo, now))
+        return len(issues), len(before - {issue["issue_number"] for issue in issues})
+
+    def apply(self, repo: str, changes: list[tuple[dict, str]]) -> tuple[int, int]:
+        """Upsert open issues and delete closed ones; advance the high-water mark.
+
+        `changes` holds (normalized issue, state) pairs from one delta query.
+        Returns (upserted, removed).
+        """
+        upserted = removed = 0
+        high_water = self.high_water(repo) or ""
+        with self._db:
+            for issue, state in changes:
+                if state == "open":
+                    self._insert(repo, issue)
+                    upserted += 1
+                else:
+                    cur = self._db.execute(
+                        "DELETE FROM issues WHERE repo = ? AND issue_number = ?",
+                        (repo, issue["issue_number"]),
+                    )
+                    removed += cur.rowcount
+                # ISO-8601 UTC timestamps sort lexicographically.
+                high_water = max(high_water, issue.get("updatedAt", ""))
+            if high_water:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                    (repo, high_water, _now()),
+                )
+        return upserted, removed
+
+    def open_issues(self, repo: str, created_since: str | None = None) -> list[dict]:
+        """Materialize the stored open issues, optionally only those created on/after a date."""
+        query = "SELECT data FROM issues WHERE repo = ?"
+        params: list = [repo]
+        if created_since:
+            query += " AND created_at >= ?"
+            params.append(created_since)
+        query += " ORDER BY issue_number"
+        issues = [json.loads(row[0]) for row in self._db.execute(query, params)]
+        for issue in issues:  # rows written before a field was unstored
+            for key in UNSTORED_FIELDS:
+                issue.pop(key, None)
+        return issues
+
+    def count(self, repo: str) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM issues WHERE repo = ?", (repo,)).fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
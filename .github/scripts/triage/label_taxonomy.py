@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Cached, versioned label taxonomy per repository, with O(1) normalized lookup.
+
+Every label-issue run used to re-discover the target repository's label set
+(a fresh label-list read, then matching names by eye). This module keeps one
+JSON artifact per repository — every label with its colour and description
+plus its normalized aliases — and refreshes it only when GitHub says the
+label list changed:
+
+  * The label list is read page by page (100 per page) and each page's ETag
+    is stored with the artifact. On later runs every page is revalidated with
+    `If-None-Match`; when all answer `304 Not Modified` (free against the rate
+    limit) the cached artifact is used as is. Any changed page triggers a full
+    re-read. A trailing short or empty page is part of the set, so a label
+    added past a full last page is noticed too.
+  * The artifact carries `format` (bump when the layout changes) and
+    `version`, a digest of the labels themselves, so consumers can tell
+    whether the taxonomy they saw has changed.
+
+Names are normalized with `normalize_label` — the same rule the SLA checks use
+(case-insensitive, `-` and spaces equivalent) — plus collapsed whitespace and
+no spaces around `:` / `/`, so "Needs-More-Info", "needs more info" and
+"area : ui" resolve to the labels "needs more info" and "area:ui".
+`LabelTaxonomy.lookup` is a dict lookup; `label_group` / `label_in_group`
+give the SLA scripts the same matching for their fixed label groups.
+
+Environment variables:
+  ISSUELENS_LABEL_TAXONOMY   Directory for taxonomy files, or "off" to always
+                             fetch without caching.
+                             Default: ~/.cache/issuelens/labels
+
+Usage:
+    from label_taxonomy import load_taxonomy
+
+    taxonomy = load_taxonomy("microsoft/vscode", token)
+    taxonomy.canonical("Needs-More-Info")      # -> "needs more info"
+
+    python label_taxonomy.py microsoft/vscode --output labels.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "labels")
+FORMAT = 1
+PER_PAGE = 100
+
+_SPACES = re.compile(r"\s+")
+_SEPARATOR = re.compile(r"\s*([:/])\s*")
+
+
+def normalize_label(label: str) -> str:
+    """Lower-case and collapse '-' / spaces so variations compare equal."""
+    return label.strip().lower().replace("-", " ")
+
+
+def label_key(label: str) -> str:
+    """Lookup key: `normalize_label`, whitespace collapsed, no spaces around ':' / '/'."""
+    return _SEPARATOR.sub(r"\1", _SPACES.sub(" ", normalize_label(label)))
+
+
+def label_group(names: Iterable[str]) -> frozenset[str]:
+    """Pre-normalized label group for repeated `label_in_group` checks."""
+    return frozenset(label_key(name) for name in names)
+
+
+def label_in_group(labels: Iterable[str], group: frozenset[str] | Iterable[str]) -> bool:
+    if not isinstance(group, frozenset):
+        group = label_group(group)
+    return any(label_key(label) in group for label in labels)
+
+
+@dataclass(frozen=True)
+class Label:
+    name: str
+    color: str = ""
+    description: str = ""
+    aliases: tuple[str, ...] = ()
+
+    @classmethod
+    def from_api(cls, item: dict) -> "Label":
+        name = item["name"]
+        aliases = tuple(sorted({normalize_label(name), label_key(name)}))
+        return cls(name, item.get("color") or "", item.get("description") or "", aliases)
+
+
+@dataclass
+class LabelTaxonomy:
+    repo: str
+    labels: list[Label]
+    etags: list[str] = field(default_factory=list)  # one per label-list page
+    fetched_at: float = 0.0
+    # How the last load went, for logging: "fetched", "revalidated", "cached".
+    source: str = "cached"
+    requests: int = 0
+
+    def __post_init__(self) -> None:
+        self._by_name = {label.name.casefold(): label for label in self.labels}
+        self._by_key: dict[str, Label] = {}
+        for label in self.labels:
+            for alias in label.aliases:
+                self._by_key.setdefault(alias, label)
+
+    @property
+    def version(self) -> str:
+        blob = json.dumps([[l.name, l.color, l.description] for l in self.labels], separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+    def lookup(self, label: str) -> Label | None:
+        """The repository label `label` refers to, exact name first, then by alias."""
+        return self._by_name.get(label.strip().casefold()) or self._by_key.get(label_key(label))
+
+    def canonical(self, label: str) -> str | None:
+        found = self.lookup(label)
+        return found.name if found else None
+
+    def __contains__(self, label: str) -> bool:
+        return self.lookup(label) is not None
+
+    def __iter__(self) -> Iterator[Label]:
+        return iter(self.labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": FORMAT,
+            "repo": self.repo,
+            "version": self.version,
+            "fetched_at": self.fetched_at,
+            "etags": self.etags,
+            "labels": [
+                {"name": l.name, "color": l.color, "description": l.description, "aliases": list(l.aliases)}
+                for l in self.labels
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LabelTaxonomy":
+        labels = [
+            Label(item["name"], item.get("color", ""), item.get("description", ""), tuple(item.get("aliases", ())))
+            for item in data["labels"]
+        ]
+        return cls(data["repo"], labels, list(data.get("etags", [])), data.get("fetched_at", 0.0))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=1, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def summary(self) -> str:
+        how = {
+            "fetched": f"fetched with {self.requests} request(s)",
+            "revalidated": f"unchanged, revalidated with {self.requests} conditional request(s)",
+            "cached": "from cache, not revalidated",
+        }[self.source]
+        return f"Label taxonomy for {self.repo}: {len(self)} label(s), version {self.version} ({how})"
+
+
+def cache_dir() -> str | None:
+    directory = os.environ.get("ISSUELENS_LABEL_TAXONOMY", DEFAULT_DIR).strip()
+    if not directory or directory.lower() in ("off", "0", "false", "none"):
+        return None
+    return directory
+
+
+def cache_path(repo: str, directory: str) -> str:
+    return os.path.join(directory, repo.replace("/", "__") + ".json")
+
+
+def _read_cached(path: str) -> LabelTaxonomy | None:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != FORMAT:
+        return None
+    return LabelTaxonomy.from_dict(data)
+
+
+def _page(repo: str, number: int) -> str:
+    return f"/repos/{repo}/labels?per_page={PER_PAGE}&page={number}"
+
+
+def _unchanged(client, cached: LabelTaxonomy) -> tuple[bool, int]:
+    """Revalidate every stored page; (all pages 304, requests made)."""
+    if not cached.etags:
+        return False, 0
+    for number, etag in enumerate(cached.etags, 1):
+        resp = client.request("GET", _page(cached.repo, number), headers={"If-None-Match": etag}, allow=(304,))
+        if resp.status != 304:
+            return False, number
+    return True, len(cached.etags)
+
+
+def fetch_taxonomy(client, repo: str) -> LabelTaxonomy:
+    """Read the full label list, recording each page's ETag."""
+    labels: list[Label] = []
+    etags: list[str] = []
+    number = 0
+    while True:
+        number += 1
+        # Explicit headers bypass the generic HTTP cache: we keep our own ETags.
+        resp = client.request("GET", _page(repo, number), headers={"Accept": "application/vnd.github+json"})
+        items = resp.json() or []
+        labels.extend(Label.from_api(item) for item in items)
+        etags.append(resp.headers.get("etag", ""))
+        if len(items) < PER_PAGE:
+            break
+    if not all(etags):
+        etags = []  # no validators: always re-read next time
+    return LabelTaxonomy(repo, labels, etags, time.time(), source="fetched", requests=number)
+
+
+def load_taxonomy(repo: str, token: str | None = None, client=None, refresh: bool = True) -> LabelTaxonomy:
+    """The repository's taxonomy, from cache when its label list is unchanged.
+
+    `refresh=False` trusts the cached artifact without any request (it is
+    still fetched when there is none).
+    """
+    if client is None:
+        from github_client import shared_client
+
+        client = shared_client(token)
+    directory = cache_dir()
+    path = cache_path(repo, directory) if directory else None
+    cached = _read_cached(path) if path else None
+    if cached is not None and cached.repo.lower() == repo.lower():
+        if not refresh:
+            return cached
+        unchanged, requests = _unchanged(client, cached)
+        if unchanged:
+            cached.source, cached.requests = "revalidated", requests
+            return cached
+    taxonomy = fetch_taxonomy(client, repo)
+    if path:
+        try:
+            taxonomy.save(path)
+        except OSError as exc:
+            print(f"Label taxonomy cache write failed ({path}): {exc}", file=sys.stderr)
+    return taxonomy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print or export a repository's cached label taxonomy.")
+    parser.add_argument("repo", help="owner/repo")
+    parser.add_argument("--output", help="Write the taxonomy artifact (JSON) to this path")
+    parser.add_argument("--offline", action="store_true", help="Use the cached taxonomy without revalidating")
+    parser.add_argument("--lookup", nargs="*", default=[], metavar="LABEL", help="Resolve label spellings")
+    args = parser.parse_args()
+
+    token = os.environ.get("GITHUB_ACCESS_TOKEN") or os.environ.get("GITHUB_PAT") or os.environ.get("GH_TOKEN")
+    taxonomy = load_taxonomy(args.repo, token, refresh=not args.offline)
+    print(taxonomy.summary(), file=sys.stderr)
+    for label in args.lookup:
+        print(f"{label} -> {taxonomy.canonical(label) or '(no such label)'}")
+    if args.output:
+        taxonomy.save(args.output)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    elif not args.lookup:
+        for label in taxonomy:
+            print(f"{label.name}\t#{label.color}\t{label.description}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Deferred imports for the charting scripts, and an import-time benchmark.
+
+matplotlib.pyplot (with NumPy behind it) costs a few hundred milliseconds to
+import on a cold runner. The chart scripts used to pay that at module import,
+even for `--help`, argument errors, empty inputs and runs where every chart
+came out of the chart cache. `lazy_pyplot()` / `lazy_module()` return
+stand-ins that import the real module on first attribute access, so chart
+code keeps writing `plt.subplots(...)` and the import happens only when the
+first chart is actually drawn.
+
+`import_time_report(script)` runs the script's module body under
+`python -X importtime` in a subprocess and prints a short summary (total,
+heaviest top-level imports, whether matplotlib/NumPy were loaded). The chart
+scripts expose it as `--import-time`.
+
+Used by render_issue_charts.py and the marketplace render_email_charts.py /
+visualize_reviews.py scripts (which import eagerly when this module is absent).
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import subprocess
+import sys
+import threading
+from typing import Callable
+
+PLOTTING_HINT = "matplotlib and numpy are required. Install with: pip install matplotlib numpy"
+# Modules whose presence the benchmark reports explicitly.
+HEAVY_MODULES = ("matplotlib", "matplotlib.pyplot", "numpy", "PIL")
+
+
+class LazyModule:
+    """Module stand-in that runs `loader` on first attribute access."""
+
+    def __init__(self, loader: Callable[[], object], name: str, hint: str = PLOTTING_HINT) -> None:
+        self._loader = loader
+        self._name = name
+        self._hint = hint
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    try:
+                        self._module = self._loader()
+                    except ImportError as exc:
+                        # Same outcome as the old import-time check, just later.
+                        print(f"{self._hint} ({exc})", file=sys.stderr)
+                        sys.exit(1)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str, hint: str = PLOTTING_HINT) -> LazyModule:
+    return LazyModule(lambda: importlib.import_module(name), name, hint)
+
+
+def lazy_pyplot(style: dict | None = None, hint: str = PLOTTING_HINT) -> LazyModule:
+    """matplotlib.pyplot on the Agg backend, with `style` applied to rcParams on load."""
+
+    def load():
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        if style:
+            plt.rcParams.update(style)
+        return plt
+
+    return LazyModule(load, "matplotlib.pyplot", hint)
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) per `-X importtime` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def import_time_report(script: str, top: int = 10) -> int:
+    """Benchmark importing `script` (module body only, `main()` not run)."""
+    script = os.path.abspath(script)
+    code = (
+        "import runpy, sys; "
+        f"sys.path.insert(0, {os.path.dirname(script)!r}); sys.argv = [{script!r}]; "
+        f"runpy.run_path({script!r}, run_name='__importtime__')"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+    rows = _parse_importtime(proc.stderr)
+    if proc.returncode != 0 or not rows:
+        print(f"Import benchmark failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}", file=sys.stderr)
+        return proc.returncode or 1
+    total_ms = sum(r[1] for r in rows) / 1000
+    print(f"Import time for {os.path.basename(script)}: {total_ms:.1f} ms across {len(rows)} module(s)")
+    print("  Heaviest top-level imports (cumulative):")
+    for name, _, cumulative, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    seen = {r[0] for r in rows}
+    print("  " + ", ".join(f"{m}: {'imported' if m in seen else 'not imported'}" for m in HEAVY_MODULES))
+    return 0
@@ -15,9 +15,26 @@ file in the verdicts directory, and copies `sla_status`, `days_open` and
 `sla_details` onto the matching roster entry. Issues without a usable verdict
 default to GOOD so they are never mis-reported as violations.
 
+Verdicts may arrive as:
+  * a directory of `sla-*.json` files (read concurrently on a thread pool),
+  * one consolidated file — a JSON array or JSON Lines of verdict objects,
+  * a `.tar` / `.tar.gz` / `.tgz` / `.zip` artifact holding any of the above
+    (every `.json` member is read; a member holding an array contributes
+    each of its elements).
+
+An archive that holds files, or a consolidated file that is unparseable or
+holds records, but yields no usable verdict is an error rather than an
+all-GOOD roster: that almost always means the artifact layout or the verdict
+shape changed.
+
+The roster is streamed through (see triage_results.py), and a timing/count
+summary is printed at the end.
+
 Usage:
     python merge_sla.py --roster triage-results.json \
         --verdicts-dir sla-verdicts --output triage-results.json
+    python merge_sla.py --roster triage-results.json \
+        --verdicts sla-verdicts.tgz --output triage-results.json
 """
 
 import argparse
@@ -25,75 +42,238 @@ import glob
 import json
 import os
 import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from triage_results import IssueWriter, iter_issues
 
 
 VALID_STATUSES = {"GOOD", "WARNING", "VIOLATION"}
+VERDICT_PATTERN = "sla-*.json"
+DEFAULT_WORKERS = 16
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+VERDICT_SUFFIXES = (".json", ".jsonl", ".ndjson")
+
+
+class VerdictsError(Exception):
+    """The verdicts source exists but nothing usable could be read from it."""
+
+
+def _coerce(data, origin: str) -> tuple[int, dict] | None:
+    """Validate one raw verdict; returns (issue_number, verdict) or None to skip."""
+    if not isinstance(data, dict):
+        print(f"  Skipping non-object verdict in {origin}", file=sys.stderr)
+        return None
+
+    number = data.get("issue_number")
+    if number is None:
+        print(f"  Skipping verdict without issue_number: {origin}", file=sys.stderr)
+        return None
+
+    status = str(data.get("sla_status", "")).upper()
+    if status not in VALID_STATUSES:
+        print(f"  Verdict for #{number} has invalid status '{status}'; defaulting to GOOD.")
+        status = "GOOD"
+
+    return int(number), {
+        "sla_status": status,
+        "days_open": int(data.get("days_open") or 0),
+        "sla_details": str(data.get("sla_details", "")),
+    }
+
+
+def _read_verdict_file(path: str):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"  Skipping unreadable verdict {path}: {exc}", file=sys.stderr)
+        return None
+
+
+def _from_directory(verdicts_dir: str, workers: int):
+    paths = sorted(glob.glob(os.path.join(verdicts_dir, VERDICT_PATTERN)))
+    # Per-file open/read dominates for thousands of small files, so overlap it.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for path, data in zip(paths, pool.map(_read_verdict_file, paths)):
+            if data is not None:
+                yield data, path
+
+
+def _from_consolidated(path: str):
+    # A parse error propagates to load_verdicts, which keeps what was read
+    # before it.
+    for lineno, data in enumerate(iter_issues(path), 1):
+        yield data, f"{path}[{lineno}]"
+
 
+def _parse_member(name: str, raw: bytes):
+    """Yield (data, origin) for one archive member.
 
-def load_verdicts(verdicts_dir: str) -> dict[int, dict]:
+    A member is a single verdict, a consolidated JSON array, or JSON Lines —
+    the same shapes accepted outside an archive.
+    """
+    try:
+        text = raw.decode("utf-8")
+        if name.endswith((".jsonl", ".ndjson")):
+            for lineno, line in enumerate(text.splitlines(), 1):
+                if line.strip():
+                    yield json.loads(line), f"{name}:{lineno}"
+            return
+        data = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        print(f"  Skipping unreadable verdict {name}: {exc}", file=sys.stderr)
+        return
+    if isinstance(data, list):
+        for index, item in enumerate(data, 1):
+            yield item, f"{name}[{index}]"
+    else:
+        yield data, name
+
+
+def _wanted_member(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith(".") and base.endswith(VERDICT_SUFFIXES)
+
+
+def _archive_file_count(path: str) -> int:
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            return sum(not info.is_dir() for info in zf.infolist())
+    with tarfile.open(path, "r:*") as tf:
+        return sum(member.isfile() for member in tf)
+
+
+def _from_archive(path: str):
+    # Archive members are read in order: a compressed tar can only be read
+    # sequentially, and decompression holds the GIL anyway.
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if _wanted_member(name):
+                    yield from _parse_member(name, zf.read(name))
+        return
+    with tarfile.open(path, "r:*") as tf:
+        for member in tf:
+            if member.isfile() and _wanted_member(member.name):
+                fh = tf.extractfile(member)
+                if fh is not None:
+                    yield from _parse_member(member.name, fh.read())
+
+
+def verdict_source_kind(source: str) -> str:
+    if os.path.isdir(source):
+        return "directory"
+    if source.endswith(ARCHIVE_SUFFIXES):
+        return "archive"
+    return "consolidated"
+
+
+def load_verdicts(source: str, workers: int = DEFAULT_WORKERS) -> dict[int, dict]:
+    """Load verdicts from a directory, a consolidated JSON/JSONL file, or an archive.
+
+    Later verdicts for the same issue override earlier ones. Raises
+    VerdictsError when a non-empty archive, or a consolidated file that is
+    unparseable or holds records, yields no verdict at all.
+    """
     verdicts: dict[int, dict] = {}
-    if not os.path.isdir(verdicts_dir):
-        print(f"Verdicts dir '{verdicts_dir}' not found; treating all issues as GOOD.")
+    if not os.path.exists(source):
+        print(f"Verdicts source '{source}' not found; treating all issues as GOOD.")
         return verdicts
 
-    for path in sorted(glob.glob(os.path.join(verdicts_dir, "sla-*.json"))):
+    kind = verdict_source_kind(source)
+    if kind == "directory":
+        raw = _from_directory(source, workers)
+    elif kind == "archive":
+        raw = _from_archive(source)
+    else:
+        raw = _from_consolidated(source)
+
+    records = 0
+    unreadable = False
+    try:
+        for data, origin in raw:
+            records += 1
+            parsed = _coerce(data, origin)
+            if parsed is not None:
+                verdicts[parsed[0]] = parsed[1]
+    except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as exc:
+        print(f"  Stopped reading verdicts from {source}: {exc}", file=sys.stderr)
+        unreadable = True
+
+    # An empty file or an empty array is a run with no verdicts; anything else
+    # that produced none is a broken or mis-shaped file.
+    if kind == "consolidated" and not verdicts and (records or unreadable) and os.path.getsize(source):
+        raise VerdictsError(
+            f"{source} is not empty but holds no usable verdict; expected "
+            "a JSON array or JSON Lines of verdict objects"
+        )
+
+    if kind == "archive" and not verdicts:
         try:
-            with open(path, encoding="utf-8") as fh:
-                data = json.load(fh)
-        except (json.JSONDecodeError, OSError) as exc:
-            print(f"  Skipping unreadable verdict {path}: {exc}", file=sys.stderr)
-            continue
-
-        number = data.get("issue_number")
-        if number is None:
-            print(f"  Skipping verdict without issue_number: {path}", file=sys.stderr)
-            continue
-
-        status = str(data.get("sla_status", "")).upper()
-        if status not in VALID_STATUSES:
-            print(f"  Verdict for #{number} has invalid status '{status}'; defaulting to GOOD.")
-            status = "GOOD"
-
-        verdicts[int(number)] = {
-            "sla_status": status,
-            "days_open": int(data.get("days_open") or 0),
-            "sla_details": str(data.get("sla_details", "")),
-        }
+            files = _archive_file_count(source)
+        except (OSError, tarfile.TarError, zipfile.BadZipFile):
+            files = 0
+        if files:
+            raise VerdictsError(
+                f"{source} holds {files} file(s) but no usable verdict; expected "
+                f"{VERDICT_PATTERN} files or a JSON array / JSON Lines of verdict objects"
+            )
     return verdicts
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--roster", required=True, help="Roster JSON from the prepare stage.")
-    parser.add_argument("--verdicts-dir", required=True, help="Directory with sla-*.json files.")
-    parser.add_argument("--output", required=True, help="Where to write the merged JSON.")
+    parser.add_argument("--roster", required=True, help="Roster (JSON array or JSON Lines) from the prepare stage.")
+    parser.add_argument(
+        "--verdicts",
+        "--verdicts-dir",
+        dest="verdicts",
+        required=True,
+        help="Directory with sla-*.json files, a consolidated JSON/JSONL file, or a tar/zip of either.",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Threads for directory loads.")
+    parser.add_argument("--output", required=True, help="Where to write the merged roster (.jsonl for JSON Lines).")
     args = parser.parse_args()
 
-    with open(args.roster, encoding="utf-8") as fh:
-        issues = json.load(fh)
+    start = time.perf_counter()
+    try:
+        verdicts = load_verdicts(args.verdicts, args.workers)
+    except VerdictsError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
 
-    verdicts = load_verdicts(args.verdicts_dir)
+    # Stream the roster through: each issue is read, merged and written out
+    # before the next is loaded. The writer replaces --output only once it is
+    # complete, so --roster and --output may be the same file.
+    merged = violations = 0
+    with IssueWriter(args.output) as out:
+        for issue in iter_issues(args.roster):
+            verdict = verdicts.get(issue.get("issue_number"))
+            if verdict:
+                issue.update(verdict)
+                merged += 1
+            else:
+                # Safe default — never escalate an un-evaluated issue to a violation.
+                issue.setdefault("sla_status", "GOOD")
+                issue.setdefault("days_open", 0)
+                issue.setdefault("sla_details", "No SLA verdict produced.")
+            violations += issue.get("sla_status") == "VIOLATION"
+            out.write(issue)
+    done = time.perf_counter()
 
-    merged = 0
-    for issue in issues:
-        verdict = verdicts.get(issue.get("issue_number"))
-        if verdict:
-            issue.update(verdict)
-            merged += 1
-        else:
-            # Safe default — never escalate an un-evaluated issue to a violation.
-            issue.setdefault("sla_status", "GOOD")
-            issue.setdefault("days_open", 0)
-            issue.setdefault("sla_details", "No SLA verdict produced.")
-
-    with open(args.output, "w", encoding="utf-8") as fh:
-        json.dump(issues, fh, indent=2)
-
-    violations = sum(1 for i in issues if i.get("sla_status") == "VIOLATION")
     print(
-        f"Merged {merged}/{len(issues)} verdict(s); "
+        f"Merged {merged}/{out.count} verdict(s); "
         f"{violations} VIOLATION(s) in the final roster -> {args.output}"
     )
+    print(
+        f"Loaded {len(verdicts)} verdict(s) from {verdict_source_kind(args.verdicts)} "
+        f"in {loaded - start:.2f}s; merged {out.count} issue(s) in {done - loaded:.2f}s "
+        f"({max(0, len(verdicts) - merged)} verdict(s) matched no roster issue)"
+    )
     return 0
 
 
@@ -16,6 +16,22 @@ Environment variables:
   MAILING_URL                Logic App endpoint for emails.
   REPORT_RECIPIENTS          Comma/semicolon-separated email recipients.
   IDS                        JSON array of {"github-id": ..., "email": ...}.
+  NOTIFY_CONCURRENCY         Personal notifications in flight at once (default 8).
+  ISSUELENS_NOTIFY_OUTBOX    Outbox file for cross-run dedup, or "off"
+                             (see notify_outbox.py).
+
+Personal notifications are dispatched concurrently (bounded by --concurrency)
+and retried with jittered exponential backoff on 429/5xx (honouring
+Retry-After) and on requests that never reached the server. A timeout after
+the request was sent is logged as unknown and not retried, since the Logic App
+may already have posted the message. With --delivery-log each attempt's outcome is appended to a JSON Lines file; adding
+--resume on a re-run only sends to recipients that were not delivered.
+
+Every send goes through a persistent outbox (notify_outbox.py): a message whose
+content hash was already delivered to the same recipient within --dedup-days
+(default 2: today and yesterday) is suppressed, so re-running a workflow does
+not ping anyone twice and an unchanged violation set is not re-sent the next
+day. The summary email is only suppressed on a same-day re-run.
 
 Usage:
     python notify.py --input triage-results.json \
@@ -24,30 +40,81 @@ Usage:
 """
 
 import argparse
+import asyncio
 import html
 import json
 import os
+import random
 import sys
+import time
 import urllib.error
 import urllib.request
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+
+from html_report import ENVELOPE_RESERVE, HtmlWriter, link
+from notify_outbox import DEFAULT_DEDUP_DAYS, NotificationOutbox, content_hash
+from triage_results import iter_issues
 
 
 # --------------------------------------------------------------------------- #
 # HTTP helper
 # --------------------------------------------------------------------------- #
-def post_json(url: str, payload: dict) -> int:
-    data = json.dumps(payload).encode("utf-8")
+class PostResult(NamedTuple):
+    """Outcome of one POST.
+
+    `status` is the HTTP status, or 0 when no response arrived. `sent` is False
+    only when the request never left this machine (DNS, connection refused or
+    reset while connecting/sending), which is the one transport failure that is
+    safe to retry: after a timeout the Logic App may well have run.
+    `retry_after` is the server's Retry-After in seconds, if it sent one.
+    """
+
+    status: int
+    sent: bool = True
+    retry_after: float | None = None
+
+
+def _retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def post(url: str, payload: dict | bytes) -> PostResult:
+    data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
     req = urllib.request.Request(url, data=data, method="POST")
     req.add_header("Content-Type", "application/json")
     try:
         with urllib.request.urlopen(req, timeout=30) as resp:
-            return resp.status
+            return PostResult(resp.status)
     except urllib.error.HTTPError as exc:
-        return exc.code
+        return PostResult(exc.code, retry_after=_retry_after(exc.headers.get("Retry-After")))
+    except urllib.error.URLError as exc:
+        # urlopen raises URLError only while connecting and sending; the
+        # request did not reach the server.
+        print(f"  POST failed: {exc.reason}", file=sys.stderr)
+        return PostResult(0, sent=False)
     except Exception as exc:  # noqa: BLE001 - report and continue
-        print(f"  POST failed: {exc}", file=sys.stderr)
-        return 0
+        # Timeout or dropped connection while awaiting the response: the
+        # request was sent and may have been processed.
+        print(f"  POST sent, no response: {exc!r}", file=sys.stderr)
+        return PostResult(0)
+
+
+def post_json(url: str, payload: dict | bytes) -> int:
+    return post(url, payload).status
 
 
 # --------------------------------------------------------------------------- #
@@ -73,23 +140,69 @@ def recipients_list() -> list[str]:
 # --------------------------------------------------------------------------- #
 # Personal notifications
 # --------------------------------------------------------------------------- #
-def send_personal_notifications(violations: list[dict], workflow_url: str) -> int:
-    url = os.environ.get("PERSONAL_NOTIFICATION_URL", "").strip()
-    id_map = load_id_map()
-    if not url:
-        print("PERSONAL_NOTIFICATION_URL not set; skipping personal notifications.")
-        return 0
-    if not id_map:
-        print("No IDS mapping available; skipping personal notifications.")
-        return 0
-
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+def _retryable(result: PostResult) -> bool:
+    # A request that was sent but got no response is not retried: the Logic
+    # App may have accepted it, and a retry would post a duplicate message.
+    if not result.sent:
+        return True
+    return result.status == 429 or result.status >= 500
+
+
+class DeliveryLog:
+    """Append-only JSON Lines record of personal-notification attempts.
+
+    One line per recipient per run: login, recipient, status, attempts and
+    latency. With `resume`, recipients whose last record succeeded are not
+    sent to again, so re-running a partially failed step only retries the
+    failures.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        self._delivered: set[str] = set()
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from an interrupted run
+                    if rec.get("ok"):
+                        self._delivered.add(rec["recipient"])
+                    else:
+                        self._delivered.discard(rec["recipient"])
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fh = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def delivered(self, recipient: str) -> bool:
+        return recipient in self._delivered
+
+    def record(self, rec: dict) -> None:
+        # Flushed per record so a killed run still leaves a usable log.
+        self._fh.write(json.dumps(rec) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def build_personal_messages(violations: list[dict], workflow_url: str, id_map: dict[str, str]) -> list[dict]:
+    """One Teams payload per assignee with violations: {login, recipient, issues, payload}."""
     # Group violating issues by assignee login.
     by_login: dict[str, list[dict]] = {}
     for issue in violations:
         for login in issue.get("assignees", []):
             by_login.setdefault(login, []).append(issue)
 
-    sent = 0
+    messages = []
     for login, issues in sorted(by_login.items()):
         email = id_map.get(login)
         if not email:
@@ -113,17 +226,140 @@ def send_personal_notifications(violations: list[dict], workflow_url: str) -> in
             "workflowRunUrl": workflow_url,
             "recipient": email,
         }
-        status = post_json(url, payload)
-        ok = 200 <= status < 300
-        print(f"  Personal notification to {email} ({len(issues)} issues): HTTP {status} {'OK' if ok else 'FAILED'}")
-        sent += 1 if ok else 0
+        messages.append({"login": login, "recipient": email, "issues": issues, "payload": payload})
+    return messages
+
+
+async def _deliver(url: str, msg: dict, sem: asyncio.Semaphore, retries: int) -> dict:
+    """POST one message, retrying 429/5xx and unsent requests with full-jitter backoff.
+
+    A 429 with a Retry-After header waits that long instead (capped at
+    BACKOFF_CAP). A timeout after sending is recorded as unknown, not retried.
+    """
+    async with sem:
+        start = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            # post is blocking urllib; run it off the event loop.
+            result = await asyncio.to_thread(post, url, msg["payload"])
+            if not _retryable(result) or attempts > retries:
+                break
+            if result.status == 429 and result.retry_after is not None:
+                delay = min(BACKOFF_CAP, result.retry_after)
+            else:
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempts - 1)))
+            await asyncio.sleep(delay)
+    return {
+        "login": msg["login"],
+        "recipient": msg["recipient"],
+        "issues": len(msg["issues"]),
+        "status": result.status,
+        "ok": 200 <= result.status < 300,
+        # Sent but no response: may or may not have been delivered.
+        "unknown": result.sent and result.status == 0,
+        "attempts": attempts,
+        "latency_ms": round((time.perf_counter() - start) * 1000),
+        "at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+def _outcome(rec: dict) -> str:
+    if rec["unknown"]:
+        return "NO RESPONSE (may have been delivered)"
+    if rec["status"] == 0:
+        return "NOT SENT"
+    return f"HTTP {rec['status']} {'OK' if rec['ok'] else 'FAILED'}"
+
+
+async def dispatch_personal(
+    url: str,
+    messages: list[dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    log: DeliveryLog | None = None,
+) -> list[dict]:
+    """Send all messages with at most `concurrency` in flight; returns delivery records."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    # to_thread uses the loop's default executor, whose size depends on the
+    # CPU count; size it to the concurrency limit instead.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(1, concurrency)))
+    records = []
+    tasks = [asyncio.create_task(_deliver(url, msg, sem, retries)) for msg in messages]
+    for task in asyncio.as_completed(tasks):
+        rec = await task
+        records.append(rec)
+        if log is not None:
+            log.record(rec)
+        print(
+            f"  Personal notification to {rec['recipient']} ({rec['issues']} issues): "
+            f"{_outcome(rec)} "
+            f"[{rec['attempts']} attempt(s), {rec['latency_ms']} ms]"
+        )
+    return records
+
+
+def send_personal_notifications(
+    violations: list[dict],
+    workflow_url: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    delivery_log: str = "",
+    resume: bool = False,
+    outbox: NotificationOutbox | None = None,
+) -> int:
+    url = os.environ.get("PERSONAL_NOTIFICATION_URL", "").strip()
+    id_map = load_id_map()
+    if not url:
+        print("PERSONAL_NOTIFICATION_URL not set; skipping personal notifications.")
+        return 0
+    if not id_map:
+        print("No IDS mapping available; skipping personal notifications.")
+        return 0
+
+    messages = build_personal_messages(violations, workflow_url, id_map)
+    log = DeliveryLog(delivery_log, resume) if delivery_log else None
+    if log is not None and resume:
+        pending = [m for m in messages if not log.delivered(m["recipient"])]
+        if len(pending) < len(messages):
+            print(f"  Resuming: {len(messages) - len(pending)} recipient(s) already delivered; skipping.")
+        messages = pending
+    if outbox is not None:
+        # The hash covers the violation set only, not the day-dependent
+        # wording, so an unchanged set is recognized across re-runs.
+        fresh = [
+            m
+            for m in messages
+            if outbox.queue(
+                "personal", m["recipient"], content_hash(sorted(i["issue_number"] for i in m["issues"]))
+            )
+        ]
+        if len(fresh) < len(messages):
+            print(f"  Outbox: {len(messages) - len(fresh)} unchanged notification(s) suppressed.")
+        messages = fresh
+
+    start = time.perf_counter()
+    try:
+        records = asyncio.run(dispatch_personal(url, messages, concurrency, retries, log))
+    finally:
+        if log is not None:
+            log.close()
+    if outbox is not None:
+        outbox.flush("personal", {r["recipient"]: r["ok"] for r in records})
+    sent = sum(1 for r in records if r["ok"])
+    print(
+        f"  Delivered {sent}/{len(records)} personal notification(s) in "
+        f"{time.perf_counter() - start:.1f}s (concurrency {concurrency})"
+    )
     return sent
 
 
 # --------------------------------------------------------------------------- #
 # Summary email
 # --------------------------------------------------------------------------- #
-def build_summary_html(issues: list[dict], counts: dict, workflow_url: str) -> str:
+def build_summary_html(
+    issues: list[dict], counts: dict, workflow_url: str, out: HtmlWriter | None = None
+) -> str:
     violations = [i for i in issues if i["sla_status"] == "VIOLATION"]
 
     # Top assignees by violation count.
@@ -136,70 +372,41 @@ def build_summary_html(issues: list[dict], counts: dict, workflow_url: str) -> s
     # Top 20 oldest violations.
     oldest = sorted(violations, key=lambda x: x["days_open"], reverse=True)[:20]
 
-    def esc(text: str) -> str:
-        return html.escape(str(text))
-
-    counts_html = (
-        '<table style="border-collapse: collapse; width: 100%;">'
-        '<tr style="background:#f6f8fa;">'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Metric</th>'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Count</th></tr>'
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">Total issues triaged</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{counts["total"]}</td></tr>'
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">✅ SLA Good</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{counts["GOOD"]}</td></tr>'
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">⚠️ SLA Warning</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{counts["WARNING"]}</td></tr>'
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">❌ SLA Violation</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{counts["VIOLATION"]}</td></tr>'
-        "</table>"
+    out = out or HtmlWriter(reserve=ENVELOPE_RESERVE)
+    out.heading("Triage Summary", first=True)
+    out.table(
+        ("Metric", "Count"),
+        [
+            ("Total issues triaged", counts["total"]),
+            ("✅ SLA Good", counts["GOOD"]),
+            ("⚠️ SLA Warning", counts["WARNING"]),
+            ("❌ SLA Violation", counts["VIOLATION"]),
+        ],
     )
 
+    out.heading("Top Assignees with SLA Violations")
     if top_assignees:
-        rows = "".join(
-            f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">@{esc(login)}</td>'
-            f'<td style="border:1px solid #e1e4e8;padding:8px;">{count}</td></tr>'
-            for login, count in top_assignees
-        )
-        assignees_html = (
-            '<table style="border-collapse: collapse; width: 100%;">'
-            '<tr style="background:#f6f8fa;">'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Assignee</th>'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Violations</th></tr>'
-            f"{rows}</table>"
-        )
+        out.table(("Assignee", "Violations"), ((f"@{login}", count) for login, count in top_assignees))
     else:
-        assignees_html = "<p>No SLA violations with assignees.</p>"
+        out.write("<p>No SLA violations with assignees.</p>")
 
+    out.heading("20 Oldest SLA Violations")
     if oldest:
-        rows = "".join(
-            f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">'
-            f'<a href="{esc(i["url"])}" style="color:#0366d6;">#{i["issue_number"]}</a></td>'
-            f'<td style="border:1px solid #e1e4e8;padding:8px;">{esc(i["title"])}</td>'
-            f'<td style="border:1px solid #e1e4e8;padding:8px;">{i["days_open"]}</td>'
-            f'<td style="border:1px solid #e1e4e8;padding:8px;">{esc(", ".join(i.get("assignees", [])) or "—")}</td></tr>'
-            for i in oldest
-        )
-        oldest_html = (
-            '<table style="border-collapse: collapse; width: 100%;">'
-            '<tr style="background:#f6f8fa;">'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Issue</th>'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Title</th>'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Days Open</th>'
-            '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Assignees</th></tr>'
-            f"{rows}</table>"
+        out.table(
+            ("Issue", "Title", "Days Open", "Assignees"),
+            (
+                (
+                    link(i["url"], f"#{i['issue_number']}"),
+                    i["title"],
+                    i["days_open"],
+                    ", ".join(i.get("assignees", [])) or "—",
+                )
+                for i in oldest
+            ),
         )
     else:
-        oldest_html = "<p>No SLA violations.</p>"
-
-    return (
-        '<h2 style="color:#24292e;">Triage Summary</h2>'
-        f"{counts_html}"
-        '<h2 style="color:#24292e;margin-top:24px;">Top Assignees with SLA Violations</h2>'
-        f"{assignees_html}"
-        '<h2 style="color:#24292e;margin-top:24px;">20 Oldest SLA Violations</h2>'
-        f"{oldest_html}"
-    )
+        out.write("<p>No SLA violations.</p>")
+    return out.getvalue()
 
 
 def send_summary_email(
@@ -208,6 +415,7 @@ def send_summary_email(
     workflow_url: str,
     title: str,
     content_override: str | None = None,
+    outbox: NotificationOutbox | None = None,
 ) -> bool:
     url = os.environ.get("MAILING_URL", "").strip()
     recipients = recipients_list()
@@ -219,14 +427,30 @@ def send_summary_email(
         return False
 
     time_frame = f"{date.today():%B %d, %Y}"
-    content = content_override if content_override else build_summary_html(issues, counts, workflow_url)
-    body = (
+    if content_override:
+        content, rendered = content_override, "pre-rendered content"
+    else:
+        # The tables get their own writer, which leaves ENVELOPE_RESERVE bytes
+        # free for the wrapper below; its summary times and sizes the tables.
+        body = HtmlWriter(reserve=ENVELOPE_RESERVE)
+        content = build_summary_html(issues, counts, workflow_url, body)
+        rendered = f"tables: {body.summary()}"
+    recipient_key = ";".join(sorted(recipients))
+    # The summary is a daily report: only a same-day re-run is suppressed,
+    # even when the tables have not changed since yesterday.
+    if outbox is not None and not outbox.queue("summary", recipient_key, content_hash(title, content), max_days=1):
+        print(f"Summary email to {len(recipients)} recipient(s) unchanged since last delivery; not re-sent.")
+        return True
+    out = HtmlWriter()
+    out.write(
         '<html><body style="font-family: Arial, sans-serif; line-height: 1.6; '
         'color: #333; max-width: 800px; margin: 0 auto; padding: 20px;">'
         '<div style="background: #f6f8fa; padding: 20px; border-radius: 8px; margin-bottom: 20px;">'
         f'<h1 style="color: #0366d6; margin: 0;">{html.escape(title)}</h1>'
         f'<p style="color: #586069; margin: 5px 0 0 0;">{time_frame}</p></div>'
-        f"{content}"
+    )
+    out.write(content)
+    out.write(
         '<hr style="border: none; border-top: 1px solid #e1e4e8; margin: 20px 0;">'
         '<p style="color: #586069; font-size: 12px;">Generated by '
         f'<a href="{html.escape(workflow_url)}" style="color: #0366d6;">GitHub Actions workflow</a>'
@@ -235,12 +459,21 @@ def send_summary_email(
     payload = {
         "title": title,
         "timeFrame": time_frame,
-        "body": body,
+        "body": out.getvalue(),
         "workflowRunUrl": workflow_url,
         "recipients": recipients,
     }
-    status = post_json(url, payload)
+    data = json.dumps(payload).encode("utf-8")
+    print(f"Summary email payload: {len(data) / 1024:.0f} KiB of {out.max_bytes / 1024:.0f} KiB budget ({rendered})")
+    if len(data) > out.max_bytes:
+        print(
+            f"  Payload exceeds the {out.max_bytes / 1024:.0f} KiB budget; the Logic App may reject it.",
+            file=sys.stderr,
+        )
+    status = post_json(url, data)
     ok = 200 <= status < 300
+    if outbox is not None:
+        outbox.flush("summary", {recipient_key: ok})
     print(f"Summary email to {len(recipients)} recipient(s): HTTP {status} {'OK' if ok else 'FAILED'}")
     return ok
 
@@ -265,26 +498,82 @@ def main() -> int:
         help="Path to a pre-rendered HTML fragment to use as the email body "
         "(e.g. the chart report). Falls back to the built-in summary tables.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.environ.get("NOTIFY_CONCURRENCY", DEFAULT_CONCURRENCY)),
+        help="Personal notifications in flight at once.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retries per personal notification on 429/5xx and unsent requests.",
+    )
+    parser.add_argument(
+        "--delivery-log",
+        default="",
+        help="JSON Lines file recording each personal notification's status, latency and attempts.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --delivery-log: only send to recipients not delivered in that log.",
+    )
+    parser.add_argument(
+        "--outbox",
+        default="",
+        help='Outbox file for cross-run dedup, or "off" '
+        "(default: $ISSUELENS_NOTIFY_OUTBOX or ~/.cache/issuelens/notify-outbox.sqlite).",
+    )
+    parser.add_argument(
+        "--dedup-days",
+        type=int,
+        default=DEFAULT_DEDUP_DAYS,
+        help="Suppress a personal notification identical to one delivered within this many days "
+        "(default %(default)s = today and yesterday; 1 = re-runs only; 0 = never suppress). "
+        "The summary email only ever dedups same-day re-runs.",
+    )
     args = parser.parse_args()
-
-    with open(args.input, encoding="utf-8") as fh:
-        issues = json.load(fh)
-
-    counts = {
-        "total": len(issues),
-        "GOOD": sum(1 for i in issues if i.get("sla_status") == "GOOD"),
-        "WARNING": sum(1 for i in issues if i.get("sla_status") == "WARNING"),
-        "VIOLATION": sum(1 for i in issues if i.get("sla_status") == "VIOLATION"),
-    }
+    if args.resume and not args.delivery_log:
+        parser.error("--resume requires --delivery-log")
+
+    # One streaming pass: the counts cover every issue, but only violations
+    # are needed for the notifications and the summary tables.
+    counts = {"total": 0, "GOOD": 0, "WARNING": 0, "VIOLATION": 0}
+    violations = []
+    for issue in iter_issues(args.input):
+        counts["total"] += 1
+        status = issue.get("sla_status")
+        if status in counts:
+            counts[status] += 1
+        if status == "VIOLATION":
+            violations.append(issue)
     print(
         f"Loaded {counts['total']} issues "
         f"({counts['GOOD']} GOOD, {counts['WARNING']} WARNING, {counts['VIOLATION']} VIOLATION)"
     )
 
-    violations = [i for i in issues if i.get("sla_status") == "VIOLATION"]
+    outbox = NotificationOutbox.from_env(args.outbox, args.dedup_days)
+    try:
+        return _notify(args, counts, violations, outbox)
+    finally:
+        if outbox is not None:
+            print(outbox.summary())
+            outbox.close()
+
 
+def _notify(args, counts: dict, violations: list[dict], outbox: NotificationOutbox | None) -> int:
     if args.mode in ("all", "personal"):
-        send_personal_notifications(violations, args.workflow_url)
+        send_personal_notifications(
+            violations,
+            args.workflow_url,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            delivery_log=args.delivery_log,
+            resume=args.resume,
+            outbox=outbox,
+        )
 
     if args.mode in ("all", "email"):
         content_override = None
@@ -292,7 +581,7 @@ def main() -> int:
             with open(args.content_file, encoding="utf-8") as fh:
                 content_override = fh.read()
         email_ok = send_summary_email(
-            issues, counts, args.workflow_url, args.title, content_override
+            violations, counts, args.workflow_url, args.title, content_override, outbox
         )
         # Non-zero exit if the email (the critical deliverable) failed to send.
         return 0 if email_ok else 1
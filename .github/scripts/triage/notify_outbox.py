@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Idempotent outbox for notify.py: remember what was sent, skip repeats.
+
+Every notification is reduced to a content hash — for a personal Teams message
+the recipient's set of violating issue numbers, for the summary email its
+recipients, title and body. Before sending, notify.py queues each message
+here; a message whose hash was already delivered to the same recipient within
+the dedup window is suppressed. The remaining queue is flushed in one batch
+through the dispatcher, and the delivered hashes are recorded in a single
+transaction.
+
+The default window of DEFAULT_DEDUP_DAYS (2: today and yesterday) makes a
+re-run of the same day's workflow a no-op for everyone who already got their
+message, and also skips recipients whose violation set has not changed since
+yesterday's run. A caller can narrow the window per send: the daily summary
+email only dedups re-runs. Each Logic App invocation is billed, so suppressed
+sends are saved cost.
+
+Storage is a stdlib SQLite file (one row per channel / recipient / day), pruned
+to the last RETENTION_DAYS days.
+
+Environment variables:
+  ISSUELENS_NOTIFY_OUTBOX   Path of the outbox file, or "off" to disable.
+                            Default: ~/.cache/issuelens/notify-outbox.sqlite
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "notify-outbox.sqlite")
+RETENTION_DAYS = 30
+DEFAULT_DEDUP_DAYS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sent (
+    channel TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    day TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    PRIMARY KEY (channel, recipient, day)
+);
+"""
+
+
+def content_hash(*parts) -> str:
+    """Stable SHA-256 of JSON-serializable parts."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class NotificationOutbox:
+    """Per-recipient, per-day record of delivered content hashes."""
+
+    def __init__(self, path: str = DEFAULT_PATH, dedup_days: int = DEFAULT_DEDUP_DAYS) -> None:
+        self.path = path
+        self.dedup_days = max(0, dedup_days)
+        self.suppressed = 0
+        self.delivered = 0
+        self._queue: dict[tuple[str, str], str] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).strftime("%Y-%m-%d")
+        with self._db:
+            self._db.execute("DELETE FROM sent WHERE day < ?", (cutoff,))
+
+    @classmethod
+    def from_env(cls, path: str = "", dedup_days: int = DEFAULT_DEDUP_DAYS) -> "NotificationOutbox | None":
+        path = (path or os.environ.get("ISSUELENS_NOTIFY_OUTBOX", DEFAULT_PATH)).strip()
+        if not path or path.lower() in ("off", "0", "false", "none"):
+            return None
+        try:
+            return cls(path, dedup_days)
+        except (OSError, sqlite3.Error) as exc:
+            # Without the outbox we simply send everything, as before.
+            print(f"Notification outbox disabled ({path}): {exc}", file=sys.stderr)
+            return None
+
+    def _already_sent(self, channel: str, recipient: str, digest: str, days: int) -> bool:
+        if days == 0:
+            return False
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        row = self._db.execute(
+            "SELECT 1 FROM sent WHERE channel = ? AND recipient = ? AND day >= ? AND content_hash = ? LIMIT 1",
+            (channel, recipient, since, digest),
+        ).fetchone()
+        return row is not None
+
+    def queue(self, channel: str, recipient: str, digest: str, max_days: int | None = None) -> bool:
+        """Queue a send; returns False (and counts it) if it would be a repeat.
+
+        `max_days` narrows the dedup window for this send (never widens it).
+        """
+        days = self.dedup_days if max_days is None else min(self.dedup_days, max(0, max_days))
+        if self._already_sent(channel, recipient, digest, days):
+            self.suppressed += 1
+            return False
+        self._queue[(channel, recipient)] = digest
+        return True
+
+    def flush(self, channel: str, outcomes: dict[str, bool]) -> None:
+        """Record the delivery outcome of every queued send on `channel` in one transaction.
+
+        Failed sends stay unrecorded, so the next run tries them again.
+        """
+        day = _today()
+        now = time.time()
+        rows = []
+        for (ch, recipient), digest in list(self._queue.items()):
+            if ch != channel:
+                continue
+            del self._queue[(ch, recipient)]
+            if outcomes.get(recipient):
+                rows.append((channel, recipient, day, digest, now))
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO sent VALUES (?, ?, ?, ?, ?)", rows)
+        self.delivered += len(rows)
+
+    def summary(self) -> str:
+        return (
+            f"Notification outbox: {self.delivered} delivered and recorded, "
+            f"{self.suppressed} unchanged notification(s) suppressed"
+        )
+
+    def close(self) -> None:
+        self._db.close()
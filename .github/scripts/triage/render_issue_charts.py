@@ -4,7 +4,22 @@
 Charts are rendered server-side with matplotlib and embedded as inline base64
 PNG <img> tags (email clients strip <script>, so Chart.js/Plotly cannot be
 used). The output is an HTML fragment meant to be the body of the weekly
-summary email (passed to notify.py via --content-file).
+summary email (passed to notify.py via --content-file). The charts are
+independent, so they are rendered on a process pool (--workers) and assembled
+in their fixed order. All chart and table data comes from one aggregation pass
+over the input (issue_aggregates.py).
+
+--chart-mode compact shrinks the email (chart_output.py): PNGs are rendered at
+a per-chart DPI capped to the email width and re-encoded with a reduced
+palette, and the simple single-series bar charts (age histogram, assignees,
+top labels, violations by label) become pure-HTML CSS bars with no image at
+all. The report must fit --max-bytes: in compact mode it is rebuilt with
+smaller images and palettes (chart_output.BUDGET_LADDER) until nothing had to
+be dropped; in png mode charts that don't fit are skipped, as before.
+
+matplotlib is imported on first use (lazy_import.py), so `--help`, empty
+inputs and fully cached reports never load it; --import-time prints a
+`python -X importtime` summary of this script's start-up cost.
 
 Charts produced:
   * SLA status distribution (donut)
@@ -18,57 +33,52 @@ Charts produced:
 
 Usage:
     python render_issue_charts.py --input triage-results.json \
-        --output report-content.html --title "Weekly Issue Triage"
+        --output report-content.html --title "Weekly Issue Triage" \
+        [--chart-mode compact] [--max-bytes 1048576]
+    python render_issue_charts.py --import-time
 """
 
 import argparse
-import base64
-import html as html_mod
-import io
-import json
+import dataclasses
+import os
 import sys
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date
-
-try:
-    import matplotlib
-
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-except ImportError:
-    print(
-        "matplotlib is required. Install with: pip install matplotlib",
-        file=sys.stderr,
-    )
-    sys.exit(1)
-
-
-plt.rcParams.update(
-    {
-        "font.family": "sans-serif",
-        "font.size": 10,
-        "axes.titlesize": 13,
-        "axes.titleweight": "bold",
-        "figure.facecolor": "white",
-        "axes.facecolor": "#fafafa",
-        "axes.grid": True,
-        "grid.alpha": 0.3,
-    }
-)
+from typing import Iterable
+
+import chart_output
+from chart_cache import cached_chart, default_cache
+from html_report import ENVELOPE_RESERVE, HtmlWriter, bar_chart, esc, link, max_payload_bytes, payload_size
+from issue_aggregates import AGE_BUCKETS, IssueAggregates, aggregate
+from lazy_import import import_time_report, lazy_pyplot
+from triage_results import iter_issues
+
+CHART_STYLE = {
+    "font.family": "sans-serif",
+    "font.size": 10,
+    "axes.titlesize": 13,
+    "axes.titleweight": "bold",
+    "figure.facecolor": "white",
+    "axes.facecolor": "#fafafa",
+    "axes.grid": True,
+    "grid.alpha": 0.3,
+}
+# Imported (and styled) when the first chart is drawn, not at start-up.
+plt = lazy_pyplot(CHART_STYLE, hint="matplotlib is required. Install with: pip install matplotlib")
+# Charts whose inputs and style are unchanged are served from disk (chart_cache.py).
+# The encoding settings are part of the key: a compact PNG is not a full one.
+cached = cached_chart({"rc": CHART_STYLE, "encoding": chart_output.settings})
 
 STATUS_COLORS = {"GOOD": "#43a047", "WARNING": "#fdd835", "VIOLATION": "#ef5350"}
-
-
-def esc(text) -> str:
-    return html_mod.escape(str(text))
+AGE_COLORS = ["#66bb6a", "#9ccc65", "#fdd835", "#ffa726", "#ff7043", "#ef5350"]
 
 
 def fig_to_base64(fig, dpi=150) -> str:
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", facecolor="white")
-    plt.close(fig)
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("ascii")
+    try:
+        return chart_output.encode_figure(fig, dpi)
+    finally:
+        plt.close(fig)
 
 
 def img_tag(b64: str, alt: str = "chart") -> str:
@@ -79,6 +89,7 @@ def img_tag(b64: str, alt: str = "chart") -> str:
 
 
 # ── charts ────────────────────────────────────────────────────────────────
+@cached
 def chart_sla_donut(counts: dict):
     labels, sizes, colors = [], [], []
     for status in ("GOOD", "WARNING", "VIOLATION"):
@@ -104,16 +115,11 @@ def chart_sla_donut(counts: dict):
     return fig_to_base64(fig)
 
 
-def chart_by_assignee(issues: list[dict]):
-    counter: Counter = Counter()
-    for issue in issues:
-        for login in issue.get("assignees", []):
-            counter[login] += 1
-        if not issue.get("assignees"):
-            counter["(unassigned)"] += 1
-    if not counter:
+@cached
+def chart_by_assignee(agg: IssueAggregates):
+    if not agg.assignee_totals:
         return None
-    top = counter.most_common(15)
+    top = agg.assignee_totals.most_common(15)
     names = [n for n, _ in top][::-1]
     vals = [v for _, v in top][::-1]
     fig, ax = plt.subplots(figsize=(8, max(3, len(names) * 0.45)))
@@ -137,27 +143,14 @@ def chart_by_assignee(issues: list[dict]):
     return fig_to_base64(fig)
 
 
-AGE_BUCKETS = [(0, 1, "0-1d"), (2, 3, "2-3d"), (4, 7, "4-7d"),
-               (8, 14, "8-14d"), (15, 30, "15-30d"), (31, 10**9, "30d+")]
-
-
-def _bucket_index(days: int) -> int:
-    for i, (lo, hi, _) in enumerate(AGE_BUCKETS):
-        if lo <= days <= hi:
-            return i
-    return len(AGE_BUCKETS) - 1
-
-
-def chart_age_histogram(issues: list[dict]):
-    if not issues:
+@cached
+def chart_age_histogram(agg: IssueAggregates):
+    if not agg.total:
         return None
-    counts = [0] * len(AGE_BUCKETS)
-    for issue in issues:
-        counts[_bucket_index(issue.get("days_open", 0))] += 1
+    counts = agg.age_totals
     labels = [b[2] for b in AGE_BUCKETS]
     fig, ax = plt.subplots(figsize=(8, 3.5))
-    colors = ["#66bb6a", "#9ccc65", "#fdd835", "#ffa726", "#ff7043", "#ef5350"]
-    bars = ax.bar(labels, counts, color=colors, edgecolor="white", width=0.7)
+    bars = ax.bar(labels, counts, color=AGE_COLORS, edgecolor="white", width=0.7)
     for bar, val in zip(bars, counts):
         if val:
             ax.text(
@@ -176,14 +169,11 @@ def chart_age_histogram(issues: list[dict]):
     return fig_to_base64(fig)
 
 
-def chart_top_labels(issues: list[dict]):
-    counter: Counter = Counter()
-    for issue in issues:
-        for lbl in issue.get("labels", []):
-            counter[lbl] += 1
-    if not counter:
+@cached
+def chart_top_labels(agg: IssueAggregates):
+    if not agg.label_totals:
         return None
-    top = counter.most_common(12)
+    top = agg.label_totals.most_common(12)
     names = [n for n, _ in top][::-1]
     vals = [v for _, v in top][::-1]
     fig, ax = plt.subplots(figsize=(8, max(3, len(names) * 0.45)))
@@ -207,15 +197,12 @@ def chart_top_labels(issues: list[dict]):
     return fig_to_base64(fig)
 
 
-def chart_status_by_age(issues: list[dict]):
-    if not issues:
+@cached
+def chart_status_by_age(agg: IssueAggregates):
+    if not agg.total:
         return None
     labels = [b[2] for b in AGE_BUCKETS]
-    series = {s: [0] * len(AGE_BUCKETS) for s in ("GOOD", "WARNING", "VIOLATION")}
-    for issue in issues:
-        status = issue.get("sla_status", "GOOD")
-        if status in series:
-            series[status][_bucket_index(issue.get("days_open", 0))] += 1
+    series = agg.status_by_age
     fig, ax = plt.subplots(figsize=(8, 3.5))
     bottom = [0] * len(AGE_BUCKETS)
     for status in ("GOOD", "WARNING", "VIOLATION"):
@@ -270,46 +257,31 @@ def _stacked_status_barh(title: str, ranking: list[tuple[str, dict]], xlabel: st
     return fig_to_base64(fig)
 
 
-def chart_status_by_assignee(issues: list[dict], top: int = 12):
-    by_assignee: dict[str, Counter] = {}
-    for issue in issues:
-        status = issue.get("sla_status", "GOOD")
-        targets = issue.get("assignees") or ["(unassigned)"]
-        for login in targets:
-            by_assignee.setdefault(login, Counter())[status] += 1
-    if not by_assignee:
+@cached
+def chart_status_by_assignee(agg: IssueAggregates, top: int = 12):
+    if not agg.status_by_assignee:
         return None
-    ranking = sorted(by_assignee.items(), key=lambda kv: sum(kv[1].values()), reverse=True)[:top]
+    ranking = sorted(agg.status_by_assignee.items(), key=lambda kv: sum(kv[1].values()), reverse=True)[:top]
     return _stacked_status_barh(
         f"SLA Status by Assignee (Top {len(ranking)})", ranking, "Open Issues"
     )
 
 
-def chart_status_by_label(issues: list[dict], top: int = 12):
-    by_label: dict[str, Counter] = {}
-    for issue in issues:
-        status = issue.get("sla_status", "GOOD")
-        for lbl in issue.get("labels", []):
-            by_label.setdefault(lbl, Counter())[status] += 1
-    if not by_label:
+@cached
+def chart_status_by_label(agg: IssueAggregates, top: int = 12):
+    if not agg.status_by_label:
         return None
-    ranking = sorted(by_label.items(), key=lambda kv: sum(kv[1].values()), reverse=True)[:top]
+    ranking = sorted(agg.status_by_label.items(), key=lambda kv: sum(kv[1].values()), reverse=True)[:top]
     return _stacked_status_barh(
         f"SLA Status by Label (Top {len(ranking)})", ranking, "Issues"
     )
 
 
-def chart_violations_by_label(issues: list[dict], top: int = 12):
-    counter: Counter = Counter()
-    for issue in issues:
-        if issue.get("sla_status") != "VIOLATION":
-            continue
-        labels = issue.get("labels") or ["(no label)"]
-        for lbl in labels:
-            counter[lbl] += 1
-    if not counter:
+@cached
+def chart_violations_by_label(agg: IssueAggregates, top: int = 12):
+    if not agg.violations_by_label:
         return None
-    ranking = counter.most_common(top)
+    ranking = agg.violations_by_label.most_common(top)
     names = [n for n, _ in ranking][::-1]
     vals = [v for _, v in ranking][::-1]
     fig, ax = plt.subplots(figsize=(8, max(3, len(names) * 0.45)))
@@ -327,103 +299,216 @@ def chart_violations_by_label(issues: list[dict], top: int = 12):
     return fig_to_base64(fig)
 
 
+# ── compact mode: the same bar charts as HTML ────────────────────────────
+def bars_age_histogram(agg: IssueAggregates):
+    if not agg.total:
+        return None
+    return bar_chart([(b[2], n, c) for b, n, c in zip(AGE_BUCKETS, agg.age_totals, AGE_COLORS)])
+
+
+def bars_by_assignee(agg: IssueAggregates):
+    return bar_chart(agg.assignee_totals.most_common(15), "#42a5f5")
+
+
+def bars_top_labels(agg: IssueAggregates):
+    return bar_chart(agg.label_totals.most_common(12), "#7e57c2")
+
+
+def bars_violations_by_label(agg: IssueAggregates, top: int = 12):
+    return bar_chart(agg.violations_by_label.most_common(top), STATUS_COLORS["VIOLATION"])
+
+
 # ── tables ────────────────────────────────────────────────────────────────
-def counts_table(counts: dict) -> str:
-    rows = [
-        ("Total open issues", counts["total"]),
-        ("✅ SLA Good", counts["GOOD"]),
-        ("⚠️ SLA Warning", counts["WARNING"]),
-        ("❌ SLA Violation", counts["VIOLATION"]),
-    ]
-    body = "".join(
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">{esc(name)}</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{val}</td></tr>'
-        for name, val in rows
-    )
-    return (
-        '<table style="border-collapse:collapse;width:100%;">'
-        '<tr style="background:#f6f8fa;">'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Metric</th>'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Count</th></tr>'
-        f"{body}</table>"
+def counts_table(out: HtmlWriter, counts: dict) -> None:
+    out.table(
+        ("Metric", "Count"),
+        [
+            ("Total open issues", counts["total"]),
+            ("✅ SLA Good", counts["GOOD"]),
+            ("⚠️ SLA Warning", counts["WARNING"]),
+            ("❌ SLA Violation", counts["VIOLATION"]),
+        ],
     )
 
 
-def violations_table(issues: list[dict]) -> str:
+def violations_table(out: HtmlWriter, violations: list[dict]) -> None:
     violations = sorted(
-        (i for i in issues if i.get("sla_status") == "VIOLATION"),
+        violations,
         key=lambda x: x.get("days_open", 0),
         reverse=True,
     )[:20]
     if not violations:
-        return "<p>No SLA violations. 🎉</p>"
-    rows = "".join(
-        f'<tr><td style="border:1px solid #e1e4e8;padding:8px;">'
-        f'<a href="{esc(i["url"])}" style="color:#0366d6;">#{i["issue_number"]}</a></td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{esc(i["title"])}</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{i.get("days_open", 0)}</td>'
-        f'<td style="border:1px solid #e1e4e8;padding:8px;">{esc(", ".join(i.get("assignees", [])) or "—")}</td></tr>'
-        for i in violations
-    )
-    return (
-        '<table style="border-collapse:collapse;width:100%;">'
-        '<tr style="background:#f6f8fa;">'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Issue</th>'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Title</th>'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Days Open</th>'
-        '<th style="border:1px solid #e1e4e8;padding:8px;text-align:left;">Assignees</th></tr>'
-        f"{rows}</table>"
-    )
-
-
-def section(title: str, b64: str | None) -> str:
-    if not b64:
-        return ""
-    return (
-        f'<h2 style="color:#24292e;margin-top:24px;">{esc(title)}</h2>'
-        f"{img_tag(b64, title)}"
+        out.write("<p>No SLA violations. 🎉</p>")
+        return
+    out.table(
+        ("Issue", "Title", "Days Open", "Assignees"),
+        (
+            (
+                link(i["url"], f"#{i['issue_number']}"),
+                i["title"],
+                i.get("days_open", 0),
+                ", ".join(i.get("assignees", [])) or "—",
+            )
+            for i in violations
+        ),
     )
 
 
-def build_report(issues: list[dict]) -> str:
-    counts = {
-        "total": len(issues),
-        "GOOD": sum(1 for i in issues if i.get("sla_status") == "GOOD"),
-        "WARNING": sum(1 for i in issues if i.get("sla_status") == "WARNING"),
-        "VIOLATION": sum(1 for i in issues if i.get("sla_status") == "VIOLATION"),
-    }
-    parts = [
-        '<h2 style="color:#24292e;">Overview</h2>',
-        counts_table(counts),
-        section("SLA Status Distribution", chart_sla_donut(counts)),
-        section("SLA Status by Age Bucket", chart_status_by_age(issues)),
-        section("Open Issue Age Distribution", chart_age_histogram(issues)),
-        section("Open Issues by Assignee", chart_by_assignee(issues)),
-        section("SLA Status by Assignee", chart_status_by_assignee(issues)),
-        section("Top Labels", chart_top_labels(issues)),
-        section("SLA Status by Label", chart_status_by_label(issues)),
-        section("SLA Violations by Label", chart_violations_by_label(issues)),
-        '<h2 style="color:#24292e;margin-top:24px;">20 Oldest SLA Violations</h2>',
-        violations_table(issues),
-    ]
-    return "".join(parts)
+def section(out: HtmlWriter, title: str, fragment: str | None) -> None:
+    if not fragment:
+        return
+    if not out.fits(payload_size(fragment)):
+        # Keep the budget for the violations table rather than one more chart.
+        print(f"  Skipping chart '{title}': would exceed the email size budget.", file=sys.stderr)
+        out.omit(f"chart '{title}'")
+        return
+    out.heading(title)
+    out.write(fragment)
+
+
+# (section title, chart function, whether it takes the status counts instead of
+# the aggregates, HTML bar equivalent used in compact mode or None)
+CHARTS = [
+    ("SLA Status Distribution", chart_sla_donut, True, None),
+    ("SLA Status by Age Bucket", chart_status_by_age, False, None),
+    ("Open Issue Age Distribution", chart_age_histogram, False, bars_age_histogram),
+    ("Open Issues by Assignee", chart_by_assignee, False, bars_by_assignee),
+    ("SLA Status by Assignee", chart_status_by_assignee, False, None),
+    ("Top Labels", chart_top_labels, False, bars_top_labels),
+    ("SLA Status by Label", chart_status_by_label, False, None),
+    ("SLA Violations by Label", chart_violations_by_label, False, bars_violations_by_label),
+]
+
+
+def _render_chart(job):
+    fn, arg, encoding = job
+    # Pool workers start from the module defaults; apply the parent's settings.
+    chart_output.configure(**encoding)
+    # The parent already peeked at the cache, so don't look (and miss) again.
+    return fn.render(arg)
+
+
+def render_charts(agg: IssueAggregates, workers: int | None = None) -> list[str | None]:
+    """Render every chart in CHARTS, in order, as HTML fragments.
+
+    PNG charts are rendered on a process pool; each worker imports this module
+    and so gets its own Agg backend, and returns a base64 PNG string. In
+    compact mode charts with an HTML equivalent skip matplotlib entirely.
+    `workers` <= 1 renders in-process.
+    """
+    compact = chart_output.settings["mode"] == "compact"
+    encoding = dict(chart_output.settings)
+    # Workers only need the tallies, not the violation rows for the table.
+    tallies = dataclasses.replace(agg, violations=[])
+    jobs = [(fn, agg.counts if takes_counts else tallies, encoding) for _, fn, takes_counts, _ in CHARTS]
+    fragments: list[str | None] = [None] * len(CHARTS)
+    results: list[str | None] = [None] * len(CHARTS)
+    todo = []
+    for i, (title, fn, _, as_html) in enumerate(CHARTS):
+        if compact and as_html is not None:
+            fragments[i] = as_html(jobs[i][1])
+            continue
+        # Cached charts are answered here; only the misses go to the pool.
+        results[i] = fn.peek(jobs[i][1])
+        if results[i] is None:
+            todo.append(i)
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    rendered = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = list(pool.map(_render_chart, [jobs[i] for i in todo]))
+        except (OSError, BrokenProcessPool) as exc:
+            # No usable process pool (sandboxed runner, no /dev/shm): stay serial.
+            print(f"  Chart process pool unavailable ({exc}); rendering serially.", file=sys.stderr)
+    if rendered is None:
+        rendered = [_render_chart(jobs[i]) for i in todo]
+    for i, b64 in zip(todo, rendered):
+        results[i] = b64
+    for i, b64 in enumerate(results):
+        if b64:
+            fragments[i] = img_tag(b64, CHARTS[i][0])
+    return fragments
+
+
+def build_report(
+    issues: Iterable[dict] | IssueAggregates, out: HtmlWriter | None = None, workers: int | None = None
+) -> str:
+    """Render the report fragment; leaves room for notify.py's email envelope.
+
+    `issues` may be any iterable (e.g. a streaming `iter_issues`) or an
+    already computed `aggregate()` result.
+    """
+    agg = issues if isinstance(issues, IssueAggregates) else aggregate(issues)
+    out = out or HtmlWriter(reserve=ENVELOPE_RESERVE)
+    out.heading("Overview", first=True)
+    counts_table(out, agg.counts)
+    # Nothing to plot: don't spin up the pool (or matplotlib) for empty charts.
+    fragments = render_charts(agg, workers) if agg.total else []
+    for (title, *_), fragment in zip(CHARTS, fragments):
+        section(out, title, fragment)
+    out.heading("20 Oldest SLA Violations")
+    violations_table(out, agg.violations)
+    return out.getvalue()
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--input", required=True)
-    parser.add_argument("--output", required=True, help="HTML fragment output path")
+    parser.add_argument("--input")
+    parser.add_argument("--output", help="HTML fragment output path")
     parser.add_argument("--title", default="Weekly Issue Triage")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for chart rendering (default: CPU count; 1 = in-process)",
+    )
+    parser.add_argument(
+        "--chart-mode",
+        choices=chart_output.MODES,
+        default="png",
+        help="png: full-colour images; compact: quantized PNGs and HTML bar charts",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        help="Byte budget for the email payload (default: NOTIFY_MAX_PAYLOAD_BYTES or 20 MiB)",
+    )
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        help="Print a `python -X importtime` summary of this script's start-up and exit",
+    )
     args = parser.parse_args()
-
-    with open(args.input, encoding="utf-8") as fh:
-        issues = json.load(fh)
-
-    content = build_report(issues)
+    if args.import_time:
+        return import_time_report(__file__)
+    if not args.input or not args.output:
+        parser.error("--input and --output are required")
+    max_bytes = args.max_bytes or max_payload_bytes()
+
+    # One streaming pass over the input feeds every chart and table.
+    agg = aggregate(iter_issues(args.input))
+
+    chart_output.configure(mode=args.chart_mode)
+    ladder = chart_output.BUDGET_LADDER if args.chart_mode == "compact" else [(None, None)]
+    for scale, colors in ladder:
+        chart_output.configure(scale=scale, colors=colors)
+        out = HtmlWriter(max_bytes=max_bytes, reserve=ENVELOPE_RESERVE)
+        content = build_report(agg, out, args.workers)
+        if not out.omitted:
+            break
+        if scale is not None and (scale, colors) != ladder[-1]:
+            print(f"  Over budget at scale {scale:g} / {colors} colours; retrying smaller.", file=sys.stderr)
     with open(args.output, "w", encoding="utf-8") as fh:
         fh.write(content)
 
-    print(f"Rendered report for {len(issues)} issues -> {args.output} ({date.today()})")
+    print(f"Rendered report for {agg.total} issues -> {args.output} ({date.today()})")
+    print(f"  Report payload: {out.summary()}")
+    cache = default_cache()
+    if cache is not None:
+        cache.prune()
+        print(f"  {cache.summary()}")
     return 0
 
 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Streaming reader / writer for triage-results files.
+
+Two on-disk shapes carry the same list of normalized issue dicts:
+
+  * JSON array (``*.json``) — what every existing consumer `json.load`s. It is
+    written compactly, one issue per line, so it stays readable and diffable
+    at a fraction of the ``indent=2`` size.
+  * JSON Lines (``*.jsonl``) — one issue object per line, for multi-repo
+    reports that should be processed with flat memory.
+
+`iter_issues` auto-detects the shape from the first non-blank character, so a
+stage never needs to know what the previous one wrote, and streams both: JSON
+Lines line by line, JSON arrays element by element. `IssueWriter` streams the
+other way and writes through a temp file that replaces the target on close,
+which lets a stage read and rewrite the same path (``--input x --output x``).
+
+Usage:
+    from triage_results import IssueWriter, iter_issues, write_issues
+
+    with IssueWriter("triage-results.json") as out:
+        for issue in iter_issues("triage-results.json"):
+            issue["seen"] = True
+            out.write(issue)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable, Iterator
+
+_CHUNK = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+def detect_format(path: str) -> str:
+    """Return "json" (array) or "jsonl" from the first non-blank character."""
+    with open(path, encoding="utf-8") as fh:
+        while True:
+            chunk = fh.read(_CHUNK)
+            if not chunk:
+                return "json"  # empty file: treat as an empty array
+            stripped = chunk.lstrip(_WHITESPACE)
+            if stripped:
+                return "json" if stripped[0] == "[" else "jsonl"
+
+
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{lineno}: invalid JSON line: {exc}") from exc
+
+
+def _iter_array(path: str) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as fh:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+
+        def fill() -> None:
+            nonlocal buf, pos, eof
+            chunk = fh.read(_CHUNK)
+            if chunk:
+                buf = buf[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+
+        while True:
+            # Skip whitespace and separators, reading more as needed.
+            while pos < len(buf) and (buf[pos] in _WHITESPACE or (started and buf[pos] == ",")):
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    if started:
+                        raise ValueError(f"{path}: unterminated JSON array")
+                    return  # empty file
+                fill()
+                continue
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end >= len(buf) and not eof:
+                # A scalar may continue in the next chunk; decode it again.
+                fill()
+                continue
+            yield obj
+            pos = end
+
+
+def iter_issues(path: str) -> Iterator[dict]:
+    """Stream the issues in a triage-results file (JSON array or JSON Lines)."""
+    if detect_format(path) == "jsonl":
+        return _iter_jsonl(path)
+    return _iter_array(path)
+
+
+def read_issues(path: str) -> list[dict]:
+    return list(iter_issues(path))
+
+
+def format_for_path(path: str) -> str:
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "json"
+
+
+class IssueWriter:
+    """Write issues one at a time; the target is replaced atomically on close.
+
+    `fmt` defaults to the output path's extension (see `format_for_path`).
+    """
+
+    def __init__(self, path: str, fmt: str | None = None) -> None:
+        self.path = path
+        self.fmt = fmt or format_for_path(path)
+        if self.fmt not in ("json", "jsonl"):
+            raise ValueError(f"unknown triage-results format: {self.fmt}")
+        self.count = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._tmp = f"{path}.tmp{os.getpid()}"
+        self._fh = open(self._tmp, "w", encoding="utf-8")
+        if self.fmt == "json":
+            self._fh.write("[")
+
+    def write(self, issue: dict) -> None:
+        line = json.dumps(issue, ensure_ascii=False, separators=(",", ":"))
+        if self.fmt == "json":
+            self._fh.write(("," if self.count else "") + "\n" + line)
+        else:
+            self._fh.write(line + "\n")
+        self.count += 1
+
+    def write_all(self, issues: Iterable[dict]) -> int:
+        for issue in issues:
+            self.write(issue)
+        return self.count
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        if self.fmt == "json":
+            self._fh.write("\n]\n" if self.count else "]\n")
+        self._fh.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self) -> "IssueWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Never leave a half-written file in place of the previous stage's output.
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_issues(path: str, issues: Iterable[dict], fmt: str | None = None) -> int:
+    """Write all issues to `path`; returns how many were written."""
+    with IssueWriter(path, fmt) as out:
+        return out.write_all(issues)
@@ -4,6 +4,14 @@ Assign GitHub issues to specified assignees.
 
 Usage:
     python assign_issue.py <owner> <repo> <issue_number> <assignees>
+    python assign_issue.py <owner> <repo> --batch assignees.jsonl [--current triage-results.json] [--dry-run]
+
+The batch file has one `{"issue_number": 123, "assignees": ["alice"], "remove": [...]}`
+object per line; all issues are assigned concurrently over one pooled
+connection set. Writes are diff-based: only people not yet assigned are added,
+and an issue that already has them is not written at all. Pass the run's
+triage-results.json as --current to take the current assignees from it instead
+of reading each issue. --dry-run prints the diff without writing.
 
 Environment Variables:
     GITHUB_ACCESS_TOKEN or GITHUB_PAT: GitHub personal access token with repo scope
@@ -12,7 +20,23 @@ Environment Variables:
 import os
 import sys
 import argparse
-import requests
+import urllib.error
+from pathlib import Path
+
+# The pooled GitHub client is shared with the triage scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
+from github_client import shared_client  # noqa: E402
+from issue_batch import (  # noqa: E402
+    Change,
+    Delta,
+    apply_deltas,
+    load_current,
+    parse_values,
+    plan,
+    read_batch,
+    run_batch,
+    write_summary,
+)
 
 
 def get_github_token() -> str:
@@ -29,15 +53,34 @@ def assign_issue(
     owner: str, repo: str, issue_number: int, assignees: list[str], token: str
 ) -> dict:
     """Assign users to a GitHub issue."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/assignees"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    response = requests.post(url, headers=headers, json={"assignees": assignees})
-    response.raise_for_status()
-    return response.json()
+    return shared_client(token).post_json(
+        f"/repos/{owner}/{repo}/issues/{issue_number}/assignees", {"assignees": assignees}
+    )
+
+
+def unassign_issue(
+    owner: str, repo: str, issue_number: int, assignees: list[str], token: str
+) -> dict:
+    """Remove users from a GitHub issue's assignees."""
+    return shared_client(token).request(
+        "DELETE", f"/repos/{owner}/{repo}/issues/{issue_number}/assignees",
+        json_body={"assignees": assignees},
+    ).json()
+
+
+def apply_assignee_delta(owner: str, repo: str, delta: Delta, token: str, write: bool = True) -> int:
+    """Write one issue's assignee delta; returns the number of API writes it takes."""
+    writes = 0
+    if delta.add:
+        if write:
+            assign_issue(owner, repo, delta.number, delta.add, token)
+        writes += 1
+    if delta.remove:
+        # The endpoint takes a list, so all removals share one call.
+        if write:
+            unassign_issue(owner, repo, delta.number, delta.remove, token)
+        writes += 1
+    return writes
 
 
 def main():
@@ -46,28 +89,84 @@ def main():
     )
     parser.add_argument("owner", help="Repository owner (e.g., 'microsoft')")
     parser.add_argument("repo", help="Repository name (e.g., 'vscode')")
-    parser.add_argument("issue_number", type=int, help="Issue number to assign")
+    parser.add_argument("issue_number", type=int, nargs="?", help="Issue number to assign")
+    parser.add_argument(
+        "assignees", nargs="?", help="Comma-separated list of assignees (e.g., 'alice,bob')"
+    )
+    parser.add_argument(
+        "--remove", default="", help="Comma-separated assignees to remove from the issue"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help='JSON Lines of {"issue_number": N, "assignees": [...], "remove": [...]} '
+             'to apply concurrently ("-" for stdin)',
+    )
     parser.add_argument(
-        "assignees", help="Comma-separated list of assignees (e.g., 'alice,bob')"
+        "--current",
+        metavar="FILE",
+        help="triage-results.json (or .jsonl) to read current assignees from instead of the API",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the assignee diff (skipping people already assigned) without writing",
     )
 
     args = parser.parse_args()
-    assignees = [a.strip().lstrip("@") for a in args.assignees.split(",")]
+    if args.batch and (args.issue_number is not None or args.assignees or args.remove):
+        parser.error("pass either --batch or <issue_number> <assignees>, not both")
+    if not args.batch and (args.issue_number is None or args.assignees is None):
+        parser.error("<issue_number> and <assignees> are required without --batch")
 
     try:
         token = get_github_token()
-        result = assign_issue(
-            args.owner, args.repo, args.issue_number, assignees, token
+        client = shared_client(token)
+        current = load_current(args.current, args.owner, args.repo, "assignees") if args.current else None
+
+        def apply(delta: Delta, write: bool = True) -> int:
+            return apply_assignee_delta(args.owner, args.repo, delta, token, write)
+
+        if args.batch:
+            changes = read_batch(args.batch, "assignees")
+            code = run_batch(
+                client, args.owner, args.repo, changes, "assignees", apply,
+                dry_run=args.dry_run, current=current,
+            )
+            client.print_stats()
+            sys.exit(code)
+
+        change = Change(
+            args.issue_number,
+            parse_values(args.assignees, "assignees"),
+            parse_values(args.remove, "assignees"),
         )
-        print(
-            f"✅ Issue #{args.issue_number} assigned to: {', '.join('@' + a for a in assignees)}"
+        changes = {change.number: change}
+        [outcome] = apply_deltas(
+            client, plan(client, args.owner, args.repo, changes, "assignees", current), apply, args.dry_run
         )
+        if outcome.error is not None:
+            raise outcome.error
+        delta = outcome.delta
+        skipped = f" (already assigned, skipped: {', '.join(delta.skipped)})" if delta.skipped else ""
+        if args.dry_run:
+            print(f"Dry run: issue #{change.number}: {delta.describe()}{skipped}")
+        elif not (delta.add or delta.remove):
+            print(
+                f"✅ Issue #{change.number} already assigned to: "
+                f"{', '.join('@' + a for a in change.add)} (nothing to write)"
+            )
+        else:
+            print(
+                f"✅ Issue #{change.number} assigned to: {', '.join('@' + a for a in delta.final)}{skipped}"
+            )
+        print(write_summary(changes, [outcome], args.dry_run))
         sys.exit(0)
     except ValueError as e:
         print(f"❌ Configuration error: {e}", file=sys.stderr)
         sys.exit(1)
-    except requests.HTTPError as e:
-        print(f"❌ GitHub API error: {e}", file=sys.stderr)
+    except urllib.error.HTTPError as e:
+        print(f"❌ GitHub API error: HTTP {e.code} {e.msg}", file=sys.stderr)
         sys.exit(1)
 
 
@@ -12,8 +12,12 @@ It demonstrates the required structure and the I/O contract described in
   * reading the issue array and writing it back with sla_status / days_open /
     sla_details added,
   * the `has_parent` shortcut that keeps fixture verification offline,
-  * case-insensitive label-group matching,
-  * graceful degradation on per-issue API errors.
+  * batched parent-link resolution via ../scripts/parent_resolver.py
+    (concurrent, cached), with a serial stdlib fallback when it is unavailable,
+  * case-insensitive label-group matching (groups normalized once, O(1)
+    membership) with the same rule as the label-issue skill's taxonomy,
+  * graceful degradation on per-issue API errors: a parent lookup that fails
+    is reported separately and never turns into a VIOLATION by itself.
 
 The POLICY implemented below is only an illustrative default. When generating
 the real script, replace the policy logic in `evaluate()` with exactly what the
@@ -31,6 +35,14 @@ from datetime import datetime, timezone
 
 API = "https://api.github.com"
 
+# Batched, cached parent lookups live in the check-sla skill. Workflows run from
+# the repository root; CHECK_SLA_SCRIPTS overrides the location.
+sys.path.insert(0, os.environ.get("CHECK_SLA_SCRIPTS", os.path.join(".github", "skills", "check-sla", "scripts")))
+try:
+    from parent_resolver import ParentResolver
+except ImportError:  # stand-alone copy: fall back to serial lookups below
+    ParentResolver = None
+
 # --- Policy constants (REPLACE per the target repo's .github/sla.md) --------- #
 TOLERANCE_DAYS = 7
 EXEMPT_LABEL_GROUPS = [
@@ -42,15 +54,24 @@ ATTENTION_LABEL_GROUP = {
 }
 
 
+# Same rule as normalize_label() in .github/scripts/triage/label_taxonomy.py
+# (used by the label-issue skill); kept inline so the script stays stdlib-only.
 def normalize_label(label: str) -> str:
     """Lower-case and collapse '-' / spaces so variations compare equal."""
     return label.strip().lower().replace("-", " ")
 
 
-def label_in_group(labels: set[str], group: set[str]) -> bool:
-    norm_labels = {normalize_label(lbl) for lbl in labels}
-    norm_group = {normalize_label(g) for g in group}
-    return bool(norm_labels & norm_group)
+def label_group(names) -> frozenset:
+    return frozenset(normalize_label(name) for name in names)
+
+
+def label_in_group(labels, group: frozenset) -> bool:
+    return any(normalize_label(lbl) in group for lbl in labels)
+
+
+# Normalized once here; label_in_group is then a set lookup per label.
+EXEMPT_GROUPS = [label_group(grp) for grp in EXEMPT_LABEL_GROUPS]
+ATTENTION_GROUP = label_group(ATTENTION_LABEL_GROUP)
 
 
 def days_open(created_at: str) -> int:
@@ -60,8 +81,8 @@ def days_open(created_at: str) -> int:
     return (datetime.now(timezone.utc) - created).days
 
 
-def fetch_has_parent(repo: str, issue_number: int, token: str | None) -> bool:
-    """Return True if the issue has a parent via GitHub's sub-issues API."""
+def fetch_has_parent(repo: str, issue_number: int, token: str | None) -> bool | None:
+    """Return True/False from GitHub's sub-issues API, or None if it could not be determined."""
     url = f"{API}/repos/{repo}/issues/{issue_number}/parent"
     req = urllib.request.Request(url)
     req.add_header("Accept", "application/vnd.github+json")
@@ -74,27 +95,51 @@ def fetch_has_parent(repo: str, issue_number: int, token: str | None) -> bool:
     except urllib.error.HTTPError as exc:
         if exc.code == 404:
             return False
-        # Conservatively treat transient errors as "no parent" without crashing.
-        return False
+        return None
     except Exception:  # noqa: BLE001
-        return False
-
-
-def has_parent(issue: dict, token: str | None) -> bool:
-    # Offline shortcut used by the fixture: trust an explicit boolean if present.
-    if isinstance(issue.get("has_parent"), bool):
-        return issue["has_parent"]
-    return fetch_has_parent(issue["repo"], issue["issue_number"], token)
-
-
-def evaluate(issue: dict, token: str | None) -> None:
+        return None
+
+
+def resolve_parents(issues: list[dict], token: str | None) -> dict[tuple[str, int], bool | None]:
+    """Map (repo, issue_number) -> has_parent (None = lookup failed) for every issue.
+
+    Explicit `has_parent` booleans are used as-is, so the fixture stays offline.
+    Only issues past the tolerance window and not exempt ever need a lookup, and
+    the resolver (with its on-disk caches) is only opened when one does.
+    """
+    needed = [
+        i for i in issues
+        if days_open(i.get("createdAt", "")) > TOLERANCE_DAYS
+        and not any(label_in_group(set(i.get("labels", [])), grp) for grp in EXEMPT_GROUPS)
+    ]
+    parents: dict[tuple[str, int], bool | None] = {
+        (i["repo"], i["issue_number"]): i["has_parent"] for i in needed if isinstance(i.get("has_parent"), bool)
+    }
+    lookups = [i for i in needed if (i["repo"], i["issue_number"]) not in parents]
+    if not lookups:
+        return parents
+    if ParentResolver is not None:
+        resolver = ParentResolver(token)
+        results = resolver.resolve(lookups)
+        print(resolver.summary(), file=sys.stderr)
+        resolver.close()
+        parents.update((key, r.has_parent) for key, r in results.items())
+        return parents
+    for issue in lookups:
+        parents[(issue["repo"], issue["issue_number"])] = fetch_has_parent(
+            issue["repo"], issue["issue_number"], token
+        )
+    return parents
+
+
+def evaluate(issue: dict, parents: dict[tuple[str, int], bool | None]) -> None:
     """Apply the SLA policy and set sla_status / days_open / sla_details."""
     labels = set(issue.get("labels", []))
     opened = days_open(issue.get("createdAt", ""))
     issue["days_open"] = opened
 
     # 1. Exempt labels -> always GOOD.
-    if any(label_in_group(labels, grp) for grp in EXEMPT_LABEL_GROUPS):
+    if any(label_in_group(labels, grp) for grp in EXEMPT_GROUPS):
         issue["sla_status"] = "GOOD"
         issue["sla_details"] = "Exempt: waiting on reporter (need more info / need log)."
         return
@@ -106,15 +151,21 @@ def evaluate(issue: dict, token: str | None) -> None:
         return
 
     # 3. Past tolerance: GOOD only if parent link exists AND no attention label.
-    parent = has_parent(issue, token)
-    attention = label_in_group(labels, ATTENTION_LABEL_GROUP)
+    parent = parents.get((issue["repo"], issue["issue_number"]))
+    attention = label_in_group(labels, ATTENTION_GROUP)
     if parent and not attention:
         issue["sla_status"] = "GOOD"
         issue["sla_details"] = "Has parent link and no 'need attention' label."
         return
 
+    # An unknown parent link alone must never produce a VIOLATION.
+    if parent is None and not attention:
+        issue["sla_status"] = "WARNING"
+        issue["sla_details"] = f"Open {opened}d > {TOLERANCE_DAYS}d; parent link could not be checked."
+        return
+
     reasons = []
-    if not parent:
+    if parent is False:
         reasons.append("no parent link")
     if attention:
         reasons.append("has 'need attention' label")
@@ -133,9 +184,14 @@ def main() -> int:
     with open(args.input, encoding="utf-8") as fh:
         issues = json.load(fh)
 
+    parents = resolve_parents(issues, token)
+    failed = sorted(f"{repo}#{num}" for (repo, num), parent in parents.items() if parent is None)
+    if failed:
+        print(f"Parent lookup failed for {len(failed)} issue(s): {', '.join(failed)}", file=sys.stderr)
+
     counts = {"GOOD": 0, "WARNING": 0, "VIOLATION": 0}
     for issue in issues:
-        evaluate(issue, token)
+        evaluate(issue, parents)
         counts[issue["sla_status"]] = counts.get(issue["sla_status"], 0) + 1
 
     with open(args.output, "w", encoding="utf-8") as fh:
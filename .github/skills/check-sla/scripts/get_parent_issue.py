@@ -16,8 +16,12 @@ import argparse
 import json
 import os
 import sys
+import urllib.error
+from pathlib import Path
 
-import requests
+# The pooled GitHub client is shared with the triage scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
+from github_client import shared_client  # noqa: E402
 
 
 def get_github_token() -> str:
@@ -31,21 +35,12 @@ def get_github_token() -> str:
 
 def get_parent_issue(owner: str, repo: str, issue_number: int, token: str) -> dict | None:
     """Fetch the parent issue via GET /repos/{owner}/{repo}/issues/{issue_number}/parent."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/parent"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        return response.json()
-    if response.status_code == 404:
+    response = shared_client(token).request(
+        "GET", f"/repos/{owner}/{repo}/issues/{issue_number}/parent", allow=(404,)
+    )
+    if response.status == 404:
         return None
-
-    response.raise_for_status()
+    return response.json()
 
 
 def main() -> None:
@@ -86,10 +81,8 @@ def main() -> None:
     except ValueError as e:
         print(f"❌ Configuration error: {e}", file=sys.stderr)
         sys.exit(1)
-    except requests.HTTPError as e:
-        print(f"❌ API error: {e}", file=sys.stderr)
-        if e.response is not None:
-            print(f"   Response: {e.response.text}", file=sys.stderr)
+    except urllib.error.HTTPError as e:
+        print(f"❌ API error: HTTP {e.code} {e.msg}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"❌ Unexpected error: {e}", file=sys.stderr)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Resolve `has_parent` for a whole issue list at once, with a persistent cache.
+
+The generated `sla_check.py` imports this module (see
+../references/example_sla_check.py) instead of calling the sub-issues API
+serially for every issue past the tolerance window:
+
+  * Lookups run concurrently on the shared GitHub client's bounded worker pool
+    (keep-alive connections, rate-limit handling, 5xx retries), plus a few
+    extra retries here for transport errors.
+  * Results persist in a small SQLite file with a TTL. Parent links rarely
+    change, so "has a parent" is trusted for days; "no parent" is re-checked
+    sooner because linking a parent is exactly the fix we want to notice.
+  * A lookup that still fails is reported as a failure (`has_parent` None)
+    rather than silently treated as "no parent", so it cannot turn into a
+    false VIOLATION.
+
+Issues that already carry a boolean `has_parent` (the fixture, or
+`fetch_issues.py --backend graphql`) are never looked up.
+
+Environment variables:
+  ISSUELENS_PARENT_CACHE   Path of the cache file, or "off" to disable.
+                           Default: ~/.cache/issuelens/parents.sqlite
+
+Usage:
+    from parent_resolver import ParentResolver
+
+    resolver = ParentResolver(token)
+    parents = resolver.resolve(issues)           # {(repo, number): ParentResult}
+    print(resolver.summary(), file=sys.stderr)
+
+    python parent_resolver.py --input triage-results.json   # ad-hoc report
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import urllib.error
+from dataclasses import dataclass
+from pathlib import Path
+
+# The pooled GitHub client is shared with the triage scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
+from github_client import shared_client  # noqa: E402
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "parents.sqlite")
+POSITIVE_TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 6 * 3600
+RETRIES = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    repo TEXT NOT NULL,
+    issue_number INTEGER NOT NULL,
+    has_parent INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (repo, issue_number)
+);
+"""
+
+
+@dataclass
+class ParentResult:
+    has_parent: bool | None  # None = could not be determined
+    source: str  # "input" | "cache" | "api" | "error"
+    error: str = ""
+
+
+def _cache_path() -> str | None:
+    path = os.environ.get("ISSUELENS_PARENT_CACHE", DEFAULT_CACHE).strip()
+    if not path or path.lower() in ("off", "0", "false", "none"):
+        return None
+    return path
+
+
+class ParentResolver:
+    """Concurrent, cached sub-issues parent lookups for a batch of issues.
+
+    `cache_path` defaults to $ISSUELENS_PARENT_CACHE (or the standard path);
+    pass None to run without the persistent cache.
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        cache_path: str | None = "",
+        positive_ttl: float = POSITIVE_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        retries: int = RETRIES,
+    ) -> None:
+        self.token = token
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.retries = max(1, retries)
+        self.failures: dict[tuple[str, int], str] = {}
+        self.counts = {"input": 0, "cache": 0, "api": 0, "error": 0}
+        self._db = None
+        path = _cache_path() if cache_path == "" else cache_path
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(path)
+                self._db.executescript(_SCHEMA)
+            except (OSError, sqlite3.Error) as exc:
+                print(f"Parent cache disabled ({path}): {exc}", file=sys.stderr)
+                self._db = None
+
+    def _cached(self, repo: str, number: int) -> bool | None:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT has_parent, checked_at FROM parents WHERE repo = ? AND issue_number = ?",
+            (repo, number),
+        ).fetchone()
+        if row is None:
+            return None
+        ttl = self.positive_ttl if row[0] else self.negative_ttl
+        return bool(row[0]) if time.time() - row[1] < ttl else None
+
+    def _lookup(self, key: tuple[str, int]) -> ParentResult:
+        repo, number = key
+        client = shared_client(self.token)
+        last_error = ""
+        for attempt in range(self.retries):
+            try:
+                resp = client.request("GET", f"/repos/{repo}/issues/{number}/parent", allow=(404,))
+                return ParentResult(resp.status == 200, "api")
+            except urllib.error.HTTPError as exc:
+                # The client already retried rate limits and 5xx; a 4xx here
+                # (bad token, no access) will not improve with another try.
+                return ParentResult(None, "error", f"HTTP {exc.code}")
+            except Exception as exc:  # noqa: BLE001 - transport errors: retry, then report
+                last_error = str(exc) or type(exc).__name__
+                time.sleep(2 ** attempt)
+        return ParentResult(None, "error", last_error)
+
+    def resolve(self, issues: list[dict]) -> dict[tuple[str, int], ParentResult]:
+        """Return a ParentResult for every issue, keyed by (repo, issue_number)."""
+        results: dict[tuple[str, int], ParentResult] = {}
+        to_fetch: list[tuple[str, int]] = []
+        for issue in issues:
+            key = (issue["repo"], int(issue["issue_number"]))
+            if isinstance(issue.get("has_parent"), bool):
+                results[key] = ParentResult(issue["has_parent"], "input")
+                continue
+            cached = self._cached(*key)
+            if cached is not None:
+                results[key] = ParentResult(cached, "cache")
+            elif key not in results:
+                to_fetch.append(key)
+        to_fetch = list(dict.fromkeys(to_fetch))
+
+        fetched = shared_client(self.token).map(self._lookup, to_fetch)
+        now = time.time()
+        for key, result in zip(to_fetch, fetched):
+            results[key] = result
+            if result.has_parent is None:
+                self.failures[key] = result.error
+            elif self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parents VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], int(result.has_parent), now),
+                )
+        if self._db is not None:
+            self._db.commit()
+        for result in results.values():
+            self.counts[result.source] += 1
+        return results
+
+    def summary(self) -> str:
+        c = self.counts
+        return (
+            f"Parent links: {c['input']} from input, {c['cache']} cached, "
+            f"{c['api']} looked up, {c['error']} failed"
+        )
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Resolve parent links for an issue list.")
+    parser.add_argument("--input", required=True, help="Issue array (triage-results.json shape)")
+    args = parser.parse_args()
+
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    with open(args.input, encoding="utf-8") as fh:
+        issues = json.load(fh)
+
+    resolver = ParentResolver(token)
+    results = resolver.resolve(issues)
+    for (repo, number), result in sorted(results.items()):
+        state = {True: "parent", False: "no parent", None: f"FAILED ({result.error})"}[result.has_parent]
+        print(f"{repo}#{number}: {state} [{result.source}]")
+    print(resolver.summary(), file=sys.stderr)
+    resolver.close()
+    return 1 if resolver.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
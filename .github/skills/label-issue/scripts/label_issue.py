@@ -4,6 +4,19 @@ Add labels to GitHub issues.
 
 Usage:
     python label_issue.py <owner> <repo> <issue_number> <labels>
+    python label_issue.py <owner> <repo> --batch labels.jsonl [--current triage-results.json] [--dry-run]
+
+The batch file has one `{"issue_number": 123, "labels": ["bug"], "remove": [...]}`
+object per line; all issues are labelled concurrently over one pooled
+connection set. Writes are diff-based: only labels the issue lacks are added,
+and an issue that already has them is not written at all. Pass the run's
+triage-results.json as --current to take the current labels from it instead
+of reading each issue. --dry-run prints the diff without writing.
+
+Requested labels are first resolved against the repository's cached label
+taxonomy (label_taxonomy.py), so "Needs-More-Info" is applied as the existing
+"needs more info" label instead of GitHub silently creating a new one. Names
+that match no label are reported; --no-taxonomy skips the check.
 
 Environment Variables:
     GITHUB_ACCESS_TOKEN or GITHUB_PAT: GitHub personal access token with repo scope
@@ -12,7 +25,25 @@ Environment Variables:
 import os
 import sys
 import argparse
-import requests
+import urllib.error
+import urllib.parse
+from pathlib import Path
+
+# The pooled GitHub client is shared with the triage scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
+from github_client import shared_client  # noqa: E402
+from issue_batch import (  # noqa: E402
+    Change,
+    Delta,
+    apply_deltas,
+    load_current,
+    parse_values,
+    plan,
+    read_batch,
+    run_batch,
+    write_summary,
+)
+from label_taxonomy import load_taxonomy  # noqa: E402
 
 
 def get_github_token() -> str:
@@ -29,15 +60,53 @@ def add_labels(
     owner: str, repo: str, issue_number: int, labels: list[str], token: str
 ) -> dict:
     """Add labels to a GitHub issue."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/labels"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    response = requests.post(url, headers=headers, json={"labels": labels})
-    response.raise_for_status()
-    return response.json()
+    return shared_client(token).post_json(
+        f"/repos/{owner}/{repo}/issues/{issue_number}/labels", {"labels": labels}
+    )
+
+
+def remove_label(
+    owner: str, repo: str, issue_number: int, label: str, token: str
+) -> None:
+    """Remove one label from a GitHub issue; a label already gone is not an error."""
+    shared_client(token).request(
+        "DELETE",
+        f"/repos/{owner}/{repo}/issues/{issue_number}/labels/{urllib.parse.quote(label, safe='')}",
+        allow=(404,),
+    )
+
+
+def apply_label_delta(owner: str, repo: str, delta: Delta, token: str, write: bool = True) -> int:
+    """Write one issue's label delta; returns the number of API writes it takes."""
+    writes = 0
+    if delta.add:
+        if write:
+            add_labels(owner, repo, delta.number, delta.add, token)
+        writes += 1
+    # One DELETE per label rather than a PUT of the final set: a PUT would
+    # race with other workflows labelling the same issue and drop their labels.
+    for label in delta.remove:
+        if write:
+            remove_label(owner, repo, delta.number, label, token)
+        writes += 1
+    return writes
+
+
+def canonicalize(changes: dict[int, Change], taxonomy) -> list[str]:
+    """Rewrite requested labels to the repository's spelling in place; returns unknown names."""
+    unknown: dict[str, None] = {}
+
+    def resolve(label: str) -> str:
+        name = taxonomy.canonical(label)
+        if name is None:
+            unknown[label] = None
+            return label
+        return name
+
+    for change in changes.values():
+        change.add = parse_values([resolve(label) for label in change.add], "labels")
+        change.remove = parse_values([taxonomy.canonical(label) or label for label in change.remove], "labels")
+    return list(unknown)
 
 
 def main():
@@ -46,31 +115,104 @@ def main():
     )
     parser.add_argument("owner", help="Repository owner (e.g., 'microsoft')")
     parser.add_argument("repo", help="Repository name (e.g., 'vscode')")
-    parser.add_argument("issue_number", type=int, help="Issue number to label")
+    parser.add_argument("issue_number", type=int, nargs="?", help="Issue number to label")
+    parser.add_argument(
+        "labels", nargs="?", help="Comma-separated list of labels (e.g., 'bug,priority:high')"
+    )
     parser.add_argument(
-        "labels", help="Comma-separated list of labels (e.g., 'bug,priority:high')"
+        "--remove", default="", help="Comma-separated labels to remove from the issue"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help='JSON Lines of {"issue_number": N, "labels": [...], "remove": [...]} '
+             'to apply concurrently ("-" for stdin)',
+    )
+    parser.add_argument(
+        "--current",
+        metavar="FILE",
+        help="triage-results.json (or .jsonl) to read current labels from instead of the API",
+    )
+    parser.add_argument(
+        "--no-taxonomy",
+        action="store_true",
+        help="Don't resolve label names against the repository's cached label taxonomy",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the label diff (skipping labels already present) without writing",
     )
 
     args = parser.parse_args()
-    labels = [label.strip() for label in args.labels.split(",") if label.strip()]
-
-    if not labels:
-        print("❌ No labels provided.", file=sys.stderr)
-        sys.exit(1)
+    if args.batch and (args.issue_number is not None or args.labels or args.remove):
+        parser.error("pass either --batch or <issue_number> <labels>, not both")
+    if not args.batch and (args.issue_number is None or args.labels is None):
+        parser.error("<issue_number> and <labels> are required without --batch")
 
     try:
         token = get_github_token()
-        result = add_labels(args.owner, args.repo, args.issue_number, labels, token)
-        applied_labels = [label["name"] for label in result]
-        print(f"✅ Labels added to issue #{args.issue_number}: {', '.join(applied_labels)}")
+        client = shared_client(token)
+        current = load_current(args.current, args.owner, args.repo, "labels") if args.current else None
+
+        def apply(delta: Delta, write: bool = True) -> int:
+            return apply_label_delta(args.owner, args.repo, delta, token, write)
+
+        def resolve_names(changes: dict[int, Change]) -> None:
+            if args.no_taxonomy:
+                return
+            try:
+                taxonomy = load_taxonomy(f"{args.owner}/{args.repo}", client=client)
+            except urllib.error.HTTPError as e:
+                print(f"⚠️ Label taxonomy unavailable (HTTP {e.code}); using names as given.", file=sys.stderr)
+                return
+            print(taxonomy.summary(), file=sys.stderr)
+            unknown = canonicalize(changes, taxonomy)
+            if unknown:
+                print(
+                    f"⚠️ Labels not found in {args.owner}/{args.repo} (GitHub will create them): "
+                    f"{', '.join(unknown)}",
+                    file=sys.stderr,
+                )
+
+        if args.batch:
+            changes = read_batch(args.batch, "labels")
+            resolve_names(changes)
+            code = run_batch(
+                client, args.owner, args.repo, changes, "labels", apply,
+                dry_run=args.dry_run, current=current,
+            )
+            client.print_stats()
+            sys.exit(code)
+
+        change = Change(
+            args.issue_number, parse_values(args.labels, "labels"), parse_values(args.remove, "labels")
+        )
+        if not change.add and not change.remove:
+            print("❌ No labels provided.", file=sys.stderr)
+            sys.exit(1)
+        changes = {change.number: change}
+        resolve_names(changes)
+        [outcome] = apply_deltas(
+            client, plan(client, args.owner, args.repo, changes, "labels", current), apply, args.dry_run
+        )
+        if outcome.error is not None:
+            raise outcome.error
+        delta = outcome.delta
+        skipped = f" (already present, skipped: {', '.join(delta.skipped)})" if delta.skipped else ""
+        if args.dry_run:
+            print(f"Dry run: issue #{change.number}: {delta.describe()}{skipped}")
+        elif not (delta.add or delta.remove):
+            print(f"✅ Issue #{change.number} already has: {', '.join(change.add)} (nothing to write)")
+        else:
+            print(f"✅ Labels on issue #{change.number}: {delta.describe()}{skipped}")
+        print(write_summary(changes, [outcome], args.dry_run))
         sys.exit(0)
     except ValueError as e:
         print(f"❌ Configuration error: {e}", file=sys.stderr)
         sys.exit(1)
-    except requests.HTTPError as e:
-        print(f"❌ GitHub API error: {e}", file=sys.stderr)
-        if e.response is not None:
-            print(f"   Response: {e.response.text}", file=sys.stderr)
+    except urllib.error.HTTPError as e:
+        print(f"❌ GitHub API error: HTTP {e.code} {e.msg}", file=sys.stderr)
         sys.exit(1)
 
 
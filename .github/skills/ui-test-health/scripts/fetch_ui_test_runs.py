@@ -21,10 +21,14 @@ import re
 import sys
 import time
 import urllib.error
-import urllib.parse
 import urllib.request
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# The pooled GitHub client is shared with the triage scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
+from github_client import shared_client  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -39,45 +43,21 @@ def get_token() -> str:
     return token
 
 
-def _github_api_headers(token: str) -> dict:
-    return {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-
-
 def github_get(url: str, token: str, params: dict | None = None) -> dict | list:
-    """Perform a GitHub REST API GET request and return parsed JSON."""
-    if params:
-        url = url + "?" + urllib.parse.urlencode(params)
-    req = urllib.request.Request(
-        url,
-        headers=_github_api_headers(token),
-    )
-    for attempt in range(3):
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                remaining = resp.headers.get("X-RateLimit-Remaining")
-                if remaining is not None and int(remaining) < 10:
-                    print("Rate limit nearly exhausted — sleeping 60s...", file=sys.stderr)
-                    time.sleep(60)
-                return json.loads(resp.read().decode("utf-8"))
-        except urllib.error.HTTPError as exc:
-            if exc.code == 404:
-                body = exc.read().decode("utf-8", errors="replace")
-                print(f"HTTP 404 Not Found: {url}", file=sys.stderr)
-                print(f"Response body: {body}", file=sys.stderr)
-                token_len = len(token) if token else 0
-                print(f"Token length: {token_len}", file=sys.stderr)
-            if exc.code == 429 or exc.code == 403:
-                retry_after = exc.headers.get("Retry-After")
-                wait = int(retry_after) if retry_after and retry_after.isdigit() else 60 * (attempt + 1)
-                print(f"Rate limited (HTTP {exc.code}), waiting {wait}s...", file=sys.stderr)
-                time.sleep(wait)
-                continue
-            raise
-    raise RuntimeError(f"Failed to GET {url} after 3 attempts")
+    """Perform a GitHub REST API GET request and return parsed JSON.
+
+    Goes through the shared pooled client, which owns keep-alive, retries and
+    the rate-limit policy (Retry-After / X-RateLimit-Remaining).
+    """
+    try:
+        return shared_client(token).get_json(url, params=params)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 404:
+            print(f"HTTP 404 Not Found: {exc.url}", file=sys.stderr)
+            print(f"Response body: {exc.msg}", file=sys.stderr)
+            token_len = len(token) if token else 0
+            print(f"Token length: {token_len}", file=sys.stderr)
+        raise
 
 
 def github_get_all_pages(base_url: str, token: str, params: dict | None = None, max_items: int = 0) -> list:
@@ -179,12 +159,6 @@ def fetch_jobs_for_run(owner: str, repo: str, run_id: int, attempt: int, token:
 # Step 3b: Fetch and parse job logs for failure reasons
 # ---------------------------------------------------------------------------
 
-class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
-    """Raise immediately on any redirect so we can capture the Location header."""
-    def redirect_request(self, req, fp, code, msg, headers, newurl):
-        raise urllib.error.HTTPError(newurl, code, msg, headers, fp)
-
-
 def fetch_job_log(owner: str, repo: str, job_id: int, token: str) -> str | None:
     """Fetch the plain-text log for a job via the GitHub API redirect.
 
@@ -194,26 +168,26 @@ def fetch_job_log(owner: str, repo: str, job_id: int, token: str) -> str | None:
     Returns the decoded log text, or None if the log could not be fetched.
     """
     url = f"https://api.github.com/repos/{owner}/{repo}/actions/jobs/{job_id}/logs"
-    req = urllib.request.Request(url, headers=_github_api_headers(token))
-    opener = urllib.request.build_opener(_NoRedirectHandler())
     try:
-        with opener.open(req, timeout=30):
-            pass  # non-redirect response: no log content available at this URL
+        # The client never follows redirects, so the 302 comes back as-is.
+        resp = shared_client(token).request("GET", url)
     except urllib.error.HTTPError as exc:
-        if exc.code in (301, 302, 303, 307, 308):
-            redirect_url = exc.headers.get("Location")
-            if not redirect_url:
-                return None
-            try:
-                with urllib.request.urlopen(redirect_url, timeout=60) as resp:
-                    return resp.read().decode("utf-8", errors="replace")
-            except Exception as fetch_exc:
-                print(f"  Warning: could not fetch log blob for job {job_id}: {fetch_exc}", file=sys.stderr)
-                return None
         print(f"  Warning: HTTP {exc.code} fetching log for job {job_id}", file=sys.stderr)
+        return None
     except Exception as exc:
         print(f"  Warning: could not fetch log for job {job_id}: {exc}", file=sys.stderr)
-    return None
+        return None
+    if resp.status not in (301, 302, 303, 307, 308):
+        return None  # non-redirect response: no log content available at this URL
+    redirect_url = resp.headers.get("location")
+    if not redirect_url:
+        return None
+    try:
+        with urllib.request.urlopen(redirect_url, timeout=60) as blob:
+            return blob.read().decode("utf-8", errors="replace")
+    except Exception as fetch_exc:
+        print(f"  Warning: could not fetch log blob for job {job_id}: {fetch_exc}", file=sys.stderr)
+        return None
 
 
 _FAILED_LINE_RE = re.compile(r"(\w[\w$]*)\s*>\s*(.+?)\(\)\s+FAILED", re.MULTILINE)
@@ -357,6 +331,21 @@ def classify_error_category(exc_type: str | None, exc_msg: str | None,
 _check_runs_cache: dict[str, list[dict] | None] = {}
 
 
+def list_check_runs(owner: str, repo: str, sha: str, token: str) -> list[dict] | None:
+    """List all check runs for a commit and store them in the SHA cache."""
+    url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}/check-runs"
+    t0 = time.time()
+    try:
+        check_runs = github_get_all_pages(url, token, params={"per_page": 100})
+    except Exception as exc:
+        print(f"  Warning: could not list check-runs for {sha[:8]}: {exc}", file=sys.stderr)
+        check_runs = None
+    print(f"    check-runs for {sha[:8]}: {len(check_runs or [])} items, {time.time()-t0:.1f}s",
+          file=sys.stderr)
+    _check_runs_cache[sha] = check_runs
+    return check_runs
+
+
 def fetch_annotations(owner: str, repo: str, sha: str, ide_type: str, ide_version: str,
                       test_class: str, token: str) -> list[dict]:
     """Fetch check-run annotations from the 'ui test report' check run for this combo.
@@ -374,16 +363,7 @@ def fetch_annotations(owner: str, repo: str, sha: str, ide_type: str, ide_versio
     if sha in _check_runs_cache:
         check_runs = _check_runs_cache[sha]
     else:
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}/check-runs"
-        t0 = time.time()
-        try:
-            check_runs = github_get_all_pages(url, token, params={"per_page": 100})
-        except Exception as exc:
-            print(f"  Warning: could not list check-runs for {sha[:8]}: {exc}", file=sys.stderr)
-            check_runs = None
-        print(f"    check-runs for {sha[:8]}: {len(check_runs or [])} items, {time.time()-t0:.1f}s",
-              file=sys.stderr)
-        _check_runs_cache[sha] = check_runs
+        check_runs = list_check_runs(owner, repo, sha, token)
 
     if not check_runs:
         return []
@@ -572,7 +552,8 @@ def enrich_pr_metadata(entries: list, owner: str, repo: str, token: str,
     pr_number but no title/author (e.g. runs whose commit SHA was not the PR's
     current head SHA at fetch time).
 
-    Makes one API call per unique missing PR number. Pass ``shared_cache`` to
+    Makes one API call per unique missing PR number, fanned out over the
+    shared client's worker pool. Pass ``shared_cache`` to
     share already-fetched results across multiple calls and avoid duplicate
     API requests for the same PR number.
     """
@@ -588,13 +569,17 @@ def enrich_pr_metadata(entries: list, owner: str, repo: str, token: str,
 
     if missing:
         print(f"Enriching metadata for {len(missing)} PR(s) with missing title/author...", file=sys.stderr)
-        for pr_number in missing:
-            url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-            try:
-                data = github_get(url, token)
-                shared_cache[pr_number] = _pr_info_from_api(data)
-            except Exception as exc:
-                print(f"  Warning: could not fetch PR #{pr_number}: {exc}", file=sys.stderr)
+        numbers = sorted(missing)
+        fetched = shared_client(token).map(
+            lambda n: github_get(f"https://api.github.com/repos/{owner}/{repo}/pulls/{n}", token),
+            numbers,
+            return_exceptions=True,
+        )
+        for pr_number, data in zip(numbers, fetched):
+            if isinstance(data, Exception):
+                print(f"  Warning: could not fetch PR #{pr_number}: {data}", file=sys.stderr)
+                continue
+            shared_cache[pr_number] = _pr_info_from_api(data)
 
     for e in entries:
         num = e.get("pr_number")
@@ -886,6 +871,22 @@ def aggregate_results(runs: list, sha_to_pr: dict, owner: str, repo: str, token:
     total_runs = len(runs)
     print(f"Fetching jobs for {total_runs} runs...", file=sys.stderr)
 
+    # GitHub's list-runs API only returns the *latest* attempt of each run.
+    # To see the full retry history we must also fetch jobs for every earlier
+    # attempt (1 … attempt-1) individually. These calls are independent, so
+    # fan them out over the shared client's worker pool up front.
+    attempt_keys = [
+        (run["id"], att)
+        for run in runs
+        for att in range(1, run.get("run_attempt", 1) + 1)
+    ]
+    fetched = shared_client(token).map(
+        lambda key: fetch_jobs_for_run(owner, repo, key[0], key[1], token),
+        attempt_keys,
+        return_exceptions=True,
+    )
+    jobs_by_attempt = dict(zip(attempt_keys, fetched))
+
     for i, run in enumerate(runs, 1):
         run_id = run["id"]
         attempt = run.get("run_attempt", 1)
@@ -904,17 +905,11 @@ def aggregate_results(runs: list, sha_to_pr: dict, owner: str, repo: str, token:
         if (i % 10) == 0 or i == total_runs:
             print(f"  Processing run {i}/{total_runs}...", file=sys.stderr)
 
-        # GitHub's list-runs API only returns the *latest* attempt of each run.
-        # To see the full retry history we must also fetch jobs for every earlier
-        # attempt (1 … attempt-1) individually.
-        attempts_to_fetch = list(range(1, attempt + 1))
-
         parsed_any = False
-        for att in attempts_to_fetch:
-            try:
-                jobs = fetch_jobs_for_run(owner, repo, run_id, att, token)
-            except Exception as exc:
-                print(f"  Warning: could not fetch jobs for run {run_id} attempt {att}: {exc}", file=sys.stderr)
+        for att in range(1, attempt + 1):
+            jobs = jobs_by_attempt.get((run_id, att), [])
+            if isinstance(jobs, Exception):
+                print(f"  Warning: could not fetch jobs for run {run_id} attempt {att}: {jobs}", file=sys.stderr)
                 jobs = []
 
             for job in jobs:
@@ -1014,6 +1009,10 @@ def aggregate_results(runs: list, sha_to_pr: dict, owner: str, repo: str, token:
           f"of {len(failed_groups)} failed groups "
           f"({len(never_passed_groups)} never-passed + {len(capped_retry_groups)} retry samples)...",
           file=sys.stderr)
+    # Warm the SHA-level check-runs cache in parallel; the loop below then only
+    # pays for the per-check-run annotation calls.
+    shas_to_list = sorted({g[0][0] for g in groups_to_fetch if g[1]} - _check_runs_cache.keys())
+    shared_client(token).map(lambda sha: list_check_runs(owner, repo, sha, token), shas_to_list)
     fetch_count = 0
     annotation_miss_count = 0
     pr_samples: dict = defaultdict(int)
@@ -1380,6 +1379,7 @@ def main() -> None:
     run_count = report["metadata"]["total_workflow_runs"]
     pass_rate = report["aggregate"]["pass_rate_any_attempt_pct"]
     print(f"Saved report to {args.output} — {pr_count} PRs, {run_count} workflow runs, {pass_rate}% pass rate (any attempt)")
+    shared_client(token).print_stats()
 
 
 if __name__ == "__main__":
@@ -11,34 +11,71 @@ render charts server-side and embeds them as inline base64 data URIs:
 
 Usage:
     py render_email_charts.py --input reviews.json --output report.html \
-       [--title "Extension Name"] [--json-output charts.json]
+       [--chart-mode compact] [--max-bytes N] [--title "Extension Name"] [--json-output charts.json]
 """
 
 import json
 import io
 import base64
 import argparse
+import sys
 import html as html_mod
+import importlib
 from datetime import datetime
 from collections import Counter, defaultdict
 from pathlib import Path
 
+# Shared helpers from .github/scripts/triage: chart cache (chart_cache.py),
+# compact encoding (chart_output.py) and deferred matplotlib import
+# (lazy_import.py). Outside this repo the modules are absent: charts are
+# rendered uncached as full-colour PNGs with no size budget, and matplotlib is
+# imported up front.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
 try:
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
-    import numpy as np
+    import chart_output
+    from chart_cache import cached_chart, default_cache
+    from html_report import bar_chart, max_payload_bytes, payload_size
+    from lazy_import import import_time_report, lazy_module, lazy_pyplot
 except ImportError:
-    print("matplotlib and numpy are required. "
-          "Install with: pip install matplotlib numpy")
-    exit(1)
+    chart_output = None
+    import_time_report = None
+    bar_chart = None
+
+    def cached_chart(style=None):
+        return lambda fn: fn
+
+    def default_cache():
+        return None
+
+    def lazy_module(name):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            print("matplotlib and numpy are required. "
+                  "Install with: pip install matplotlib numpy")
+            exit(1)
+
+    def lazy_pyplot(style=None):
+        lazy_module("matplotlib").use("Agg")
+        pyplot = lazy_module("matplotlib.pyplot")
+        pyplot.rcParams.update(style or {})
+        return pyplot
+
+# Imported on first use, so --help, --import-time and empty inputs never load
+# matplotlib or NumPy.
+mdates = lazy_module("matplotlib.dates")
+np = lazy_module("numpy")
 
 
 # ── helpers ──────────────────────────────────────────────────────────────
 
 def fig_to_base64(fig, dpi=150):
     """Render a matplotlib figure to a base64-encoded PNG string."""
+    if chart_output is not None:
+        try:
+            return chart_output.encode_figure(fig, dpi)
+        finally:
+            plt.close(fig)
     buf = io.BytesIO()
     fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight",
                 facecolor="white")
@@ -49,6 +86,8 @@ def fig_to_base64(fig, dpi=150):
 
 def img_tag(b64, alt="chart"):
     """Return an HTML <img> tag with inline base64 PNG data."""
+    if not b64:
+        return CHART_OMITTED
     return (f'<img src="data:image/png;base64,{b64}" alt="{alt}" '
             f'style="max-width:100%;height:auto;display:block;'
             f'margin:8px auto;">')
@@ -61,7 +100,7 @@ def load_reviews(filepath):
 
 # ── chart functions ──────────────────────────────────────────────────────
 
-plt.rcParams.update({
+CHART_STYLE = {
     "font.family": "sans-serif",
     "font.size": 10,
     "axes.titlesize": 13,
@@ -70,9 +109,15 @@ plt.rcParams.update({
     "axes.facecolor": "#fafafa",
     "axes.grid": True,
     "grid.alpha": 0.3,
-})
+}
+plt = lazy_pyplot(CHART_STYLE)
+# Unchanged charts (same inputs, style, encoding and script) skip matplotlib
+# entirely.
+cached = cached_chart({"rc": CHART_STYLE,
+                       "encoding": chart_output.settings if chart_output else None})
 
 
+@cached
 def chart_rating_distribution(reviews):
     """Bar chart of overall rating distribution."""
     ratings = Counter(r["rating"] for r in reviews)
@@ -99,6 +144,7 @@ def chart_rating_distribution(reviews):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_yearly_avg(reviews):
     """Bar chart of average rating by year."""
     yearly = defaultdict(lambda: {"total": 0, "rated": 0, "sum": 0})
@@ -134,6 +180,7 @@ def chart_yearly_avg(reviews):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_monthly_volume(reviews, months, monthly):
     """Bar chart of monthly review volume."""
     fig, ax = plt.subplots(figsize=(10, 3))
@@ -151,6 +198,7 @@ def chart_monthly_volume(reviews, months, monthly):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_monthly_rating_trend(months, monthly):
     """Line chart: monthly avg + 5-bucket moving avg + neutral line."""
     monthly_avgs = []
@@ -194,6 +242,7 @@ def chart_monthly_rating_trend(months, monthly):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_stacked_monthly(months, monthly):
     """Stacked bar chart of monthly rating breakdown."""
     fig, ax = plt.subplots(figsize=(10, 3.5))
@@ -221,6 +270,7 @@ def chart_stacked_monthly(months, monthly):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_rolling_avg(reviews):
     """Rolling average rating across all rated reviews."""
     rated_sorted = sorted([r for r in reviews if r["rating"] > 0],
@@ -252,6 +302,7 @@ def chart_rolling_avg(reviews):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_rolling_28day(reviews):
     """Rolling 28-day average rating trend by calendar date."""
     rated = [r for r in reviews if r["rating"] > 0]
@@ -316,6 +367,7 @@ def _iso_week_key(date_str):
     return f"{iso[0]}-W{iso[1]:02d}"
 
 
+@cached
 def chart_weekly_volume(reviews):
     """Bar chart of weekly review volume."""
     weekly = Counter(_iso_week_key(r["date"]) for r in reviews)
@@ -337,6 +389,7 @@ def chart_weekly_volume(reviews):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_stacked_weekly(reviews):
     """Stacked bar chart of weekly rating breakdown."""
     weekly_data = defaultdict(lambda: {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
@@ -392,6 +445,7 @@ def categorize_comments(reviews):
     return dict(result)
 
 
+@cached
 def chart_category_bar(cat_counts):
     """Horizontal bar chart of comment categories."""
     cats = sorted(cat_counts.keys(), key=lambda c: cat_counts[c])
@@ -418,6 +472,7 @@ def chart_category_bar(cat_counts):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_category_avg_rating(cat_data):
     """Horizontal bar chart of average rating per category."""
     cat_avgs = {}
@@ -452,6 +507,7 @@ def chart_category_avg_rating(cat_data):
     return fig_to_base64(fig)
 
 
+@cached
 def chart_category_pie(cat_counts):
     """Pie chart of comment category distribution."""
     total = sum(cat_counts.values())
@@ -487,10 +543,43 @@ def chart_category_pie(cat_counts):
 CARD = ('background:white;border-radius:10px;padding:24px;'
         'margin-bottom:16px;box-shadow:0 1px 4px rgba(0,0,0,0.06);')
 CARD_HL = CARD + 'border:2px solid #ef5350;'
+CHART_OMITTED = '<p style="color:#999;font-size:13px;">Chart omitted.</p>'
+
+
+# ── HTML bar charts (compact mode) ────────────────────────────────────────
+# Simple count charts as plain HTML tables (html_report.bar_chart): a few
+# hundred bytes instead of a PNG, like the bars_* charts in
+# render_issue_charts.py.
+
+RATING_LABELS = ["No Rating", "1 Star", "2 Stars", "3 Stars", "4 Stars",
+                 "5 Stars"]
+RATING_COLORS = ["#bdbdbd", "#ef5350", "#ff9800", "#fdd835", "#66bb6a",
+                 "#43a047"]
+CATEGORY_PALETTE = ["#ef5350", "#ff9800", "#fdd835", "#66bb6a", "#42a5f5",
+                    "#7e57c2", "#ec407a", "#26c6da", "#8d6e63", "#78909c"]
+
+
+def bars_rating_distribution(reviews):
+    ratings = Counter(r["rating"] for r in reviews)
+    return bar_chart([(label, ratings.get(i, 0), color) for i, (label, color)
+                      in enumerate(zip(RATING_LABELS, RATING_COLORS))])
+
+
+def bars_category(cat_counts):
+    cats = sorted(cat_counts, key=lambda c: cat_counts[c], reverse=True)
+    return bar_chart([(cat, cat_counts[cat],
+                       CATEGORY_PALETTE[i % len(CATEGORY_PALETTE)])
+                      for i, cat in enumerate(cats)])
 
 
-def build_html(reviews, title="VS Code Extension"):
-    """Build a complete HTML report with base64-embedded chart images."""
+def build_html(reviews, title="VS Code Extension", charts=True):
+    """Build a complete HTML report with base64-embedded chart images.
+
+    In compact mode the simple count charts are HTML bars instead of PNGs.
+    With charts=False no image chart is rendered (HTML bars are kept); the
+    report keeps its tables and says the images were left out (the last
+    resort for the size budget).
+    """
     total = len(reviews)
     rated = [r for r in reviews if r["rating"] > 0]
     avg_all = sum(r["rating"] for r in rated) / len(rated) if rated else 0
@@ -530,16 +619,22 @@ def build_html(reviews, title="VS Code Extension"):
                   / len(recent_rated) if recent_rated else 0)
 
     # Render charts
-    print("Rendering charts...")
-    b64_dist = chart_rating_distribution(reviews)
-    b64_year = chart_yearly_avg(reviews)
-    b64_vol = chart_monthly_volume(reviews, months, monthly)
-    b64_weekly_vol = chart_weekly_volume(reviews)
-    b64_trend = chart_monthly_rating_trend(months, monthly)
-    b64_stacked = chart_stacked_monthly(months, monthly)
-    b64_weekly_stacked = chart_stacked_weekly(reviews)
-    b64_rolling = chart_rolling_avg(reviews)
-    b64_28day = chart_rolling_28day(reviews)
+    html_bars = bar_chart is not None and (
+        not charts or chart_output.settings["mode"] == "compact")
+    b64_dist = b64_year = b64_vol = b64_weekly_vol = b64_trend = None
+    b64_stacked = b64_weekly_stacked = b64_rolling = b64_28day = None
+    if charts:
+        print("Rendering charts...")
+        if not html_bars:
+            b64_dist = chart_rating_distribution(reviews)
+        b64_year = chart_yearly_avg(reviews)
+        b64_vol = chart_monthly_volume(reviews, months, monthly)
+        b64_weekly_vol = chart_weekly_volume(reviews)
+        b64_trend = chart_monthly_rating_trend(months, monthly)
+        b64_stacked = chart_stacked_monthly(months, monthly)
+        b64_weekly_stacked = chart_stacked_weekly(reviews)
+        b64_rolling = chart_rolling_avg(reviews)
+        b64_28day = chart_rolling_28day(reviews)
 
     # Comment categorization & charts
     has_categories = any("category" in r for r in reviews)
@@ -553,11 +648,12 @@ def build_html(reviews, title="VS Code Extension"):
         cat_data = categorize_comments(reviews)
         cat_counts = {cat: len(revs) for cat, revs in cat_data.items()
                       if revs}
-        if cat_counts:
-            b64_cat_bar = chart_category_bar(cat_counts)
+        if cat_counts and charts:
+            if not html_bars:
+                b64_cat_bar = chart_category_bar(cat_counts)
             b64_cat_avg = chart_category_avg_rating(cat_data)
             b64_cat_pie = chart_category_pie(cat_counts)
-    print("Charts rendered.")
+    print("Charts rendered." if charts else "Charts omitted.")
 
     # Yearly table
     yearly_rows = ""
@@ -654,13 +750,19 @@ def build_html(reviews, title="VS Code Extension"):
                            f'</div>'
                            if b64_weekly_stacked else "")
 
+    dist_chart = (bars_rating_distribution(reviews) if html_bars
+                  else img_tag(b64_dist, "Rating Distribution"))
+    cat_bar_chart = (bars_category(cat_counts) if html_bars and cat_counts
+                     else img_tag(b64_cat_bar, "Category Bar Chart")
+                     if b64_cat_bar else "")
+
     # Category charts HTML
     cat_bar_html = (f'<div style="{CARD}">'
                     f'<h2 style="color:#37474f;font-size:16px;'
                     f'margin:0 0 8px 0;">🏷️ Comment Categories (by Volume)'
                     f'</h2>'
-                    f'{img_tag(b64_cat_bar, "Category Bar Chart")}</div>'
-                    if b64_cat_bar else "")
+                    f'{cat_bar_chart}</div>'
+                    if cat_bar_chart else "")
     cat_avg_html = (f'<div style="{CARD}">'
                     f'<h2 style="color:#37474f;font-size:16px;'
                     f'margin:0 0 8px 0;">🎯 Average Rating by Category'
@@ -756,6 +858,11 @@ def build_html(reviews, title="VS Code Extension"):
             + m_rows + '</table></div>'
         )
 
+    charts_note = ("" if charts else
+                   f'<div style="{CARD_HL}"><p style="margin:0;font-size:13px;">'
+                   f'Chart images were omitted to keep this email under its '
+                   f'size limit; the tables below are complete.</p></div>')
+
     html = f"""<!DOCTYPE html>
 <html><head><meta charset="utf-8"></head>
 <body style="font-family:'Segoe UI',Arial,sans-serif;line-height:1.6;\
@@ -793,10 +900,11 @@ color:white;border-radius:10px;padding:14px;text-align:center;width:25%;">
 <div style="font-size:10px;opacity:0.9;">Recent Avg</div></td>
 </tr></table>
 
+{charts_note}
 <div style="{CARD}">
   <h2 style="color:#37474f;font-size:16px;margin:0 0 8px 0;">\
 📊 Rating Distribution</h2>
-  {img_tag(b64_dist, "Rating Distribution")}
+  {dist_chart}
 </div>
 
 {year_chart}
@@ -854,6 +962,50 @@ text-align:left;">Avg Rating</th>
     return html
 
 
+def build_html_within_budget(reviews, title, chart_mode="png",
+                             max_bytes=None):
+    """build_html(), re-rendered with smaller charts until it fits the budget.
+
+    In compact mode the simple count charts are HTML bars and each pass steps
+    the PNGs down chart_output.BUDGET_LADDER (lower DPI, fewer palette
+    colours); png mode renders once. If the report is still over budget, it
+    is rebuilt without chart images, as render_issue_charts.py does, and says
+    so in place of each one.
+    """
+    if chart_output is None:
+        if chart_mode != "png" or max_bytes:
+            print("chart_output.py not found; rendering full PNGs "
+                  "without a size budget.")
+        return build_html(reviews, title)
+    max_bytes = max_bytes or max_payload_bytes()
+    chart_output.configure(mode=chart_mode)
+    ladder = (chart_output.BUDGET_LADDER if chart_mode == "compact"
+              else [(None, None)])
+    kind = f"{chart_mode} charts"
+    for step, (scale, colors) in enumerate(ladder):
+        chart_output.configure(scale=scale, colors=colors)
+        html = build_html(reviews, title)
+        size = payload_size(html)
+        if size <= max_bytes:
+            break
+        if step + 1 < len(ladder):
+            print(f"Report is {size / 1024:.0f} KiB, over the "
+                  f"{max_bytes / 1024:.0f} KiB budget; re-rendering smaller "
+                  f"charts.")
+    else:
+        print(f"Report is {size / 1024:.0f} KiB with its smallest charts, "
+              f"over the {max_bytes / 1024:.0f} KiB budget; omitting chart images.")
+        html = build_html(reviews, title, charts=False)
+        size = payload_size(html)
+        kind = "chart images omitted"
+        if size > max_bytes:
+            print(f"WARNING: report is {size / 1024:.0f} KiB without chart images, "
+                  f"still over the {max_bytes / 1024:.0f} KiB budget.")
+    print(f"Report payload: {size / 1024:.0f} KiB of "
+          f"{max_bytes / 1024:.0f} KiB budget ({kind})")
+    return html
+
+
 # ── main ─────────────────────────────────────────────────────────────────
 
 def main():
@@ -867,7 +1019,23 @@ def main():
                         help="Extension name shown in titles")
     parser.add_argument("--json-output", type=str, default=None,
                         help="Also save chart base64 data as JSON")
+    parser.add_argument("--chart-mode", choices=("png", "compact"),
+                        default="png",
+                        help="compact: HTML bars for simple count charts, "
+                             "adaptive-DPI palette-quantized PNGs "
+                             "re-rendered smaller until under --max-bytes")
+    parser.add_argument("--max-bytes", type=int, default=None,
+                        help="Byte budget for the report (default: "
+                             "NOTIFY_MAX_PAYLOAD_BYTES or 20 MiB)")
+    parser.add_argument("--import-time", action="store_true",
+                        help="Print a `python -X importtime` summary of "
+                             "this script's start-up and exit")
     args = parser.parse_args()
+    if args.import_time:
+        if import_time_report is None:
+            print("--import-time needs .github/scripts/triage/lazy_import.py")
+            sys.exit(1)
+        sys.exit(import_time_report(__file__))
 
     script_dir = Path(__file__).parent
     default_input = script_dir / ".." / ".." / ".." / ".." / "output" \
@@ -880,7 +1048,22 @@ def main():
     reviews = load_reviews(input_file)
     print(f"Loaded {len(reviews)} reviews from {input_file}")
 
-    html = build_html(reviews, title=args.title)
+    if not reviews:
+        # Nothing to plot: skip matplotlib and the charts entirely.
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(f"<p>No reviews for {html_mod.escape(args.title)} "
+                    f"in this period.</p>")
+        if args.json_output:
+            json_path = Path(args.json_output)
+            json_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({}, f)
+        print(f"No reviews; wrote an empty report to {output_file}")
+        return
+
+    html = build_html_within_budget(reviews, args.title, args.chart_mode,
+                                    args.max_bytes)
 
     output_file.parent.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w", encoding="utf-8") as f:
@@ -926,6 +1109,11 @@ def main():
             json.dump(charts, f)
         print(f"Chart base64 JSON saved to {json_path}")
 
+    cache = default_cache()
+    if cache is not None:
+        cache.prune()
+        print(cache.summary())
+
 
 if __name__ == "__main__":
     main()
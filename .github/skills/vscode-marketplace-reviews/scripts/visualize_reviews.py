@@ -15,20 +15,39 @@ import json
 import io
 import base64
 import argparse
+import importlib
+import sys
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 from pathlib import Path
 
+# Deferred matplotlib import (.github/scripts/triage/lazy_import.py). Outside
+# this repo the module is absent and matplotlib is imported up front.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "triage"))
 try:
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
-    import numpy as np
+    from lazy_import import import_time_report, lazy_module, lazy_pyplot
 except ImportError:
-    print("matplotlib and numpy are required. "
-          "Install with: pip install matplotlib numpy")
-    exit(1)
+    import_time_report = None
+
+    def lazy_module(name):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            print("matplotlib and numpy are required. "
+                  "Install with: pip install matplotlib numpy")
+            exit(1)
+
+    def lazy_pyplot(style=None):
+        lazy_module("matplotlib").use("Agg")
+        pyplot = lazy_module("matplotlib.pyplot")
+        pyplot.rcParams.update(style or {})
+        return pyplot
+
+# Imported on first use, so --help, --import-time and empty inputs never load
+# matplotlib or NumPy.
+mdates = lazy_module("matplotlib.dates")
+np = lazy_module("numpy")
+plt = lazy_pyplot()
 
 
 def fig_to_base64(fig, dpi=150):
@@ -370,7 +389,15 @@ def main():
     parser.add_argument("--base64", action="store_true",
                         help="Output each chart as a base64 PNG string "
                              "(JSON dict) instead of a single image file.")
+    parser.add_argument("--import-time", action="store_true",
+                        help="Print a `python -X importtime` summary of "
+                             "this script's start-up and exit")
     args = parser.parse_args()
+    if args.import_time:
+        if import_time_report is None:
+            print("--import-time needs .github/scripts/triage/lazy_import.py")
+            sys.exit(1)
+        sys.exit(import_time_report(__file__))
 
     script_dir = Path(__file__).parent
     input_file = (Path(args.input) if args.input
@@ -379,6 +406,10 @@ def main():
                    else script_dir / "review_analysis.png")
 
     reviews = load_reviews(input_file)
+    if not reviews:
+        # Nothing to plot: skip matplotlib and the charts entirely.
+        print("No reviews; nothing to plot.")
+        return
     scope = detect_scope(reviews)
     print(f"Detected scope: {scope} "
           f"({len(reviews)} reviews)")
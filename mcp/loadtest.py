@@ -0,0 +1,103 @@
+"""
+Load test for the IssueLens MCP server.
+
+Opens `--concurrency` MCP sessions against a running server and has each call
+`search_issues` in a loop until `--requests` calls have been made in total,
+then prints throughput and latency percentiles. With `--batch N` each call is
+one `search_issues_batch` call carrying N queries. Every call gets a distinct
+query by default, so the server's result cache can't answer it and the run
+measures searches; `--repeat-queries` cycles a few fixed queries instead, to
+measure cache hits. Run the server with SEARCH_BACKEND=stub to measure the
+server itself, offline:
+
+    SEARCH_BACKEND=stub STUB_SEARCH_LATENCY_MS=100 python server.py
+    python loadtest.py --concurrency 16 --requests 400
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+QUERIES = [
+    "debugger hangs on project open",
+    "maven build fails to start",
+    "language server is slow",
+    "test runner shows wrong results",
+    "gradle leaks memory",
+]
+
+
+async def worker(
+    url: str, queue: asyncio.Queue, latencies: list[float], errors: list[str], max_results: int, batch: int
+) -> None:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            while True:
+                try:
+                    query = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                if batch:
+                    queries = [f"{query} {n}" for n in range(batch)]
+                    result = await session.call_tool(
+                        "search_issues_batch", {"queries": queries, "max_results": max_results}
+                    )
+                else:
+                    result = await session.call_tool("search_issues", {"query": query, "max_results": max_results})
+                latencies.append(time.perf_counter() - start)
+                if result.isError:
+                    errors.append(str(result.content[0].text if result.content else result))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        query = args.query or QUERIES[i % len(QUERIES)]
+        # A distinct suffix per call defeats the result cache (unless asked not to).
+        queue.put_nowait(query if args.repeat_queries else f"{query} {i}")
+    latencies: list[float] = []
+    errors: list[str] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(args.url, queue, latencies, errors, args.max_results, args.batch) for _ in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(latencies)} request(s) over {args.concurrency} session(s) in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} req/s), {len(errors)} error(s)")
+    if latencies:
+        print(f"Latency: mean {statistics.mean(latencies) * 1000:.0f} ms, "
+              f"p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+              f"max {max(latencies) * 1000:.0f} ms")
+    for error in errors[:5]:
+        print(f"  error: {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the IssueLens MCP server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="MCP endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent MCP sessions")
+    parser.add_argument("--requests", type=int, default=200, help="Total tool calls")
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=0, metavar="N",
+                        help="Send N queries per call through search_issues_batch")
+    parser.add_argument("--query", help="Base query for every call instead of the built-in mix")
+    parser.add_argument("--repeat-queries", action="store_true",
+                        help="Reuse the same queries across calls, so repeats are served from the result cache")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+On-disk hybrid search index for the IssueLens MCP server's local backend.
+
+Built once from an exported issue dump, then opened read-only by the server:
+
+  * a BM25 inverted index — vocabulary plus postings (document ids and term
+    frequencies) stored as flat NumPy arrays, one slice per term;
+  * an embedding matrix (documents x dimensions, float32, L2-normalized);
+  * the documents themselves as JSON Lines with a byte-offset table, so only
+    the hits of a query are ever parsed.
+
+Every array is opened with `np.load(mmap_mode="r")`: opening an index costs
+next to nothing, the page cache is shared between server processes, and
+only the pages a query touches are read.
+
+A query runs both retrievers and merges their rankings with Reciprocal Rank
+Fusion (score = sum of 1 / (60 + rank)), the fusion Azure AI Search uses for
+hybrid queries, so scores and ordering behave like the hosted index.
+
+Embeddings are signed feature-hashing vectors of words and character
+trigrams. They need no model download and no network, which is what a dev
+and on-box tier needs, at the cost of being far weaker than the hosted
+service's semantic embeddings; they mainly add typo and word-form tolerance
+on top of BM25.
+
+The dump may be a JSON array, an object with an "issues" or "value" list (an
+Azure AI Search export), or JSON Lines. Records in the index schema (Title,
+FullText, Url, ...), GitHub REST issues (title, body, html_url, ...) and
+triage-results issues (title, url, createdAt, ...) are all accepted.
+
+Usage:
+    python local_index.py build issues.json --output ~/.cache/issuelens/search-index
+    python local_index.py query ~/.cache/issuelens/search-index "debugger hangs"
+"""
+
+import argparse
+import functools
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+FORMAT = 1
+DEFAULT_DIM = 256
+# Characters of FullText kept as the excerpt chunk when a record has none.
+CHUNK_CHARS = 1000
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+# Candidates taken from each retriever before fusion.
+MIN_CANDIDATES = 50
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ISSUE_PATH = re.compile(r"github\.com/([^/]+/[^/]+)/(issues|pull)/(\d+)")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_features(word: str, dim: int) -> tuple[tuple[int, ...], tuple[float, ...]]:
+    """Hash buckets and signs of a word and its character trigrams."""
+    padded = f"<{word}>"
+    buckets, signs = [], []
+    for feature in (word, *(padded[i:i + 3] for i in range(len(padded) - 2))):
+        h = zlib.crc32(feature.encode("utf-8"))
+        buckets.append(h % dim)
+        signs.append(1.0 if h & 0x80000000 else -1.0)
+    return tuple(buckets), tuple(signs)
+
+
+def embed(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Signed feature-hashing embedding of words and character trigrams, L2-normalized.
+
+    Each word contributes (1 + log count) to its own bucket and its trigrams'.
+    """
+    buckets: list[int] = []
+    weights: list[float] = []
+    for word, count in Counter(tokenize(text)).items():
+        word_buckets, signs = _word_features(word, dim)
+        weight = 1.0 + math.log(count)
+        buckets.extend(word_buckets)
+        weights.extend(sign * weight for sign in signs)
+    if not buckets:
+        return np.zeros(dim, dtype=np.float32)
+    vector = np.bincount(buckets, weights, minlength=dim).astype(np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+# ---------------------------------------------------------------------------
+# Reading dumps
+# ---------------------------------------------------------------------------
+
+
+def read_dump(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        head = fh.read(1)
+        while head.isspace():
+            head = fh.read(1)
+        fh.seek(0)
+        if head == "[" or head == "{":
+            try:
+                data = json.load(fh)
+            except json.JSONDecodeError:
+                data = None  # JSON Lines whose first record is an object
+            if data is not None:
+                if isinstance(data, dict):
+                    data = data.get("issues", data.get("value", [data]))
+                yield from data
+                return
+            fh.seek(0)
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def to_document(record: dict[str, Any]) -> dict[str, Any]:
+    """Map a dump record to the index schema the server's result mapping reads."""
+    if "Title" in record or "FullText" in record:
+        doc = dict(record)
+    else:
+        title = record.get("title") or ""
+        body = record.get("body") or ""
+        url = record.get("url") or record.get("html_url") or ""
+        match = _ISSUE_PATH.search(url)
+        repo = record.get("repo") or record.get("repository") or (match[1] if match else "")
+        if isinstance(repo, dict):
+            repo = repo.get("full_name", "")
+        doc = {
+            "Title": title,
+            "FullText": f"{title}\n\n{body}".strip(),
+            "Url": url,
+            "Repository": repo,
+            "CreatedDate": record.get("createdAt") or record.get("created_at") or "",
+            "RootItemPath": f"{match[1]}/{match[2]}/{match[3]}" if match else url,
+            "RepoItemPath": f"{match[2]}/{match[3]}" if match else "",
+            "Tags": [
+                {"name": label["name"] if isinstance(label, dict) else str(label)}
+                for label in record.get("labels") or []
+            ],
+        }
+    doc.pop("text_vector", None)  # hosted embeddings are useless without the hosted model
+    doc.setdefault("chunk", (doc.get("FullText") or doc.get("Title") or "")[:CHUNK_CHARS])
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+
+def build_index(records: Iterable[dict[str, Any]], output: str, dim: int = DEFAULT_DIM) -> dict[str, Any]:
+    """Write an index for `records` to `output`, replacing any index already there."""
+    tmp = f"{output.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths: list[int] = []
+    vectors: list[np.ndarray] = []
+    offsets = [0]
+    with open(os.path.join(tmp, "documents.jsonl"), "wb") as fh:
+        for doc_id, record in enumerate(records):
+            doc = to_document(record)
+            text = f"{doc.get('Title') or ''} {doc.get('FullText') or ''}"
+            terms = Counter(tokenize(text))
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+            lengths.append(sum(terms.values()))
+            vectors.append(embed(f"{doc.get('Title') or ''} {doc.get('chunk') or ''}", dim))
+            line = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            fh.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    vocabulary = sorted(postings)
+    term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    for i, term in enumerate(vocabulary):
+        term_offsets[i + 1] = term_offsets[i] + len(postings[term])
+    posting_docs = np.fromiter(
+        (doc_id for term in vocabulary for doc_id, _ in postings[term]), dtype=np.int32, count=int(term_offsets[-1])
+    )
+    posting_tfs = np.fromiter(
+        (tf for term in vocabulary for _, tf in postings[term]), dtype=np.float32, count=int(term_offsets[-1])
+    )
+    embeddings = np.vstack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32)
+
+    np.save(os.path.join(tmp, "doc_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    np.save(os.path.join(tmp, "doc_lengths.npy"), np.asarray(lengths, dtype=np.float32))
+    np.save(os.path.join(tmp, "term_offsets.npy"), term_offsets)
+    np.save(os.path.join(tmp, "posting_docs.npy"), posting_docs)
+    np.save(os.path.join(tmp, "posting_tfs.npy"), posting_tfs)
+    np.save(os.path.join(tmp, "embeddings.npy"), embeddings.astype(np.float32, copy=False))
+    with open(os.path.join(tmp, "vocabulary.json"), "w", encoding="utf-8") as fh:
+        json.dump(vocabulary, fh, ensure_ascii=False, separators=(",", ":"))
+    meta = {
+        "format": FORMAT,
+        "documents": len(lengths),
+        "terms": len(vocabulary),
+        "dim": dim,
+        "avgdl": (sum(lengths) / len(lengths)) if lengths else 0.0,
+        "built_at": time.time(),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=1)
+
+    # Swap directories so a running server never sees a half-written index.
+    old = f"{output.rstrip(os.sep)}.{os.getpid()}.old"
+    if os.path.exists(output):
+        os.replace(output, old)
+    os.replace(tmp, output)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+
+class LocalIndex:
+    """Read-only, memory-mapped view of an index written by `build_index`."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("format") != FORMAT:
+            raise ValueError(f"{path}: index format {self.meta.get('format')}, expected {FORMAT}; rebuild it")
+        with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as fh:
+            self.term_ids = {term: i for i, term in enumerate(json.load(fh))}
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.doc_offsets = load("doc_offsets")
+        self.doc_lengths = load("doc_lengths")
+        self.term_offsets = load("term_offsets")
+        self.posting_docs = load("posting_docs")
+        self.posting_tfs = load("posting_tfs")
+        self.embeddings = load("embeddings")
+        self._docs_file = open(os.path.join(path, "documents.jsonl"), "rb")
+        self._docs = (
+            mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ) if self.doc_offsets[-1] else None
+        )
+
+    def __len__(self) -> int:
+        return int(self.meta["documents"])
+
+    def document(self, doc_id: int) -> dict[str, Any]:
+        start, end = int(self.doc_offsets[doc_id]), int(self.doc_offsets[doc_id + 1])
+        return json.loads(self._docs[start:end])
+
+    def bm25(self, query: str) -> np.ndarray:
+        n = len(self)
+        scores = np.zeros(n, dtype=np.float32)
+        avgdl = self.meta["avgdl"] or 1.0
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1])
+            docs = self.posting_docs[start:end]
+            tfs = self.posting_tfs[start:end]
+            idf = math.log(1.0 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_lengths[docs] / avgdl)
+            scores[docs] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+        return scores
+
+    def similarity(self, query: str) -> np.ndarray:
+        return self.embeddings @ embed(query, int(self.meta["dim"]))
+
+    def search(self, query: str, top: int = 10) -> list[tuple[int, float]]:
+        """(document id, fused score) of the best `top` documents, best first."""
+        n = len(self)
+        if not n:
+            return []
+        candidates = min(n, max(top * 4, MIN_CANDIDATES))
+        fused: dict[int, float] = {}
+        lexical = self.bm25(query)
+        for rankings in (_top(lexical, candidates, positive=True), _top(self.similarity(query), candidates)):
+            for rank, doc_id in enumerate(rankings):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+    def close(self) -> None:
+        if self._docs is not None:
+            self._docs.close()
+        self._docs_file.close()
+
+
+def _top(scores: np.ndarray, k: int, positive: bool = False) -> list[int]:
+    """Indices of the `k` highest scores, best first (only scores > 0 with `positive`)."""
+    if positive:
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    else:
+        candidates = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+    return [int(i) for i in candidates[np.argsort(-scores[candidates], kind="stable")]]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query a local IssueLens search index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build an index from issue dumps")
+    build.add_argument("dumps", nargs="+", help="JSON / JSON Lines issue dumps")
+    build.add_argument("--output", required=True, help="Index directory (replaced if it exists)")
+    build.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Embedding dimensions")
+    query = sub.add_parser("query", help="Run a query against an index")
+    query.add_argument("index", help="Index directory")
+    query.add_argument("text", help="Query text")
+    query.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        records = (record for path in args.dumps for record in read_dump(path))
+        meta = build_index(records, args.output, args.dim)
+        print(
+            f"Indexed {meta['documents']} document(s), {meta['terms']} term(s), {meta['dim']}-d embeddings "
+            f"into {args.output} in {time.perf_counter() - start:.1f}s",
+            file=sys.stderr,
+        )
+        return 0
+
+    start = time.perf_counter()
+    index = LocalIndex(args.index)
+    opened = time.perf_counter()
+    hits = index.search(args.text, args.top)
+    searched = time.perf_counter()
+    for doc_id, score in hits:
+        doc = index.document(doc_id)
+        print(f"{score:.4f}  {doc.get('Title', '')}  {doc.get('Url', '')}")
+    print(
+        f"{len(index)} document(s); opened in {(opened - start) * 1000:.1f} ms, "
+        f"searched in {(searched - opened) * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
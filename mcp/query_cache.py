@@ -0,0 +1,232 @@
+"""
+Search result cache for the IssueLens MCP server.
+
+Agents tend to ask the same question many times per session, and every
+search runs hybrid keyword + vector search, including embedding the query on
+the service side. `QueryCache` keeps recent results in process, keyed by the
+normalized query (case, surrounding punctuation and whitespace ignored) and
+`max_results`:
+
+  * entries expire after a TTL and the least recently used entry is evicted
+    once the cache is full;
+  * concurrent misses for the same key share one search instead of each
+    running their own; if the caller running it is cancelled, a waiting
+    caller runs the search itself rather than being cancelled too;
+  * hits, misses and evictions are counted for the server's /stats route.
+
+Several replicas on one host can share results through an optional SQLite
+file (stdlib, WAL mode). It is consulted after an in-process miss and written
+on every fetch; entries carry the same TTL.
+
+Cached values are shared between callers and must not be mutated.
+
+Environment variables:
+  SEARCH_CACHE_TTL_SECONDS   Lifetime of a cached result (default 300).
+  SEARCH_CACHE_MAX_ENTRIES   In-process entries before LRU eviction
+                             (default 1024, 0 disables the cache).
+  SEARCH_CACHE_DB            Path of a SQLite file shared by replicas
+                             (default: none, in-process only).
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+_SPACES = re.compile(r"\s+")
+# Trailing/leading punctuation that doesn't change what is being asked.
+_EDGE_PUNCTUATION = " \t\r\n?!.,;:\"'`"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_expires_at ON results(expires_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, trim surrounding punctuation and collapse whitespace."""
+    return _SPACES.sub(" ", query.casefold()).strip(_EDGE_PUNCTUATION)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared_hits: int = 0  # in-process misses answered by the shared store
+    coalesced: int = 0  # misses that waited for an identical in-flight search
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {**asdict(self), "hit_ratio": round(self.hits / lookups, 4) if lookups else None}
+
+
+class _FetchAbandoned(Exception):
+    """The caller running a shared search was cancelled before it finished."""
+
+
+class SharedStore:
+    """TTL'd key/value rows in a SQLite file that several processes can open."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), expires_at),
+            )
+            self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class QueryCache:
+    """TTL + LRU cache of search results with single-flight misses."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        shared: SharedStore | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def from_env(cls) -> "QueryCache":
+        ttl = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        max_entries = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        shared = None
+        path = os.environ.get("SEARCH_CACHE_DB", "").strip()
+        if path and max_entries > 0:
+            try:
+                shared = SharedStore(path)
+            except (OSError, sqlite3.Error) as exc:
+                # A broken shared store must never break search — stay in-process.
+                print(f"Shared search cache disabled ({path}): {exc}", file=sys.stderr)
+        return cls(ttl, max_entries, shared)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    @staticmethod
+    def key(query: str, max_results: int, *extra: Any) -> str:
+        return json.dumps([normalize_query(query), max_results, *extra], separators=(",", ":"))
+
+    def _get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached value for `key`, or `await fetch()` stored under it."""
+        if not self.enabled:
+            return await fetch()
+        value = self._get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+        self.stats.misses += 1
+
+        while (pending := self._inflight.get(key)) is not None:
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except _FetchAbandoned:
+                pass  # its owner was cancelled: the first waiter back takes over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch(key, fetch)
+        except BaseException as exc:
+            # Cancellation belongs to this caller only (e.g. one session's
+            # batch); waiters get a signal to retry, not a CancelledError.
+            future.set_exception(_FetchAbandoned() if isinstance(exc, asyncio.CancelledError) else exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+        self._put(key, value)
+        future.set_result(value)
+        return value
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if self.shared is not None:
+            value = await asyncio.to_thread(self.shared.get, key)
+            if value is not None:
+                self.stats.shared_hits += 1
+                return value
+        value = await fetch()
+        if self.shared is not None:
+            try:
+                await asyncio.to_thread(self.shared.put, key, value, time.time() + self.ttl)
+            except sqlite3.Error as exc:
+                print(f"Shared search cache write failed: {exc}", file=sys.stderr)
+        return value
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "shared_store": self.shared.path if self.shared else None,
+        }
+
+    def close(self) -> None:
+        if self.shared is not None:
+            self.shared.close()
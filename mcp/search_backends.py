@@ -0,0 +1,302 @@
+"""
+Search backends for the IssueLens MCP server.
+
+The tools talk to a `SearchBackend`: `search()` takes the query text, the
+number of hits, the index columns to return and the fields to highlight, and
+returns documents in the index schema (Title, FullText, Url, ...) with
+`@search.score` and, when asked, `@search.highlights` — the shape Azure AI
+Search returns — so the tool contract is the same whichever backend serves it.
+
+  azure   Azure AI Search: hybrid keyword + vector query through the async
+          SearchClient, over one pooled connection set.
+  local   A prebuilt on-disk index (local_index.py): memory-mapped BM25
+          postings and embeddings with Reciprocal Rank Fusion. No network;
+          for development, tests and an on-box tier for hot repositories.
+  stub    In-memory stand-in with simulated latency, for load tests.
+
+Environment variables:
+  SEARCH_BACKEND                 azure, local or stub. Default: azure when
+                                 AZURE_SEARCH_ENDPOINT is set, else local.
+  AZURE_SEARCH_ENDPOINT          Azure AI Search service URL (azure).
+  AZURE_SEARCH_INDEX_NAME        Index to query (azure).
+  AZURE_SEARCH_MAX_CONNECTIONS   Connection pool size (azure, default 64).
+  LOCAL_SEARCH_INDEX             Index directory (local).
+                                 Default: ~/.cache/issuelens/search-index
+  STUB_SEARCH_LATENCY_MS         Simulated latency per query (stub, default 50).
+  STUB_SEARCH_DOCUMENTS          JSON array of documents to serve (stub);
+                                 generated documents when unset.
+"""
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, Protocol
+
+DEFAULT_LOCAL_INDEX = os.path.join(os.path.expanduser("~"), ".cache", "issuelens", "search-index")
+DEFAULT_HIGHLIGHT_TAGS = ("<em>", "</em>")
+
+
+class SearchBackend(Protocol):
+    async def search(
+        self,
+        query: str,
+        top: int,
+        select: list[str] | None = None,
+        highlight_fields: list[str] | None = None,
+        highlight_tags: tuple[str, str] = DEFAULT_HIGHLIGHT_TAGS,
+    ) -> list[dict[str, Any]]:
+        """The best `top` documents for `query`, best first."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class BackendError(RuntimeError):
+    """The configured backend can't be used (missing settings or index)."""
+
+
+def backend_from_env() -> SearchBackend:
+    name = os.environ.get("SEARCH_BACKEND", "").strip().lower()
+    if not name:
+        name = "azure" if os.environ.get("AZURE_SEARCH_ENDPOINT") else "local"
+    if name == "azure":
+        return AzureSearchBackend.from_env()
+    if name == "local":
+        return LocalSearchBackend.from_env()
+    if name == "stub":
+        return StubSearchBackend.from_env()
+    raise BackendError(f"Unknown SEARCH_BACKEND {name!r}; use azure, local or stub")
+
+
+# ---------------------------------------------------------------------------
+# Azure AI Search
+# ---------------------------------------------------------------------------
+
+
+class AzureSearchBackend:
+    """Async SearchClient plus the credential and connection pool behind it."""
+
+    def __init__(self, endpoint: str, index_name: str, max_connections: int = 64) -> None:
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+        from azure.identity.aio import DefaultAzureCredential
+        from azure.search.documents.aio import SearchClient
+
+        # One keep-alive pool for both the search calls and token requests;
+        # the transports don't own it, so it is closed once in close().
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_connections))
+        self._credential = DefaultAzureCredential(
+            transport=AioHttpTransport(session=self._session, session_owner=False)
+        )
+        self.client = SearchClient(
+            endpoint=endpoint,
+            index_name=index_name,
+            credential=self._credential,
+            transport=AioHttpTransport(session=self._session, session_owner=False),
+        )
+
+    @classmethod
+    def from_env(cls) -> "AzureSearchBackend":
+        endpoint = os.environ.get("AZURE_SEARCH_ENDPOINT", "")
+        index_name = os.environ.get("AZURE_SEARCH_INDEX_NAME", "")
+        if not endpoint or not index_name:
+            raise BackendError("SEARCH_BACKEND=azure needs AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_INDEX_NAME")
+        return cls(endpoint, index_name, int(os.environ.get("AZURE_SEARCH_MAX_CONNECTIONS", "64")))
+
+    async def search(
+        self,
+        query: str,
+        top: int,
+        select: list[str] | None = None,
+        highlight_fields: list[str] | None = None,
+        highlight_tags: tuple[str, str] = DEFAULT_HIGHLIGHT_TAGS,
+    ) -> list[dict[str, Any]]:
+        from azure.search.documents.models import VectorizableTextQuery
+
+        vector_query = VectorizableTextQuery(
+            text=query,
+            k_nearest_neighbors=top,
+            fields="text_vector",
+        )
+        options: dict[str, Any] = {"select": select} if select else {}
+        if highlight_fields:
+            options.update(
+                highlight_fields=",".join(highlight_fields),
+                highlight_pre_tag=highlight_tags[0],
+                highlight_post_tag=highlight_tags[1],
+            )
+        results = await self.client.search(
+            search_text=query,
+            vector_queries=[vector_query],
+            top=top,
+            **options,
+        )
+        return [doc async for doc in results]
+
+    async def close(self) -> None:
+        await self.client.close()
+        await self._credential.close()
+        await self._session.close()
+
+
+# ---------------------------------------------------------------------------
+# Local index
+# ---------------------------------------------------------------------------
+
+
+class LocalSearchBackend:
+    """Hybrid BM25 + embedding search over a local_index.py index, no network.
+
+    Scoring runs in a worker thread (NumPy releases the GIL for the heavy
+    parts), so a large index doesn't stall other sessions either.
+    """
+
+    def __init__(self, path: str) -> None:
+        from local_index import LocalIndex
+
+        self.index = LocalIndex(path)
+
+    @classmethod
+    def from_env(cls) -> "LocalSearchBackend":
+        path = os.path.expanduser(os.environ.get("LOCAL_SEARCH_INDEX", DEFAULT_LOCAL_INDEX))
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            raise BackendError(
+                f"No local search index at {path}. Build one with "
+                "`python local_index.py build <issue dump> --output <dir>` and set LOCAL_SEARCH_INDEX, "
+                "or set AZURE_SEARCH_ENDPOINT / AZURE_SEARCH_INDEX_NAME to use Azure AI Search."
+            )
+        return cls(path)
+
+    def _search(
+        self, query: str, top: int, select: list[str] | None, highlight_fields: list[str] | None,
+        highlight_tags: tuple[str, str],
+    ) -> list[dict[str, Any]]:
+        terms = set(_tokens(query))
+        return [
+            _hit(self.index.document(doc_id), score, select, highlight_fields, terms, highlight_tags)
+            for doc_id, score in self.index.search(query, top)
+        ]
+
+    async def search(
+        self,
+        query: str,
+        top: int,
+        select: list[str] | None = None,
+        highlight_fields: list[str] | None = None,
+        highlight_tags: tuple[str, str] = DEFAULT_HIGHLIGHT_TAGS,
+    ) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self._search, query, top, select, highlight_fields, highlight_tags)
+
+    async def close(self) -> None:
+        self.index.close()
+
+
+# ---------------------------------------------------------------------------
+# Load-test stand-in
+# ---------------------------------------------------------------------------
+
+
+class StubSearchBackend:
+    """Offline stand-in for the search service, for load tests.
+
+    Waits STUB_SEARCH_LATENCY_MS per query (like a network round trip, without
+    blocking the loop) and ranks documents by query-term overlap. Documents
+    come from STUB_SEARCH_DOCUMENTS (a JSON array in the index schema) or are
+    generated.
+    """
+
+    def __init__(self, documents: list[dict[str, Any]], latency: float) -> None:
+        self.documents = documents
+        self.latency = latency
+        self._terms = [set(_tokens(f"{d.get('Title', '')} {d.get('chunk', '')}")) for d in documents]
+
+    @classmethod
+    def from_env(cls) -> "StubSearchBackend":
+        path = os.environ.get("STUB_SEARCH_DOCUMENTS", "")
+        if path:
+            with open(path, encoding="utf-8") as fh:
+                documents = json.load(fh)
+        else:
+            documents = _generated_documents(500)
+        return cls(documents, float(os.environ.get("STUB_SEARCH_LATENCY_MS", "50")) / 1000)
+
+    async def search(
+        self,
+        query: str,
+        top: int,
+        select: list[str] | None = None,
+        highlight_fields: list[str] | None = None,
+        highlight_tags: tuple[str, str] = DEFAULT_HIGHLIGHT_TAGS,
+    ) -> list[dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        terms = set(_tokens(query))
+        scored = sorted(
+            ((len(terms & doc_terms), i) for i, doc_terms in enumerate(self._terms)),
+            key=lambda item: (-item[0], item[1]),
+        )[:top]
+        return [
+            _hit(self.documents[i], float(score), select, highlight_fields, terms, highlight_tags)
+            for score, i in scored
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+def _generated_documents(count: int) -> list[dict[str, Any]]:
+    topics = ["debugger", "maven", "gradle", "test runner", "language server", "formatter", "hot reload", "jdk"]
+    symptoms = ["crashes", "hangs", "is slow", "fails to start", "shows wrong results", "leaks memory"]
+    docs = []
+    for n in range(1, count + 1):
+        title = f"{topics[n % len(topics)].title()} {symptoms[n % len(symptoms)]} on project open"
+        docs.append({
+            "Title": title,
+            "FullText": f"{title}. Steps to reproduce and logs for issue {n}.",
+            "Url": f"https://github.com/example/java-tooling/issues/{n}",
+            "Repository": "example/java-tooling",
+            "CreatedDate": f"2025-01-{n % 28 + 1:02d}T00:00:00Z",
+            "RootItemPath": f"example/java-tooling/issues/{n}",
+            "RepoItemPath": f"issues/{n}",
+            "chunk": title,
+        })
+    return docs
+
+
+# ---------------------------------------------------------------------------
+# Shared helpers for the offline backends
+# ---------------------------------------------------------------------------
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _highlight(text: str, terms: set[str], tags: tuple[str, str], context: int = 80) -> str:
+    """`text` with query terms tagged, starting shortly before the first match."""
+    tagged = re.sub(r"[A-Za-z0-9]+", lambda m: f"{tags[0]}{m[0]}{tags[1]}" if m[0].lower() in terms else m[0], text)
+    first = tagged.find(tags[0])
+    if first > context:
+        tagged = "…" + tagged[tagged.find(" ", first - context) + 1:]
+    return tagged
+
+
+def _hit(
+    doc: dict[str, Any],
+    score: float,
+    select: list[str] | None,
+    highlight_fields: list[str] | None,
+    terms: set[str],
+    tags: tuple[str, str],
+) -> dict[str, Any]:
+    """`doc` shaped like an Azure AI Search hit: selected columns, score, highlights."""
+    hit = {name: doc[name] for name in select if name in doc} if select else dict(doc)
+    hit["@search.score"] = score
+    if highlight_fields:
+        hit["@search.highlights"] = {
+            name: [_highlight(doc[name], terms, tags)]
+            for name in highlight_fields
+            if terms & set(_tokens(doc.get(name) or ""))
+        }
+    return hit
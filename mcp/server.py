@@ -1,19 +1,33 @@
 """
-IssueLens MCP Server - Semantic search over Java Tooling issue data via Azure AI Search.
+IssueLens MCP Server - Semantic search over Java Tooling issue data.
 
-Streamable HTTP MCP server that exposes a `search_issues` tool.
+Streamable HTTP MCP server that exposes the `search_issues` and
+`search_issues_batch` tools.
+
+Searches go through a pluggable backend (search_backends.py): Azure AI Search
+via the async client, a local memory-mapped BM25 + embedding index
+(local_index.py) for offline development and hot repositories, or a stub
+with simulated latency for load tests (loadtest.py). The backend is created
+on the first request inside the event loop and shared by all sessions until
+shutdown; nothing is configured at import time, so the server starts without
+Azure settings.
+
+Results are cached per normalized query and `max_results` (query_cache.py);
+GET /stats reports the cache's hit/miss counters.
 """
 
+import asyncio
 import os
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
-from azure.identity import DefaultAzureCredential
-from azure.search.documents import SearchClient
-from azure.search.documents.models import VectorizableTextQuery
+from query_cache import QueryCache
+from search_backends import SearchBackend, backend_from_env
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -21,21 +35,37 @@ from azure.search.documents.models import VectorizableTextQuery
 
 load_dotenv()
 
-AZURE_SEARCH_ENDPOINT = os.environ["AZURE_SEARCH_ENDPOINT"]
-AZURE_SEARCH_INDEX_NAME = os.environ["AZURE_SEARCH_INDEX_NAME"]
+# search_issues_batch: queries per call, and how many run at once.
+MAX_BATCH_QUERIES = 50
+SEARCH_BATCH_CONCURRENCY = int(os.environ.get("SEARCH_BATCH_CONCURRENCY", "8"))
 MCP_SERVER_HOST = os.environ.get("MCP_SERVER_HOST", "0.0.0.0")
 MCP_SERVER_PORT = int(os.environ.get("MCP_SERVER_PORT", "8000"))
 
 # ---------------------------------------------------------------------------
-# Azure AI Search client
+# Search backend
 # ---------------------------------------------------------------------------
 
-credential = DefaultAzureCredential()
-search_client = SearchClient(
-    endpoint=AZURE_SEARCH_ENDPOINT,
-    index_name=AZURE_SEARCH_INDEX_NAME,
-    credential=credential,
-)
+search_cache = QueryCache.from_env()
+
+_backend: SearchBackend | None = None
+_backend_lock = asyncio.Lock()
+
+
+async def get_backend() -> SearchBackend:
+    """The shared backend, created on first use inside the server's event loop."""
+    global _backend
+    if _backend is None:
+        async with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+async def close_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
 
 # ---------------------------------------------------------------------------
 # MCP Server
@@ -45,7 +75,8 @@ mcp = FastMCP(
     "IssueLens Search",
     instructions=(
         "Semantic search over Java Tooling GitHub issue data. "
-        "Use the search_issues tool to find issues by natural-language query."
+        "Use the search_issues tool to find issues by natural-language query, "
+        "or search_issues_batch to run many queries (e.g. one per issue) in one call."
     ),
     host=MCP_SERVER_HOST,
     port=MCP_SERVER_PORT,
@@ -68,9 +99,84 @@ class SearchResult:
     tags: list[dict[str, Any]] = field(default_factory=list)
     score: float | None = None
     chunk: str = ""
+    excerpt: str = ""
+
+
+# Result field -> index field. "score" comes with every hit and "excerpt" is
+# derived from the chunk (or its highlights), so neither maps to a column.
+INDEX_FIELDS = {
+    "title": "Title",
+    "fullText": "FullText",
+    "url": "Url",
+    "repository": "Repository",
+    "createdDate": "CreatedDate",
+    "rootItemPath": "RootItemPath",
+    "repoItemPath": "RepoItemPath",
+    "parentItemPath": "ParentItemPath",
+    "adoDevComPostId": "AdoDevComPostId",
+    "tags": "Tags",
+    "chunk": "chunk",
+}
+RESULT_FIELDS = (*INDEX_FIELDS, "score", "excerpt")
+DETAIL_FIELDS = {
+    "compact": ("title", "url", "score", "excerpt"),
+    "full": (*INDEX_FIELDS, "score"),
+}
+# Text fields cut to `max_chars`; compact results default to a short excerpt.
+TEXT_FIELDS = ("fullText", "chunk", "excerpt")
+COMPACT_MAX_CHARS = 300
+HIGHLIGHT_TAGS = ("**", "**")
+
 
+def _result_fields(detail: str, fields: list[str] | None) -> tuple[str, ...]:
+    if fields:
+        unknown = [name for name in fields if name not in RESULT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(RESULT_FIELDS)}")
+        return tuple(dict.fromkeys(fields))
+    if detail not in DETAIL_FIELDS:
+        raise ValueError(f"Unknown detail {detail!r}; choose from {', '.join(DETAIL_FIELDS)}")
+    return DETAIL_FIELDS[detail]
 
-def _to_result(doc: dict[str, Any]) -> dict[str, Any]:
+
+def _select(fields: tuple[str, ...]) -> list[str]:
+    """Index columns to fetch for `fields`."""
+    columns = [INDEX_FIELDS[name] for name in fields if name in INDEX_FIELDS]
+    if "excerpt" in fields and "chunk" not in columns:
+        columns.append("chunk")
+    return columns
+
+
+def _truncate(text: str, max_chars: int | None) -> str:
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip() + "…"
+
+
+def _excerpt(doc: dict[str, Any]) -> str:
+    highlights = (doc.get("@search.highlights") or {}).get("chunk")
+    if highlights:
+        return " … ".join(highlights)
+    return doc.get("chunk") or ""
+
+
+def _to_result(
+    doc: dict[str, Any], fields: tuple[str, ...] = DETAIL_FIELDS["full"], max_chars: int | None = None
+) -> dict[str, Any]:
+    """Map an Azure Search document to the requested SearchResult fields."""
+    result = {name: value for name, value in _full_result(doc).items() if name in fields}
+    if "excerpt" in fields:
+        result["excerpt"] = _excerpt(doc)
+    if max_chars:
+        for name in TEXT_FIELDS:
+            if isinstance(result.get(name), str):
+                result[name] = _truncate(result[name], max_chars)
+    return result
+
+
+def _full_result(doc: dict[str, Any]) -> dict[str, Any]:
     """Map an Azure Search document to the SearchResult schema."""
     return {
         "title": doc.get("Title", ""),
@@ -88,29 +194,138 @@ def _to_result(doc: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _projection(
+    detail: str, fields: list[str] | None, max_chars: int | None, highlight: bool
+) -> tuple[tuple[str, ...], int | None, bool]:
+    """(result fields, text cap, whether to highlight) for the tool arguments."""
+    result_fields = _result_fields(detail, fields)
+    if max_chars is None and not fields and detail == "compact":
+        max_chars = COMPACT_MAX_CHARS
+    return result_fields, max_chars, highlight and "excerpt" in result_fields
+
+
+async def _search(
+    query: str, max_results: int, result_fields: tuple[str, ...], max_chars: int | None, highlighting: bool
+) -> list[dict[str, Any]]:
+    """One cached hybrid search; results are shared with the cache and must not be mutated."""
+
+    async def run_search() -> list[dict[str, Any]]:
+        backend = await get_backend()
+        docs = await backend.search(
+            query,
+            max_results,
+            select=_select(result_fields),
+            highlight_fields=["chunk"] if highlighting else None,
+            highlight_tags=HIGHLIGHT_TAGS,
+        )
+
+        return [_to_result(doc, result_fields, max_chars) for doc in docs]
+
+    key = QueryCache.key(query, max_results, result_fields, max_chars, highlighting)
+    return await search_cache.get_or_fetch(key, run_search)
+
+
 @mcp.tool()
-def search_issues(query: str, max_results: int = 10) -> list[dict[str, Any]]:
+async def search_issues(
+    query: str,
+    max_results: int = 10,
+    detail: Literal["compact", "full"] = "compact",
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    highlight: bool = False,
+) -> list[dict[str, Any]]:
     """Search Java Tooling GitHub issues using semantic search.
 
     Args:
         query: Natural-language search query describing the issues to find.
         max_results: Maximum number of results to return (1-50, default 10).
+        detail: "compact" (title, url, score and a short excerpt; default) or
+            "full" (every indexed field, including fullText and chunk).
+        fields: Exact result fields to return instead of a detail level, e.g.
+            ["title", "url", "tags"]. Any of: title, fullText, url, repository,
+            createdDate, rootItemPath, repoItemPath, parentItemPath,
+            adoDevComPostId, tags, chunk, score, excerpt.
+        max_chars: Cap on fullText, chunk and excerpt lengths (default 300 for
+            compact results, unlimited otherwise).
+        highlight: Build the excerpt from the passages matching the query, with
+            matches in **bold**, instead of the start of the chunk.
     """
     max_results = max(1, min(max_results, 50))
+    return await _search(query, max_results, *_projection(detail, fields, max_chars, highlight))
 
-    vector_query = VectorizableTextQuery(
-        text=query,
-        k_nearest_neighbors=max_results,
-        fields="text_vector",
-    )
 
-    results = search_client.search(
-        search_text=query,
-        vector_queries=[vector_query],
-        top=max_results,
-    )
+@mcp.tool()
+async def search_issues_batch(
+    queries: list[str],
+    max_results: int = 5,
+    detail: Literal["compact", "full"] = "compact",
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    highlight: bool = False,
+) -> dict[str, Any]:
+    """Run many searches in one call, e.g. one per issue in a duplicate-detection pass.
 
-    return [_to_result(doc) for doc in results]
+    The queries run concurrently. Hits are deduplicated across queries by url
+    (rootItemPath when there is no url): every matching issue appears once in
+    "issues", and each entry of "queries" lists the ids and scores of its
+    hits, best first. A query that fails reports an "error" instead of hits.
+
+    Args:
+        queries: Natural-language search queries (at most 50).
+        max_results: Maximum number of hits per query (1-50, default 5).
+        detail: "compact" (title, url and a short excerpt; default) or "full"
+            (every indexed field, including fullText and chunk).
+        fields: Exact issue fields to return instead of a detail level; same
+            names as for search_issues.
+        max_chars: Cap on fullText, chunk and excerpt lengths (default 300 for
+            compact results, unlimited otherwise).
+        highlight: Build each excerpt from the passages matching the query
+            that scored the issue highest, with matches in **bold**.
+    """
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ValueError(f"At most {MAX_BATCH_QUERIES} queries per batch, got {len(queries)}")
+    max_results = max(1, min(max_results, 50))
+    result_fields, max_chars, highlighting = _projection(detail, fields, max_chars, highlight)
+    # Ids and scores are needed for deduplication even when not requested.
+    fetched_fields = tuple(dict.fromkeys((*result_fields, "url", "rootItemPath", "score")))
+    limit = asyncio.Semaphore(SEARCH_BATCH_CONCURRENCY)
+
+    async def run(query: str) -> list[dict[str, Any]]:
+        async with limit:
+            return await _search(query, max_results, fetched_fields, max_chars, highlighting)
+
+    outcomes = await asyncio.gather(*(run(query) for query in queries), return_exceptions=True)
+
+    groups: list[dict[str, Any]] = []
+    issues: dict[str, dict[str, Any]] = {}
+    best: dict[str, float] = {}
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            groups.append({"query": query, "error": str(outcome)})
+            continue
+        hits: dict[str, float | None] = {}
+        for result in outcome:  # best first, so the first hit per id wins
+            issue_id = result.get("url") or result.get("rootItemPath") or result.get("title", "")
+            if issue_id in hits:
+                continue
+            score = result.get("score")
+            hits[issue_id] = score
+            if issue_id not in issues or (score or 0.0) > best[issue_id]:
+                issues[issue_id] = {
+                    name: value for name, value in result.items() if name in result_fields and name != "score"
+                }
+                best[issue_id] = score or 0.0
+        groups.append({"query": query, "hits": [{"id": key, "score": score} for key, score in hits.items()]})
+
+    return {"queries": groups, "issues": issues}
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Search cache counters (hits, misses, evictions, ...)."""
+    return JSONResponse({"search_cache": search_cache.summary()})
 
 
 # ---------------------------------------------------------------------------
@@ -118,10 +333,24 @@ def search_issues(query: str, max_results: int = 10) -> list[dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    import contextlib
+
     import uvicorn
     from starlette.middleware.cors import CORSMiddleware
 
     app = mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with session_lifespan(app):
+            try:
+                yield
+            finally:
+                await close_backend()
+                search_cache.close()
+
+    app.router.lifespan_context = lifespan
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],